@@ -1,52 +1,158 @@
+import unicodedata
+
+import numpy as np
 import pandas as pd
 import dash
-from dash import dcc, html, Input, Output
+from dash import dcc, html, Input, Output, State, ctx
 import plotly.express as px
 
-def convert_date(date):
-    try:
-        #Format complet : "%Y-%m-%d"
-        return pd.to_datetime(date, format="%Y-%m-%d")
-    except ValueError:
-        try:
-            #Année seulement : "%Y", completed with "-01-01"
-            return pd.to_datetime(date, format="%Y") + pd.offsets.DateOffset(months=0, days=0)
-        except ValueError:
-            return pd.NaT
-
-
-def get_dataframe(path):
-    data = pd.read_csv(path)
-    data["track_album_release_date"] = data["track_album_release_date"].apply(convert_date)
-    # Conserver uniquement des dates supérieures à 1970
-    data = data[data["track_album_release_date"].dt.year >= 1970]
-    return data
+import aggregates
+import dataset
+from callback_cache import memoize
+from figure_cache import figures
+
+def get_dataframe():
+    """
+    Chansons sorties à partir de 1970, avec la décennie de sortie.
+    Calculé une seule fois par version du jeu de données partagé.
+    """
+    def build():
+        # Conserver uniquement des dates supérieures à 1970
+        data = dataset.get_songs_since_1970()
+        data["decennie"] = data["decade"]
+        return data
+    return dataset.get_snapshot().memo("adaptation.dataframe", build).copy(deep=False)
+
+def get_track_index():
+    """
+    Index des chansons par genre et par (genre, artiste), construit une seule fois.
+
+    Returns
+    -------
+    pd.DataFrame
+        Chansons triées par genre puis par artiste (colonnes utilisées par les callbacks)
+    dict
+        Position (début, fin) des chansons de chaque genre et de chaque couple (genre, artiste)
+    """
+    def build():
+        columns = ["playlist_genre", "track_artist", "track_name", "playlist_subgenre", "track_album_release_date"]
+        data = get_dataframe()[columns].sort_values(["playlist_genre", "track_artist"], kind="mergesort")
+        ranges = {}
+        for keys in (["playlist_genre"], ["playlist_genre", "track_artist"]):
+            for key, positions in data.groupby(keys, observed=True, sort=False).indices.items():
+                ranges[key] = (positions[0], positions[-1] + 1)
+        return data, ranges
+    return dataset.get_snapshot().memo("adaptation.track_index", build)
+
+def get_tracks(genre, artist=None):
+    """
+    Chansons d'un genre, ou d'un artiste dans ce genre, lues dans l'index (lecture seule)
+    """
+    data, ranges = get_track_index()
+    start, stop = ranges.get(genre if artist is None else (genre, artist), (0, 0))
+    return data.iloc[start:stop]
+
+def get_artist_options(genre):
+    """
+    Options du dropdown des artistes d'un genre, triées par nombre de chansons (calculées une seule fois par genre)
+    """
+    def build():
+        data = get_tracks(genre)
+        artist_counts = data.groupby("track_artist", observed=True)["track_name"].nunique().sort_index().reset_index(name="song_count")
+        artist_counts = artist_counts.sort_values("song_count", ascending=False)
+        return [{'label': artist, 'value': artist} for artist in artist_counts["track_artist"]] # Création des options pour le dropdown
+    return dataset.get_snapshot().memo(("adaptation.artist_options", genre), build)
+
+# Nombre maximal d'artistes proposés par le dropdown pour une recherche
+ARTIST_SEARCH_LIMIT = 20
+
+def normalize_name(name):
+    """Nom en minuscules et sans accents, pour la recherche d'artistes."""
+    decomposed = unicodedata.normalize("NFKD", str(name).casefold())
+    return "".join(char for char in decomposed if not unicodedata.combining(char)).strip()
+
+def get_artist_search_index(genre):
+    """
+    Index de recherche des artistes d'un genre (construit une seule fois par genre)
+
+    Chaque début de mot du nom normalisé d'un artiste est une entrée d'un tableau
+    trié : les artistes dont un mot commence par le texte recherché forment une
+    plage contiguë du tableau, trouvée par recherche dichotomique.
+
+    Returns
+    -------
+    np.ndarray
+        Suffixes des noms normalisés commençant à un début de mot, triés (chaînes unicode de taille fixe)
+    np.ndarray
+        Rang de l'artiste de chaque suffixe (0 : l'artiste qui a le plus de chansons)
+    """
+    def build():
+        suffixes, ranks = [], []
+        for rank, option in enumerate(get_artist_options(genre)):
+            name = normalize_name(option["value"])
+            for position, char in enumerate(name):
+                if not char.isspace() and (position == 0 or name[position - 1].isspace()):
+                    suffixes.append(name[position:])
+                    ranks.append(rank)
+        # Chaînes de taille fixe (et non des objets Python) : la recherche ne modifie pas les
+        # compteurs de références, les pages de l'index restent partagées entre workers après fork
+        suffixes = np.array(suffixes, dtype=str)
+        order = np.argsort(suffixes, kind="mergesort")
+        return suffixes[order], np.array(ranks, dtype=np.int64)[order]
+    return dataset.get_snapshot().memo(("adaptation.artist_search_index", genre), build)
+
+def search_artists(genre, search_value=None, limit=ARTIST_SEARCH_LIMIT):
+    """
+    Options du dropdown des artistes d'un genre dont un mot commence par `search_value`
+
+    Args
+    ----
+    genre : str
+        Genre des artistes
+    search_value : str, optional
+        Texte saisi dans le dropdown (sans texte : les artistes qui ont le plus de chansons)
+    limit : int
+        Nombre maximal d'options retournées
+
+    Returns
+    -------
+    list of dict
+        Options {'label', 'value'}, par nombre de chansons décroissant
+    """
+    options = get_artist_options(genre)
+    query = normalize_name(search_value or "")
+    if not query:
+        return options[:limit]
+    suffixes, ranks = get_artist_search_index(genre)
+    start = np.searchsorted(suffixes, query, side="left")
+    # chr(0x10FFFF) est le plus grand caractère : fin de la plage des suffixes commençant par query
+    stop = np.searchsorted(suffixes, query + chr(0x10FFFF), side="left")
+    return [options[rank] for rank in np.unique(ranks[start:stop])[:limit]]
 
 def get_color_map():
     """
     Récupération de certaines couleurs pour faire correspondre les sous-genres des artistes à ceux du graphe des sou-genres
+    (calculées une seule fois)
     
     """
-    data = get_dataframe("./dataset/spotify_songs_clean.csv")
-    color_sequence = ['rgb(27,158,119)','rgb(117,112,179)','rgb(102,166,30)','rgb(166,118,29)']
-
-    color_map = {}
-    for genre in sorted(data["playlist_genre"].unique()) :
-        subgenres_genre = data[data["playlist_genre"] == genre]["playlist_subgenre"].unique()
-        color_map.update({subgenre: color_sequence[i % len(color_sequence)] for i, subgenre in enumerate(subgenres_genre)})
-    return color_map
+    def build():
+        data = get_dataframe()
+        color_sequence = ['rgb(27,158,119)','rgb(117,112,179)','rgb(102,166,30)','rgb(166,118,29)']
 
-color_map = get_color_map()
+        color_map = {}
+        for genre in sorted(data["playlist_genre"].unique()) :
+            subgenres_genre = data[data["playlist_genre"] == genre]["playlist_subgenre"].unique()
+            color_map.update({subgenre: color_sequence[i % len(color_sequence)] for i, subgenre in enumerate(subgenres_genre)})
+        return color_map
+    return dataset.get_snapshot().memo("adaptation.color_map", build)
 
 
-def data_preprocess(path, filter_type, artist=None):
+def data_preprocess(filter_type, artist=None):
     """
     Fonction pour preprocess les données
 
     Args
     ----
-    path : str
-        Chemin du fichier CSV
     filter_type : str
         Type de filtre à appliquer :
             - "artist" pour filtrer par artiste avec le nom de l'artiste dans l'argument artist
@@ -61,20 +167,22 @@ def data_preprocess(path, filter_type, artist=None):
         Données preprocess pour le graph
     
     """
-    data = get_dataframe(path)
-    data["year"] = data["track_album_release_date"].dt.year
-    data["decennie"] = (data["year"] // 10) * 10  # Calcul de la décénnie
-
     if filter_type == "artist":
+        data = get_dataframe()
         data = data[data["track_artist"] == artist]
         group_by_column = "playlist_subgenre"
-    elif filter_type in ["edm", "latin", "pop", "r&b", "rap", "rock"]:
-        data = data[data["playlist_genre"] == filter_type]
-        group_by_column = "playlist_subgenre"
+        genre_data = data.groupby(["decennie", group_by_column], observed=True).size().sort_index().reset_index(name="count")
     else:
-        group_by_column = "playlist_genre"
+        # Comptes par décennie lus dans le cube d'agrégats
+        cells = aggregates.get_cube()
+        cells = cells[cells["year"] >= 1970].rename(columns={"decade": "decennie"})
+        if filter_type in ["edm", "latin", "pop", "r&b", "rap", "rock"]:
+            cells = cells[cells["playlist_genre"] == filter_type]
+            group_by_column = "playlist_subgenre"
+        else:
+            group_by_column = "playlist_genre"
+        genre_data = aggregates.aggregate(cells, ["decennie", group_by_column]).reset_index()
 
-    genre_data = data.groupby(["decennie", group_by_column]).size().reset_index(name="count")
     genre_data = genre_data.pivot(index="decennie", columns=group_by_column, values="count").fillna(0)
  
     genre_data = (genre_data.div(genre_data.sum(axis=1), axis=0) * 100).reset_index()
@@ -82,14 +190,12 @@ def data_preprocess(path, filter_type, artist=None):
 
     return genre_data
 
-def data_preprocess_artist_cumulative(path, artist, genre_filter):
+def data_preprocess_artist_cumulative(artist, genre_filter):
     """
     Preprocess des données pour les artistes avec les pourcentages cumulatifs par sous-genre
 
     Args
     ----
-    path : str
-        Chemin du fichier CSV des données
     artist : str
         Nom de l'artiste à filtrer
     genre_filter : str
@@ -100,12 +206,11 @@ def data_preprocess_artist_cumulative(path, artist, genre_filter):
     pd.DataFrame
         Données preprocess pour le graph
     """
-    data = get_dataframe(path)
-    data = data[(data["track_artist"] == artist) & (data["playlist_genre"] == genre_filter)] # Filtrage pour l'artiste et le genre
+    data = get_tracks(genre_filter, artist).copy() # Chansons de l'artiste dans le genre
     data["formatted_date"] = pd.to_datetime(data["track_album_release_date"]).dt.strftime("%Y-%m-%d")
     
-    grouped = data.groupby(["formatted_date", "playlist_subgenre"]).size().reset_index(name="count")
-    pivot = grouped.pivot(index="formatted_date", columns="playlist_subgenre", values="count").fillna(0).sort_index()
+    grouped = data.groupby(["formatted_date", "playlist_subgenre"], observed=True).size().sort_index().reset_index(name="count")
+    pivot = grouped.pivot(index="formatted_date", columns="playlist_subgenre", values="count").fillna(0).sort_index().sort_index(axis=1)
     
     cum = pivot.cumsum() # Cumulatif par sous-genre
     total_cum = cum.sum(axis=1) # Total cumulatif par date
@@ -118,14 +223,12 @@ def data_preprocess_artist_cumulative(path, artist, genre_filter):
     return cum_percent
 
 
-def data_preprocess_custom(path,genre_filter, bins=10, start_date=None, end_date=None):
+def data_preprocess_custom(genre_filter, bins=10, start_date=None, end_date=None):
     """
     Preprocess des données avec des dates personnalisées et des bins
 
     Args
     ----
-    path : str
-        Chemin du fichier CSV des données
     genre_filter : str
         Genre à filtrer
     bins : int
@@ -142,9 +245,7 @@ def data_preprocess_custom(path,genre_filter, bins=10, start_date=None, end_date
     tuple
         Dates de début et de fin
     """
-    data = get_dataframe(path)
-    
-    data = data[data["playlist_genre"] == genre_filter]
+    data = get_tracks(genre_filter)
     
     # Dates de début et de fin
     min_date = start_date or data["track_album_release_date"].min()
@@ -162,7 +263,8 @@ def data_preprocess_custom(path,genre_filter, bins=10, start_date=None, end_date
     data = data[(data["track_album_release_date"] >= min_date) & (data["track_album_release_date"] <= max_date)]
     data["time_bin"] = pd.cut(data["track_album_release_date"], bins=bin_edges, labels=bin_midpoints, include_lowest=True)
     
-    # Calcul des pourcentages
+    # Calcul des pourcentages (tous les bins sont conservés, même vides)
+    data["playlist_subgenre"] = data["playlist_subgenre"].cat.remove_unused_categories()
     genre_data = data.groupby(["time_bin", "playlist_subgenre"]).size().reset_index(name="count")
     genre_data = genre_data.pivot(index="time_bin", columns="playlist_subgenre", values="count").fillna(0)
     genre_data = (genre_data.div(genre_data.sum(axis=1), axis=0) * 100).reset_index()
@@ -180,7 +282,7 @@ def get_figure_genre():
         "r&b": "#008000",        # Vert
         "pop": "#ADD8E6"         # Bleu clair
     }
-    genre_data = data_preprocess("./dataset/spotify_songs_clean.csv", "playlist_genre", "playlist_genre")
+    genre_data = data_preprocess("playlist_genre", "playlist_genre")
     fig = px.area(genre_data, x="decennie", y="percentage", color="playlist_genre", line_group="playlist_genre", hover_data=["playlist_genre"],
                   color_discrete_map=genres_couleurs)
     fig.update_layout(
@@ -198,57 +300,29 @@ def get_figure_genre():
     return fig
 
 
-# Figures en cache pour les sous-genres
-subgenre_cache = {
-    "edm": px.area(
-        data_preprocess("./dataset/spotify_songs_clean.csv", "edm"),
+def get_subgenre_figure(genre):
+    """
+    Figure de l'évolution des sous-genres d'un genre par décennie
+    """
+    fig = px.area(
+        data_preprocess(genre),
         x="decennie", y="percentage", color="playlist_subgenre",
         line_group="playlist_subgenre", hover_data=["playlist_subgenre"],
-        color_discrete_map=color_map,
-        title="Évolution des sous-genres de Edm",
+        color_discrete_map=get_color_map(),
+        title=f"Évolution des sous-genres de {genre.capitalize()}",
         height=500,
-    ),
-    "latin": px.area(
-        data_preprocess("./dataset/spotify_songs_clean.csv", "latin"),
-        x="decennie", y="percentage", color="playlist_subgenre",
-        line_group="playlist_subgenre", hover_data=["playlist_subgenre"],
-        color_discrete_map=color_map,
-        title="Évolution des sous-genres de Latin",
-        height=500
-    ),
-    "pop": px.area(
-        data_preprocess("./dataset/spotify_songs_clean.csv", "pop"),
-        x="decennie", y="percentage", color="playlist_subgenre",
-        line_group="playlist_subgenre", hover_data=["playlist_subgenre"],
-        color_discrete_map=color_map,
-        title="Évolution des sous-genres de Pop",
-        height=500
-    ),
-    "r&b": px.area(
-        data_preprocess("./dataset/spotify_songs_clean.csv", "r&b"),
-        x="decennie", y="percentage", color="playlist_subgenre",
-        line_group="playlist_subgenre", hover_data=["playlist_subgenre"],
-        color_discrete_map=color_map,
-        title="Évolution des sous-genres de R&b",
-        height=500
-    ),
-    "rap": px.area(
-        data_preprocess("./dataset/spotify_songs_clean.csv", "rap"),
-        x="decennie", y="percentage", color="playlist_subgenre",
-        line_group="playlist_subgenre", hover_data=["playlist_subgenre"],
-        color_discrete_map=color_map,
-        title="Évolution des sous-genres de Rap",
-        height=500
-    ),
-    "rock": px.area(
-        data_preprocess("./dataset/spotify_songs_clean.csv", "rock"),
-        x="decennie", y="percentage", color="playlist_subgenre",
-        line_group="playlist_subgenre", hover_data=["playlist_subgenre"],
-        color_discrete_map=color_map,
-        title="Évolution des sous-genres de Rock",
-        height=500
     )
-}
+    fig.update_layout(
+            title_font=dict(color='white'),
+            legend_title=dict(font=dict(color='white')),
+            legend=dict(traceorder='reversed', font=dict(color='white')),
+            plot_bgcolor='#121212', 
+            paper_bgcolor='#121212',
+            xaxis=dict(showgrid=True, title_font=dict(color='white'), tickfont=dict(color='white')),
+            yaxis=dict(showgrid=True, title_font=dict(color='white'), tickfont=dict(color='white'))
+        )
+    fig.update_yaxes(title_text='Pourcentage (%)')
+    return fig
 
 def get_hover_template(type_name):
     return (
@@ -275,13 +349,17 @@ def get_hover_template_custom(type_name):
     )
 
 
-layout = html.Div([
-    html.H1("Adaptation des artistes à l'évolution des goûts musicaux"),
-    html.Div([
-        dcc.Graph(id="graph-q8", figure=get_figure_genre())
-    ], style={'width': '50%', 'display': 'inline-block'}),
-    html.Div([
-        dcc.Markdown("""
+def get_layout():
+    """
+    Layout de la section (la figure des genres est lue dans le cache de figures)
+    """
+    return html.Div([
+        html.H1("Adaptation des artistes à l'évolution des goûts musicaux"),
+        html.Div([
+            dcc.Graph(id="graph-q8", figure=figures.get("adaptation", ("genres",), get_figure_genre))
+        ], style={'width': '50%', 'display': 'inline-block'}),
+        html.Div([
+            dcc.Markdown("""
         ### Analyse de l'évolution des genres des artistes
                      
         Il est maintenant possible de s'attarder non plus sur les caractéristiques des musiques elles-mêmes, mais sur l'évolution des artistes et des genres qu'ils créent.
@@ -290,67 +368,173 @@ layout = html.Div([
         Par exemple, le rock semblait être le plus populaire dans les années 1970 (on peut alors penser à l'apparition de groupes comme les Rolling Stones, U2 ou Radiohead…)
         alors que l'EDM a lui émergé dans les années 2000.
         """),
-        html.Br(),
-        dcc.Markdown("""
+            html.Br(),
+            dcc.Markdown("""
         Vous pouvez **choisir un genre** en particulier pour observer les évolutions de ses sous-genres, ainsi que choisir un des artistes de ce genre pour observer l'évolution de sa discographie !
         
         *Il est ainsi possible de remarquer par exemple que pour le rap, le hip-hop qui représente aujourd'hui la majeure partie du genre, n'existait pas avant les années 1990 !*
         """)
-        ],
-    style={'width': '50%', 'display': 'inline-block', 'verticalAlign': 'top', "marginTop": "50px", 'color': 'white'}),
-    html.Div([
-        html.H4("Sélectionnez votre genre et votre artiste préféré et voyez si votre idole suit le flow !", style={"textAlign": "center", "margin": "20px 0"})
-    ]),
-
-    # Graphes des sous-genres et artistes
-    html.Div([
+            ],
+        style={'width': '50%', 'display': 'inline-block', 'verticalAlign': 'top', "marginTop": "50px", 'color': 'white'}),
         html.Div([
-            html.Label("Sélectionnez un genre:", style={"color": "white"}),
-            dcc.Dropdown(
-                id='genre_dropdown',
-                options=[{'label': g.capitalize(), 'value': g,} for g in ['edm', 'latin', 'pop', 'r&b', 'rap', 'rock']],
-                placeholder="Sélectionnez un genre",
-                style={"width": "80%"},
-                className='custom-dropdown'
-            ),
-            
-            dcc.Graph(id='subgenre_graph-q15')
-        ], style={"width": "50%", "display": "inline-block", "verticalAlign": "top", "padding": "10px"}),
+            html.H4("Sélectionnez votre genre et votre artiste préféré et voyez si votre idole suit le flow !", style={"textAlign": "center", "margin": "20px 0"})
+        ]),
 
+        # Graphes des sous-genres et artistes
         html.Div([
-            html.Label("Sélectionnez un artiste:", style={"color": "white"}),
-            dcc.Dropdown(
-                id='artist_dropdown',
-                placeholder="Sélectionnez un artiste",
-                optionHeight=35,
-                style={"width": "80%"},
-                className='custom-dropdown'
-            ),
-            dcc.Graph(id='artist_subgenre_graph')
-        ], style={"width": "50%", "display": "inline-block", "verticalAlign": "top", "padding": "10px"})
-    ], style={"display": "flex", "flex-direction": "row"})
-])
+            html.Div([
+                html.Label("Sélectionnez un genre:", style={"color": "white"}),
+                dcc.Dropdown(
+                    id='genre_dropdown',
+                    options=[{'label': g.capitalize(), 'value': g,} for g in ['edm', 'latin', 'pop', 'r&b', 'rap', 'rock']],
+                    placeholder="Sélectionnez un genre",
+                    style={"width": "80%"},
+                    className='custom-dropdown'
+                ),
+                
+                dcc.Graph(id='subgenre_graph-q15')
+            ], style={"width": "50%", "display": "inline-block", "verticalAlign": "top", "padding": "10px"}),
+
+            html.Div([
+                html.Label("Sélectionnez un artiste:", style={"color": "white"}),
+                dcc.Dropdown(
+                    id='artist_dropdown',
+                    placeholder="Sélectionnez un artiste",
+                    optionHeight=35,
+                    style={"width": "80%"},
+                    className='custom-dropdown'
+                ),
+                dcc.Graph(id='artist_subgenre_graph')
+            ], style={"width": "50%", "display": "inline-block", "verticalAlign": "top", "padding": "10px"})
+        ], style={"display": "flex", "flex-direction": "row"})
+    ])
+
+
+
+
+def get_placeholder_figure(text):
+    """
+    Figure vide avec un message invitant à faire une sélection
+    """
+    fig = px.area()
+    fig.add_annotation(dict(xref="paper", yref="paper", x=0.5, y=0.5),
+                    text=text,
+                    showarrow=False)
+    fig.update_layout(height=500,
+        title_font=dict(color='white'),
+        legend=dict(traceorder='reversed',font=dict(color='white')),
+        legend_title=dict(font=dict(color='white')),
+        paper_bgcolor='#121212',
+        xaxis=dict(showgrid=True,title_font=dict(color='white'), tickfont=dict(color='white')),
+        yaxis=dict(showgrid=True,title_font=dict(color='white'), tickfont=dict(color='white'))
+    )
+    return fig
+
+
+def get_artist_range_figure(genre, artist):
+    """
+    Figure de l'évolution des sous-genres d'un genre sur la période d'activité d'un artiste
+    """
+    data_artist = get_tracks(genre, artist)
+    if data_artist.empty:
+        return get_subgenre_figure(genre)
+
+    artist_min = data_artist["track_album_release_date"].min()
+    artist_max = data_artist["track_album_release_date"].max()
+    genre_data, _ = data_preprocess_custom(
+        genre, 
+        bins=10, 
+        start_date=artist_min, 
+        end_date=artist_max
+    )
+    genre_data["time_bin"] = pd.to_datetime(genre_data["time_bin"])
+    fig = px.area(
+        genre_data, 
+        x="time_bin", y="percentage", 
+        color="playlist_subgenre",
+        line_group="playlist_subgenre", 
+        hover_data=["playlist_subgenre"],
+        color_discrete_map=get_color_map()
+    )
+
+    fig.update_traces(hovertemplate=get_hover_template_custom(genre))
+    fig.update_layout(
+        title_font=dict(color='white'),
+        height=500, 
+        title=dict(text=f"Évolution des sous-genres de {genre}", font=dict(color='white')),
+        legend_title_text="Sous-genre de " + genre,
+        legend_title=dict(font=dict(color='white')),
+        legend=dict(traceorder='reversed',font=dict(color='white')),
+        plot_bgcolor='#121212', 
+        paper_bgcolor='#121212',
+        xaxis=dict(showgrid=True,title_font=dict(color='white'), tickfont=dict(color='white')),
+        yaxis=dict(showgrid=True,title_font=dict(color='white'), tickfont=dict(color='white'))
+        )
+
+    fig.update_xaxes(title_text="Date", tickformat="%Y")
+    fig.update_yaxes(title_text='Pourcentage (%)')
+    return fig
 
 
+def get_artist_figure(genre, artist):
+    """
+    Figure de l'évolution cumulée des sous-genres d'un artiste dans un genre
+    """
+    # Proportions cumulées des sous-genres pour l'artiste
+    artist_data = data_preprocess_artist_cumulative(artist, genre)
+    
+    # Création du graphique
+    fig = px.area(artist_data, x="formatted_date", y="percentage", color="playlist_subgenre",
+                line_group="playlist_subgenre", hover_data=["playlist_subgenre"],
+                color_discrete_map=get_color_map())
+    
+    fig.update_traces(hovertemplate=(
+        "<b>Sous-genre:</b> %{customdata[0]}<br>"
+        "<b>Date:</b> %{x|%Y-%m-%d}<br>"
+        "<b>Pourcentage cumulatif:</b> %{y:.3f}%<extra></extra>"
+    ))
+    fig.update_yaxes(title_text='Pourcentage cumulatif (%)')
+    fig.update_xaxes(title_text='Date')
+
+    fig.update_layout(height=500,
+            title=f"Évolution cumulée des sous-genres pour {artist} ({genre})",
+            title_font=dict(color='white'),
+            legend_title_text="Sous-genre",
+            legend=dict(traceorder='reversed',font=dict(color='white')),
+            legend_title=dict(font=dict(color='white')),
+            plot_bgcolor='#121212', 
+            paper_bgcolor='#121212',
+            xaxis=dict(showgrid=True,title_font=dict(color='white'), tickfont=dict(color='white')),
+            yaxis=dict(showgrid=True,title_font=dict(color='white'), tickfont=dict(color='white'))
+            )
+    
+    return fig
 
 
 def register_callbacks(app):
 # Callback to update the artist dropdown based on the selected genre
+    # Seuls les ARTIST_SEARCH_LIMIT premiers artistes correspondant au texte saisi sont envoyés
     @app.callback(
         [Output('artist_dropdown', 'options'),
         Output('artist_dropdown', 'value')],
-        [Input('genre_dropdown', 'value')]
+        [Input('genre_dropdown', 'value'),
+        Input('artist_dropdown', 'search_value')],
+        State('artist_dropdown', 'value')
     )
-    def update_artist_options(selected_genre):
+    def update_artist_options(selected_genre, search_value, selected_artist):
         if not selected_genre:
             return [], None
-        data = get_dataframe("./dataset/spotify_songs_clean.csv")
-        data = data[data["playlist_genre"] == selected_genre] # Filtrage par genre des chansons
-        artist_counts = data.groupby("track_artist")["track_name"].nunique().reset_index(name="song_count")
-        artist_counts = artist_counts.sort_values("song_count", ascending=False)
-        options = [{'label': artist, 'value': artist} for artist in artist_counts["track_artist"]] # Création des options pour le dropdown
-        return options, None
+        if ctx.triggered_id != 'artist_dropdown':
+            # Nouveau genre : l'artiste sélectionné est réinitialisé
+            return search_artists(selected_genre), None
+
+        options = search_artists(selected_genre, search_value)
+        # L'artiste sélectionné reste dans les options pour que le dropdown affiche son nom
+        if selected_artist and all(option['value'] != selected_artist for option in options):
+            options = options + [{'label': selected_artist, 'value': selected_artist}]
+        return options, dash.no_update
     
+    # Les figures sont construites une seule fois puis lues dans le cache (une copie par requête)
     @app.callback(
         Output('subgenre_graph-q15', 'figure'),
         [Input('genre_dropdown', 'value'),
@@ -358,84 +542,14 @@ def register_callbacks(app):
     )
     def update_subgenre_graph(selected_genre, selected_artist):
         if not selected_genre:
-            fig = px.area()
-            fig.add_annotation(dict(xref="paper", yref="paper", x=0.5, y=0.5),
-                            text="Sélectionnez un genre pour voir les données.",
-                            showarrow=False)
-            fig.update_layout(height=500,
-                title_font=dict(color='white'),
-                legend=dict(traceorder='reversed',font=dict(color='white')),
-                legend_title=dict(font=dict(color='white')),
-                paper_bgcolor='#121212',
-                xaxis=dict(showgrid=True,title_font=dict(color='white'), tickfont=dict(color='white')),
-                yaxis=dict(showgrid=True,title_font=dict(color='white'), tickfont=dict(color='white'))
-            )
-            return fig
+            return figures.get("adaptation", ("placeholder", "genre"),
+                               lambda: get_placeholder_figure("Sélectionnez un genre pour voir les données."))
 
         if selected_artist: # Mise à jour du graphe avec les ranges de l'artiste
-            data = get_dataframe("./dataset/spotify_songs_clean.csv")
-            data_artist = data[(data["playlist_genre"] == selected_genre) &(data["track_artist"] == selected_artist)]
-            
-            if data_artist.empty:
-                fig = subgenre_cache[selected_genre]
-                fig.update_layout(
-                    title_font=dict(color='white'),
-                    legend_title=dict(font=dict(color='white')),
-                    legend=dict(traceorder='reversed', font=dict(color='white')),
-                    plot_bgcolor='#121212', 
-                    paper_bgcolor='#121212',
-                    xaxis=dict(showgrid=True, title_font=dict(color='white'), tickfont=dict(color='white')),
-                    yaxis=dict(showgrid=True, title_font=dict(color='white'), tickfont=dict(color='white'))
-                )
-            else:
-                artist_min = data_artist["track_album_release_date"].min()
-                artist_max = data_artist["track_album_release_date"].max()
-                genre_data, _ = data_preprocess_custom(
-                    "./dataset/spotify_songs_clean.csv", 
-                    selected_genre, 
-                    bins=10, 
-                    start_date=artist_min, 
-                    end_date=artist_max
-                )
-                genre_data["time_bin"] = pd.to_datetime(genre_data["time_bin"])
-                fig = px.area(
-                    genre_data, 
-                    x="time_bin", y="percentage", 
-                    color="playlist_subgenre",
-                    line_group="playlist_subgenre", 
-                    hover_data=["playlist_subgenre"],
-                    color_discrete_map=color_map
-                )
-
-                fig.update_traces(hovertemplate=get_hover_template_custom(selected_genre))
-                fig.update_layout(
-                    title_font=dict(color='white'),
-                    height=500, 
-                    title=dict(text=f"Évolution des sous-genres de {selected_genre}", font=dict(color='white')),
-                    legend_title_text="Sous-genre de " + selected_genre,
-                    legend_title=dict(font=dict(color='white')),
-                    legend=dict(traceorder='reversed',font=dict(color='white')),
-                    plot_bgcolor='#121212', 
-                    paper_bgcolor='#121212',
-                    xaxis=dict(showgrid=True,title_font=dict(color='white'), tickfont=dict(color='white')),
-                    yaxis=dict(showgrid=True,title_font=dict(color='white'), tickfont=dict(color='white'))
-                    )
-
-
-                fig.update_xaxes(title_text="Date", tickformat="%Y")
-        else:
-            fig = subgenre_cache[selected_genre]
-            fig.update_layout(
-                    title_font=dict(color='white'),
-                    legend_title=dict(font=dict(color='white')),
-                    legend=dict(traceorder='reversed', font=dict(color='white')),
-                    plot_bgcolor='#121212', 
-                    paper_bgcolor='#121212',
-                    xaxis=dict(showgrid=True, title_font=dict(color='white'), tickfont=dict(color='white')),
-                    yaxis=dict(showgrid=True, title_font=dict(color='white'), tickfont=dict(color='white'))
-                )
-        fig.update_yaxes(title_text='Pourcentage (%)')
-        return fig
+            return figures.get("adaptation", ("subgenres", selected_genre, selected_artist),
+                               lambda: get_artist_range_figure(selected_genre, selected_artist))
+        return figures.get("adaptation", ("subgenres", selected_genre),
+                           lambda: get_subgenre_figure(selected_genre))
 
 
     @app.callback(
@@ -443,48 +557,11 @@ def register_callbacks(app):
         [Input('genre_dropdown', 'value'),
         Input('artist_dropdown', 'value')]
     )
+    @memoize()
     def update_artist_subgenre_graph(selected_genre, selected_artist):
         if not selected_genre or not selected_artist:
-            fig = px.area()
-            fig.add_annotation(dict(xref="paper", yref="paper", x=0.5, y=0.5),
-                            text="Sélectionnez un artiste pour voir les données.",
-                            showarrow=False)
-            fig.update_layout(height=500,
-                title_font=dict(color='white'),
-                legend=dict(traceorder='reversed',font=dict(color='white')),
-                legend_title=dict(font=dict(color='white')),
-                paper_bgcolor='#121212',
-                xaxis=dict(showgrid=True,title_font=dict(color='white'), tickfont=dict(color='white')),
-                yaxis=dict(showgrid=True,title_font=dict(color='white'), tickfont=dict(color='white'))
-            )
-            return fig
+            return figures.get("adaptation", ("placeholder", "artist"),
+                               lambda: get_placeholder_figure("Sélectionnez un artiste pour voir les données."))
 
-        # Proportions cumulées des sous-genres pour l'artiste
-        artist_data = data_preprocess_artist_cumulative("./dataset/spotify_songs_clean.csv", selected_artist, selected_genre)
-        
-        # Création du graphique
-        fig = px.area(artist_data, x="formatted_date", y="percentage", color="playlist_subgenre",
-                    line_group="playlist_subgenre", hover_data=["playlist_subgenre"],
-                    color_discrete_map=color_map)
-        
-        fig.update_traces(hovertemplate=(
-            "<b>Sous-genre:</b> %{customdata[0]}<br>"
-            "<b>Date:</b> %{x|%Y-%m-%d}<br>"
-            "<b>Pourcentage cumulatif:</b> %{y:.3f}%<extra></extra>"
-        ))
-        fig.update_yaxes(title_text='Pourcentage cumulatif (%)')
-        fig.update_xaxes(title_text='Date')
-
-        fig.update_layout(height=500,
-                title=f"Évolution cumulée des sous-genres pour {selected_artist} ({selected_genre})",
-                title_font=dict(color='white'),
-                legend_title_text="Sous-genre",
-                legend=dict(traceorder='reversed',font=dict(color='white')),
-                legend_title=dict(font=dict(color='white')),
-                plot_bgcolor='#121212', 
-                paper_bgcolor='#121212',
-                xaxis=dict(showgrid=True,title_font=dict(color='white'), tickfont=dict(color='white')),
-                yaxis=dict(showgrid=True,title_font=dict(color='white'), tickfont=dict(color='white'))
-                )
-        
-        return fig
+        return figures.get("adaptation", ("artist", selected_genre, selected_artist),
+                           lambda: get_artist_figure(selected_genre, selected_artist))
@@ -0,0 +1,221 @@
+"""
+Cube d'agrégats de la table des chansons, partagé par les sections.
+"""
+import numpy as np
+import pandas as pd
+
+import dataset
+
+DIMENSIONS = ["year", "playlist_genre", "playlist_subgenre", "long_career", "popularity_band", "after_2000"]
+MEASURES = dataset.AUDIO_FEATURES + ["key", "mode", "duration_ms", "track_popularity"]
+
+# Un artiste à longue carrière a publié des morceaux sur au moins 3 décennies
+LONG_CAREER_DECADES = 3
+# Largeur des tranches de popularité
+POPULARITY_BAND_WIDTH = 10
+
+
+def popularity_band(popularity):
+    """
+    Tranche de popularité : (popularité - 1) // 10, de sorte que la tranche 0
+    couvre 0 à 10, la tranche 5 couvre 51 à 60, etc. Un seuil « popularité > 50 »
+    correspond ainsi à « tranche > popularity_band(50) ».
+    """
+    return np.maximum(popularity - 1, 0) // POPULARITY_BAND_WIDTH
+
+
+def get_long_career_artists(songs):
+    """Artistes ayant des morceaux sur au moins LONG_CAREER_DECADES décennies."""
+    decades = songs.groupby("track_artist", observed=True)["decade"].nunique()
+    return decades[decades >= LONG_CAREER_DECADES].index
+
+
+def _cells(songs, long_career_artists):
+    """Une cellule par chanson : dimensions, nombre de morceaux (1), sommes et sommes des carrés."""
+    values = songs[MEASURES].astype("float64")
+    cells = values.add_suffix("_sum").join((values ** 2).add_suffix("_sumsq"))
+    cells["count"] = 1
+    cells["year"] = songs["year"]
+    cells["playlist_genre"] = songs["playlist_genre"]
+    cells["playlist_subgenre"] = songs["playlist_subgenre"]
+    cells["long_career"] = songs["track_artist"].isin(long_career_artists)
+    cells["popularity_band"] = popularity_band(songs["track_popularity"])
+    cells["after_2000"] = dataset.is_after_2000(songs)
+    return cells
+
+
+def _sum_cells(cells):
+    """Somme des cellules de mêmes dimensions, triées, avec les colonnes "decade" et "year_group"."""
+    cube = cells.groupby(DIMENSIONS, observed=True).sum().sort_index().reset_index()
+    cube["decade"] = (cube["year"] // 10) * 10
+    cube["year_group"] = (cube["year"] // 3) * 3
+    return cube
+
+
+def build_cube(songs):
+    """
+    Construit le cube d'agrégats à partir de la table des chansons
+
+    Args
+    ----
+    songs : pd.DataFrame
+        Table des chansons (voir dataset.get_songs)
+
+    Returns
+    -------
+    pd.DataFrame
+        Une ligne par combinaison observée de DIMENSIONS, avec le nombre de
+        morceaux ("count"), et pour chaque mesure sa somme ("<mesure>_sum") et
+        sa somme des carrés ("<mesure>_sumsq"). Les colonnes "decade" et
+        "year_group" sont dérivées de l'année.
+    """
+    return _sum_cells(_cells(songs, get_long_career_artists(songs)))
+
+
+def get_cube():
+    """Cube d'agrégats de la version actuelle du jeu de données (construit une seule fois)."""
+    return dataset.get_snapshot().memo("aggregates.cube", lambda: build_cube(dataset.get_songs()))
+
+
+def build_artist_decades(songs):
+    """
+    Couples (artiste, décennie) distincts de la table des chansons
+
+    Returns
+    -------
+    pd.MultiIndex
+        Couples (track_artist, decade) observés
+    """
+    pairs = songs[["track_artist", "decade"]].dropna().drop_duplicates()
+    return pd.MultiIndex.from_arrays([pairs["track_artist"].astype(str), pairs["decade"].astype("int64")])
+
+
+def get_artist_decades():
+    """Couples (artiste, décennie) de la version actuelle du jeu de données (construits une seule fois)."""
+    return dataset.get_snapshot().memo("aggregates.artist_decades", lambda: build_artist_decades(dataset.get_songs()))
+
+
+def _long_career(artist_decades):
+    decades = pd.Series(1, index=artist_decades).groupby(level=0).sum()
+    return decades.index[decades >= LONG_CAREER_DECADES]
+
+
+def apply_batch(cube, artist_decades, batch, songs=None):
+    """
+    Cube d'agrégats et couples (artiste, décennie) après l'ajout d'un lot de chansons
+
+    Les cellules du lot sont ajoutées à celles du cube. Un artiste du lot qui atteint
+    LONG_CAREER_DECADES décennies change de cohorte : ses morceaux déjà présents sont
+    retirés des cellules "long_career" fausses et ajoutés aux vraies. Seules les lignes
+    du lot et celles de ces artistes sont agrégées, jamais toute la table.
+
+    Args
+    ----
+    cube : pd.DataFrame
+        Cube avant l'ajout (build_cube)
+    artist_decades : pd.MultiIndex
+        Couples (artiste, décennie) avant l'ajout (build_artist_decades)
+    batch : pd.DataFrame
+        Nouvelles chansons, aux types de la table (voir dataset.extend_snapshot)
+    songs : pd.DataFrame, optional
+        Table des chansons après l'ajout, le lot en dernier (dataset.get_songs par
+        défaut), lue seulement si des artistes changent de cohorte
+
+    Returns
+    -------
+    pd.DataFrame
+        Nouveau cube, égal (aux arrondis des sommes près) à build_cube de la table suivie du lot
+    pd.MultiIndex
+        Nouveaux couples (artiste, décennie), égaux à build_artist_decades de cette table
+    """
+    new_artist_decades = artist_decades.append(build_artist_decades(batch).difference(artist_decades))
+    long_career = _long_career(new_artist_decades)
+    promoted = long_career.difference(_long_career(artist_decades))
+
+    deltas = [_cells(batch, long_career)]
+    if len(promoted):
+        songs = dataset.get_songs() if songs is None else songs
+        previous = songs.iloc[:len(songs) - len(batch)]
+        moved = previous[previous["track_artist"].isin(promoted)]
+        removed = _cells(moved, [])
+        added = _cells(moved, promoted)
+        value_columns = [c for c in removed.columns if c not in DIMENSIONS]
+        removed[value_columns] = -removed[value_columns]
+        deltas += [removed, added]
+
+    # Catégories des dimensions : celles du cube, complétées par les nouvelles valeurs du lot
+    dtypes = {}
+    for dimension in ("playlist_genre", "playlist_subgenre"):
+        categories = cube[dimension].cat.categories.union(batch[dimension].dropna().astype(object).unique())
+        if not categories.equals(cube[dimension].cat.categories):
+            cube = cube.assign(**{dimension: cube[dimension].cat.set_categories(categories)})
+        dtypes[dimension] = cube[dimension].dtype
+    cells = pd.concat(deltas, ignore_index=True)
+    for dimension, dtype in dtypes.items():
+        cells[dimension] = cells[dimension].astype(dtype)
+    cube = _add_cells(cube, cells)
+    # Cellules vidées par le changement de cohorte
+    cube = cube[cube["count"] > 0].reset_index(drop=True)
+    return cube, new_artist_decades
+
+
+def _add_cells(cube, cells):
+    """
+    Cube auquel sont ajoutées des cellules (voir _cells) : les sommes des cellules déjà
+    présentes sont complétées, les nouvelles sont insérées à leur place dans l'ordre de
+    _sum_cells. Seules les cellules ajoutées sont regroupées.
+    """
+    if pd.api.types.is_extension_array_dtype(cells["year"]) and not pd.api.types.is_extension_array_dtype(cube["year"]):
+        # Années manquantes dans les cellules ajoutées : entier « nullable », comme build_cube sur la table entière
+        cube = cube.astype(dict.fromkeys(["year", "decade", "year_group"], cells["year"].dtype))
+    cells = cells.astype({"year": cube["year"].dtype})
+    delta = cells.groupby(DIMENSIONS, observed=True).sum()
+    positions = pd.MultiIndex.from_frame(cube[DIMENSIONS]).get_indexer(delta.index)
+    found = positions >= 0
+
+    cube = cube.copy()
+    for column in delta.columns:
+        values = cube[column].to_numpy(copy=True)
+        values[positions[found]] += delta[column].to_numpy()[found]
+        cube[column] = values
+    if not found.all():
+        added = delta[~found].reset_index()
+        added["decade"] = (added["year"] // 10) * 10
+        added["year_group"] = (added["year"] // 3) * 3
+        cube = pd.concat([cube, added[cube.columns]], ignore_index=True).sort_values(DIMENSIONS, ignore_index=True)
+    return cube
+
+
+def aggregate(cells, by, measures=(), std=False):
+    """
+    Regroupe des cellules du cube
+
+    Args
+    ----
+    cells : pd.DataFrame
+        Cellules du cube (get_cube), éventuellement filtrées
+    by : list of str
+        Colonnes de regroupement (dimensions, "decade" ou "year_group")
+    measures : list of str, optional
+        Mesures dont on veut la moyenne
+    std : bool, optional
+        Ajoute l'écart-type de chaque mesure ("<mesure>_std")
+
+    Returns
+    -------
+    pd.DataFrame
+        Indexé par `by`, avec la moyenne de chaque mesure et le nombre de
+        morceaux dans "count"
+    """
+    columns = ["count"] + [f"{m}_sum" for m in measures] + ([f"{m}_sumsq" for m in measures] if std else [])
+    sums = cells.groupby(by, observed=True)[columns].sum().sort_index()
+
+    result = sums[[]].copy()
+    for measure in measures:
+        result[measure] = sums[f"{measure}_sum"] / sums["count"]
+    if std:
+        for measure in measures:
+            variance = sums[f"{measure}_sumsq"] / sums["count"] - result[measure] ** 2
+            result[f"{measure}_std"] = np.sqrt(variance.clip(lower=0) * sums["count"] / (sums["count"] - 1))
+    result["count"] = sums["count"]
+    return result
@@ -1,16 +1,23 @@
 import dash
+import flask
 from dash import dcc, html
 from dash.dependencies import Input, Output, State
 import os
 import sys
 
+import transport
+
 # Create the main Dash app instance.
-app = dash.Dash(__name__, suppress_callback_exceptions=True)
+# Réponses compressées (brotli ou gzip) au-delà d'une taille minimale, voir transport.py
+server = flask.Flask(__name__)
+server.config.update(transport.compress_config())
+app = dash.Dash(__name__, server=server, suppress_callback_exceptions=True, compress=transport.COMPRESS)
 app.title = 'Spotify Songs Analysis'
 
 sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
 
 # Importations des différentes sections du storytelling
+# (leurs données et figures ne sont calculées qu'au chargement de la section, voir lazy_sections.py)
 import caracteristiques_audio
 import caracteristiques
 import correlation
@@ -19,14 +26,17 @@ import evolutions
 import discographie
 import adaptation
 import longevite
+import lazy_sections
 
 # Register callbacks des sections.
 caracteristiques_audio.register_callbacks(app)
 caracteristiques.register_callbacks(app)
 correlation.register_callbacks(app)
+pop_vs_duree.register_callbacks(app)
 evolutions.register_callbacks(app)
 adaptation.register_callbacks(app)
 longevite.register_callbacks(app)
+lazy_sections.register_callbacks(app)
 
 # navigation bar avec des liens pour se déplacer rapidement entre les sections
 navbar = html.Div(
@@ -158,7 +168,7 @@ content = html.Div(
         html.Hr(style={"border-color": "#1DB954", "marginLeft": "5%", "marginRight": "5%", "marginTop": "30px"}),
         narrative_caracteristiques,
         html.Div(
-            caracteristiques.layout,
+            lazy_sections.lazy_section("caracteristiques", caracteristiques.get_layout),
             id="caracteristiques-section",
             style={"padding-top": "60px", "margin-top": "-60px", 'marginLeft': '5%', 'marginRight': '5%'}
         ),
@@ -166,7 +176,7 @@ content = html.Div(
         narrative_correlation,
         # Correlation section
         html.Div(
-            correlation.layout,
+            lazy_sections.lazy_section("correlation", correlation.get_layout),
             id="correlation-section",
             style={"padding-top": "60px", "margin-top": "-60px", 'marginLeft': '5%', 'marginRight': '5%'}
         ),
@@ -174,7 +184,7 @@ content = html.Div(
         # Evolutions section
         narrative_evolutions,
         html.Div(
-            evolutions.layout,
+            lazy_sections.lazy_section("evolutions", evolutions.get_layout),
             id="q5-section",
             style={"padding-top": "60px", "margin-top": "-60px", 'marginLeft': '5%', 'marginRight': '5%'}
         ),
@@ -182,7 +192,7 @@ content = html.Div(
         # Pop_vs_duree section
         narrative_pop_vs_duree,
         html.Div(
-            pop_vs_duree.layout,
+            lazy_sections.lazy_section("pop_vs_duree", pop_vs_duree.get_layout),
             id="pop_vs_duree-section",
             style={"padding-top": "60px", "margin-top": "-60px", 'marginLeft': '5%', 'marginRight': '5%'}
         ),
@@ -190,21 +200,21 @@ content = html.Div(
         # Discographie section
         narrative_discographie,
         html.Div(
-            discographie.layout,
+            lazy_sections.lazy_section("discographie", discographie.get_layout),
             id="discographie-section",
             style={"padding-top": "60px", "margin-top": "-60px", 'marginLeft': '5%', 'marginRight': '5%'}
         ),
         html.Hr(style={"border-color": "#1DB954", "marginLeft": "5%", "marginRight": "5%", "marginTop": "30px"}),
         # Adaptation section
         html.Div(
-            adaptation.layout,
+            lazy_sections.lazy_section("adaptation", adaptation.get_layout),
             id="adaptation-section",
             style={"padding-top": "60px", "margin-top": "-60px", 'marginLeft': '5%', 'marginRight': '5%'}
         ),
         html.Hr(style={"border-color": "#1DB954", "marginLeft": "5%", "marginRight": "5%", "marginTop": "30px"}),
         # Longevite section
         html.Div(
-            longevite.layout,
+            lazy_sections.lazy_section("longevite", longevite.get_layout),
             id="longevite-section",
             style={"padding-top": "60px", "margin-top": "-60px", 'marginLeft': '5%', 'marginRight': '5%'}
         ),
@@ -0,0 +1,192 @@
+"""
+Bundle précalculé des figures statiques et des tables agrégées, construit par python artifacts.py.
+"""
+import glob
+import hashlib
+import json
+import os
+import pickle
+import shutil
+import sys
+import time
+
+import pandas as pd
+import plotly
+
+import dataset
+import aggregates
+import adaptation
+import caracteristiques
+import correlation
+import discographie
+import evolutions
+import pop_vs_duree
+import smoothers
+from figure_cache import figures
+
+# Version du format du bundle
+FORMAT = 1
+ARTIFACTS_DIR = os.path.join(dataset.CACHE_DIR, "artifacts")
+
+# Modules dont le code produit le contenu du bundle
+SOURCES = [dataset, aggregates, adaptation, caracteristiques, correlation, discographie, evolutions, pop_vs_duree,
+           smoothers]
+
+
+def code_key():
+    """
+    Empreinte du code qui produit le bundle : sources des sections, format et
+    versions de pandas et plotly (pickle des tables, JSON des figures)
+    """
+    digest = hashlib.sha256(f"{FORMAT}-{pd.__version__}-{plotly.__version__}".encode())
+    for module in SOURCES + [sys.modules[__name__]]:
+        with open(module.__file__, "rb") as file:
+            digest.update(file.read())
+    return digest.hexdigest()[:16]
+
+
+def get_bundle_path(artifacts_dir=ARTIFACTS_DIR):
+    """Répertoire du bundle correspondant à la version actuelle du jeu de données et du code."""
+    return os.path.join(artifacts_dir, f"bundle-{dataset.get_version()}-{code_key()}")
+
+
+def static_figures():
+    """
+    Figures statiques, sous la forme (section, paramètres, fonction de construction)
+
+    Les paramètres sont ceux sous lesquels les sections lisent la figure dans
+    le cache de figures.
+    """
+    df_popular, _ = evolutions.get_popular_songs()
+    min_year = df_popular["year_group"].dt.year.min()
+    entries = [
+        ("adaptation", ("genres",), adaptation.get_figure_genre),
+        ("discographie", (), discographie.get_figure),
+        ("pop_vs_duree", ("density",), pop_vs_duree.get_density_figure),
+        ("evolutions", (min_year, 'all'), lambda: evolutions.create_figure(min_year)),
+    ]
+    for bin_width in pop_vs_duree.BIN_WIDTHS:
+        entries.append(("pop_vs_duree", ("means", bin_width),
+                        lambda bin_width=bin_width: pop_vs_duree.generate_duration_popularity_plot(bin_width)))
+    for genre in sorted(dataset.get_songs()["playlist_genre"].unique()):
+        entries.append(("adaptation", ("subgenres", genre), lambda genre=genre: adaptation.get_subgenre_figure(genre)))
+    return entries
+
+
+def compute_tables():
+    """Tables d'agrégats des sections, par nom (voir restore_tables)."""
+    return {
+        "cube": aggregates.get_cube(),
+        "caracteristiques": caracteristiques.get_grouped_data(),
+        "evolutions": evolutions.get_popular_songs(),
+        "correlations": correlation.get_correlations(),
+    }
+
+
+def restore_tables(tables):
+    """
+    Installe les tables du bundle dans l'instantané du jeu de données (voir dataset.Snapshot),
+    à la place des calculs faits au premier usage par chaque section
+    """
+    dataset.get_snapshot().memos.update({
+        "aggregates.cube": tables["cube"],
+        "caracteristiques.grouped_data": tables["caracteristiques"],
+        "evolutions.popular_songs": tables["evolutions"],
+        ("correlation.correlations", correlation.TOP_N, correlation.CORRELATION_METHOD): tables["correlations"],
+    })
+
+
+def build(artifacts_dir=ARTIFACTS_DIR):
+    """
+    Calcule toutes les figures statiques et tables d'agrégats et écrit le bundle
+
+    Le bundle est écrit dans un répertoire temporaire puis renommé : un worker
+    ne lit jamais un bundle partiel. Les bundles périmés sont supprimés.
+
+    Returns
+    -------
+    str
+        Répertoire du bundle
+    dict
+        Manifeste du bundle
+    """
+    bundle_path = get_bundle_path(artifacts_dir)
+    tables = compute_tables()
+    serialized = [(section, list(params), build_figure().to_json()) for section, params, build_figure in static_figures()]
+    manifest = {
+        "format": FORMAT,
+        "dataset_version": dataset.get_version(),
+        "code_key": code_key(),
+        "created": time.strftime("%Y-%m-%dT%H:%M:%S"),
+        "figures": [[section, params] for section, params, _ in serialized],
+        "tables": sorted(tables),
+    }
+
+    os.makedirs(artifacts_dir, exist_ok=True)
+    tmp_path = f"{bundle_path}.{os.getpid()}.tmp"
+    shutil.rmtree(tmp_path, ignore_errors=True)
+    os.makedirs(tmp_path)
+    with open(os.path.join(tmp_path, "figures.json"), "w", encoding="utf-8") as file:
+        # Paramètres numpy (ex. année de la figure d'évolutions) écrits comme nombres
+        json.dump(serialized, file, default=lambda value: value.item())
+    with open(os.path.join(tmp_path, "tables.pkl"), "wb") as file:
+        pickle.dump(tables, file, protocol=pickle.HIGHEST_PROTOCOL)
+    # Le manifeste est écrit en dernier : sa présence indique un bundle complet
+    with open(os.path.join(tmp_path, "manifest.json"), "w", encoding="utf-8") as file:
+        json.dump(manifest, file, indent=2, default=lambda value: value.item())
+    shutil.rmtree(bundle_path, ignore_errors=True)
+    os.replace(tmp_path, bundle_path)
+
+    for stale in glob.glob(os.path.join(artifacts_dir, "bundle-*")):
+        if stale != bundle_path:
+            shutil.rmtree(stale, ignore_errors=True)
+    return bundle_path, manifest
+
+
+def load(artifacts_dir=ARTIFACTS_DIR):
+    """
+    Charge le bundle de la version actuelle dans le cache de figures et les tables des sections
+
+    Returns
+    -------
+    bool
+        True si le bundle a été chargé, False s'il est absent, incomplet ou
+        périmé (les sections calculent alors leurs données au premier usage)
+    """
+    # Tout le chargement lit et remplit le même instantané, même s'il est remplacé entre-temps
+    snapshot = dataset.get_snapshot()
+    token = dataset.pin(snapshot)
+    try:
+        return _load_bundle(snapshot, artifacts_dir)
+    finally:
+        dataset.unpin(token)
+
+
+def _load_bundle(snapshot, artifacts_dir):
+    bundle_path = get_bundle_path(artifacts_dir)
+    if snapshot.memos.get("artifacts.bundle") == bundle_path:
+        return True
+    try:
+        with open(os.path.join(bundle_path, "manifest.json"), encoding="utf-8") as file:
+            manifest = json.load(file)
+        if manifest["dataset_version"] != dataset.get_version() or manifest["code_key"] != code_key():
+            return False
+        with open(os.path.join(bundle_path, "tables.pkl"), "rb") as file:
+            tables = pickle.load(file)
+        with open(os.path.join(bundle_path, "figures.json"), encoding="utf-8") as file:
+            serialized = json.load(file)
+    except (OSError, ValueError, KeyError, pickle.UnpicklingError):
+        return False
+
+    restore_tables(tables)
+    for section, params, figure in serialized:
+        figures.put(section, tuple(params), figure)
+    snapshot.memos["artifacts.bundle"] = bundle_path
+    return True
+
+
+if __name__ == "__main__":
+    start = time.perf_counter()
+    path, bundle = build()
+    print(f"{len(bundle['figures'])} figures et {len(bundle['tables'])} tables écrites dans {path} "
+          f"({time.perf_counter() - start:.1f} s)")
@@ -0,0 +1,43 @@
+// Chargement des sections à la demande : quand le placeholder d'une section
+// approche de la zone visible, on passe son store "lazy-visible" à true, ce qui
+// déclenche le callback serveur qui construit la section (voir lazy_sections.py).
+(function () {
+    function loadSection(element) {
+        // dash_clientside est disponible une fois le renderer Dash initialisé
+        if (!window.dash_clientside || !window.dash_clientside.set_props) {
+            setTimeout(function () { loadSection(element); }, 100);
+            return;
+        }
+        window.dash_clientside.set_props(
+            {type: "lazy-visible", index: element.dataset.section},
+            {data: true}
+        );
+    }
+
+    let observer = null;
+    if ("IntersectionObserver" in window) {
+        observer = new IntersectionObserver(function (entries) {
+            entries.forEach(function (entry) {
+                if (entry.isIntersecting) {
+                    observer.unobserve(entry.target);
+                    loadSection(entry.target);
+                }
+            });
+        }, {rootMargin: "300px 0px"});
+    }
+
+    // Les placeholders sont rendus par React après le chargement de la page
+    function observePlaceholders() {
+        document.querySelectorAll(".lazy-placeholder:not([data-observed])").forEach(function (element) {
+            element.setAttribute("data-observed", "true");
+            if (observer) {
+                observer.observe(element);
+            } else {
+                // Sans IntersectionObserver, la section est chargée dès son rendu
+                loadSection(element);
+            }
+        });
+    }
+
+    new MutationObserver(observePlaceholders).observe(document.documentElement, {childList: true, subtree: true});
+})();
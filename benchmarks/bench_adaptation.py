@@ -0,0 +1,67 @@
+"""
+Latency benchmark of the adaptation section callbacks.
+
+For each of the six genres, selects the genre (artist dropdown options),
+types the first letters of its top artists in the artist dropdown (server
+side search), then selects each of its top artists (subgenre and cumulative
+artist graphs), and reports the p50/p99 latency of every callback and the
+size of the dropdown options. With `--passes 2` the second pass is served
+by the figure cache.
+
+Usage:
+    python benchmarks/bench_adaptation.py [--artists 50] [--passes 1]
+"""
+import argparse
+
+from plotly.io.json import to_json_plotly
+
+from dash_client import call_callback, load_app, percentile
+
+GENRES = ["edm", "latin", "pop", "r&b", "rap", "rock"]
+OPTIONS = "..artist_dropdown.options...artist_dropdown.value.."
+SUBGENRE_GRAPH = "subgenre_graph-q15.figure"
+ARTIST_GRAPH = "artist_subgenre_graph.figure"
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--artists", type=int, default=50, help="top artists per genre")
+    parser.add_argument("--passes", type=int, default=1, help="times each genre and artist is selected")
+    args = parser.parse_args()
+
+    app, client = load_app()
+    import adaptation  # pylint: disable=import-outside-toplevel
+    timings = {OPTIONS: [], SUBGENRE_GRAPH: [], ARTIST_GRAPH: []}
+    sizes = []
+
+    for genre in GENRES * args.passes:
+        response, elapsed = call_callback(app, client, OPTIONS, [genre, None], [None])
+        timings[OPTIONS].append(elapsed)
+        sizes.append(len(response.data))
+        options = adaptation.get_artist_options(genre)
+
+        for option in options[:args.artists]:
+            for length in (1, 3, 6):
+                response, elapsed = call_callback(app, client, OPTIONS, [genre, option["value"][:length]], [None],
+                                                  changed=["artist_dropdown.search_value"])
+                timings[OPTIONS].append(elapsed)
+                sizes.append(len(response.data))
+            for key in (SUBGENRE_GRAPH, ARTIST_GRAPH):
+                _, elapsed = call_callback(app, client, key, [genre, option["value"]],
+                                           changed=["artist_dropdown.value"])
+                timings[key].append(elapsed)
+
+    print(f"{'callback':<60} {'calls':>6} {'p50 (ms)':>10} {'p99 (ms)':>10}")
+    for key, values in timings.items():
+        print(f"{key:<60} {len(values):>6} {percentile(values, 50) * 1000:>10.1f} {percentile(values, 99) * 1000:>10.1f}")
+
+    all_options = max(len(to_json_plotly(adaptation.get_artist_options(genre))) for genre in GENRES)
+    print(f"artist options: {max(sizes) / 1024:.1f} KB per response at most "
+          f"(every artist of a genre: {all_options / 1024:.1f} KB)")
+
+    from figure_cache import figures  # pylint: disable=import-outside-toplevel
+    print(f"figure cache: {figures.stats()}")
+
+
+if __name__ == "__main__":
+    main()
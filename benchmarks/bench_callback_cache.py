@@ -0,0 +1,72 @@
+"""
+Latency of the memoized callbacks, first call versus repeated calls.
+
+For each memoized callback (longevite, caracteristiques, evolutions,
+adaptation), calls the callback function with a few input values, then
+calls it again with the same values, and reports the median time of the
+function itself and of the whole `/_dash-update-component` request.
+
+Usage:
+    python benchmarks/bench_callback_cache.py [--backend memory|disk] [--repeat 20]
+"""
+import argparse
+import os
+import statistics
+import time
+
+
+CALLS = {
+    "line_chart-q13.figure": [["track_popularity"], ["danceability"], ["energy"], ["valence"]],
+    "charts-container.children": [
+        [[1970, 2020], "all", ["danceability", "energy", "valence"]],
+        [[2010, 2020], "pop", ["mode", "valence", "loudness"]],
+    ],
+    "evolutions-graph.figure": [[2001], [2010]],
+    "artist_subgenre_graph.figure": [["pop", None]],
+}
+
+
+def median_ms(func, repeat):
+    timings = []
+    for _ in range(repeat):
+        start = time.perf_counter()
+        func()
+        timings.append(time.perf_counter() - start)
+    return statistics.median(timings) * 1000
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--backend", choices=["memory", "disk"], default="memory")
+    parser.add_argument("--repeat", type=int, default=20)
+    args = parser.parse_args()
+
+    # Le backend est choisi à l'import des sections
+    os.environ["CALLBACK_CACHE_BACKEND"] = args.backend
+    from dash_client import call_callback, load_app  # pylint: disable=import-outside-toplevel
+    app, client = load_app()
+
+    import adaptation  # pylint: disable=import-outside-toplevel
+    genre = "pop"
+    artist = adaptation.get_artist_options(genre)[0]["value"]
+    CALLS["artist_subgenre_graph.figure"] = [[genre, artist]]
+
+    print(f"backend: {args.backend}")
+    print(f"{'callback':<68} {'first (ms)':>11} {'cached (ms)':>12} {'request (ms)':>13}")
+    for key, calls in CALLS.items():
+        # Fonction mémoïsée, sous l'enveloppe ajoutée par Dash
+        memoized = app.callback_map[key]["callback"].__wrapped__
+        memoized.cache.clear()
+        for inputs in calls:
+            start = time.perf_counter()
+            memoized(*inputs)
+            first = (time.perf_counter() - start) * 1000
+            cached = median_ms(lambda: memoized(*inputs), args.repeat)
+            request = median_ms(lambda: call_callback(app, client, key, inputs), args.repeat)
+            label = f"{key.strip('.').split('.')[0]} {inputs}"[:68]
+            print(f"{label:<68} {first:>11.1f} {cached:>12.4f} {request:>13.1f}")
+        print(f"  cache: {memoized.cache.stats()}")
+
+
+if __name__ == "__main__":
+    main()
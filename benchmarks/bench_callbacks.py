@@ -0,0 +1,310 @@
+"""
+Latency report of every server-side Dash callback of the application.
+
+Imports `app.app`, enumerates `app.callback_map` and drives each callback
+through the `/_dash-update-component` endpoint of the Flask test client with
+a realistic matrix of inputs: every genre, the top artists of each genre,
+every slider step, every story page, every lazy section and audio feature.
+Clientside callbacks are listed in the report but not timed.
+
+For each callback the report holds:
+
+- the cold latency (first call of each input combination, results not
+  cached yet) and the warm p50/p95/p99 latency over `--repeat` calls;
+- the response size in bytes, as JSON and on the wire for each encoding
+  the client may accept (gzip, br: see `transport.py`);
+- the peak Python memory allocated by one call once the callback and
+  figure caches are cleared (tracemalloc, data tables already loaded).
+
+The JSON report (`--output`) is meant to be kept and diffed across commits:
+`--baseline old.json` prints the p50 ratio and the bytes on the wire
+against an earlier report and flags the callbacks slower than
+`--threshold`.
+
+Usage:
+    python benchmarks/bench_callbacks.py [--repeat 20] [--top-artists 3]
+        [--output callbacks.json] [--baseline old.json] [--threshold 1.2]
+"""
+import argparse
+import datetime
+import itertools
+import json
+import platform
+import subprocess
+import time
+import tracemalloc
+
+import dash
+import pandas as pd
+
+from dash_client import ROOT, call_callback, load_app, pattern_id, percentile
+
+GENRES = ["edm", "latin", "pop", "r&b", "rap", "rock"]
+# Encodages acceptés par le client pour la mesure des octets sur le réseau
+ENCODINGS = ["gzip", "br"]
+
+
+def case(label, inputs, state=(), changed=None, outputs=None):
+    return {"label": label, "inputs": inputs, "state": state, "changed": changed, "outputs": outputs}
+
+
+def feature_tab_cases(app, args):
+    """Un clic sur chaque onglet des caractéristiques audio."""
+    import caracteristiques_audio  # pylint: disable=import-outside-toplevel
+    features = list(caracteristiques_audio.explanations)
+    outputs = [{"id": "feature-explanation", "property": "children"},
+               [{"id": {"type": "feature-tab", "index": feature}, "property": "style"} for feature in features]]
+    for selected in features:
+        timestamps = [{"id": {"type": "feature-tab", "index": feature}, "property": "n_clicks_timestamp",
+                       "value": 2 if feature == selected else 1} for feature in features]
+        changed = [f'{pattern_id({"type": "feature-tab", "index": selected})}.n_clicks_timestamp']
+        yield case(selected, [timestamps], changed=changed, outputs=outputs)
+
+
+def story_navigation_cases(app, args):
+    """Boutons suivant et précédent depuis chaque page de l'histoire."""
+    for page, button in itertools.product(range(1, 8), ["next-button-q1", "prev-button-q1"]):
+        yield case(f"page {page} {button}", [1, 1], [page], changed=[f"{button}.n_clicks"])
+
+
+def story_page_cases(app, args):
+    """Chaque page de l'histoire."""
+    for page in range(1, 8):
+        yield case(f"page {page}", [page])
+
+
+def story_charts_cases(app, args):
+    """Filtres de chaque page de l'histoire, puis chaque genre avec les filtres de la première page."""
+    key = next(key for key in app.callback_map if "page-indicator-q1" in key)
+    display_story = app.callback_map[key]["callback"].__wrapped__
+    for page in range(1, 8):
+        _, year_range, genre, _, features = display_story(page)
+        yield case(f"page {page}", [year_range, genre, features])
+    _, year_range, _, _, features = display_story(1)
+    for genre in ["all"] + GENRES:
+        yield case(f"genre {genre}", [year_range, genre, features])
+
+
+def evolutions_genre_cases(app, args):
+    """Passage d'un genre au suivant, dans l'ordre des boutons."""
+    genres = ["all"] + GENRES
+    for previous, genre in zip(genres[-1:] + genres[:-1], genres):
+        yield case(f"{previous} -> {genre}", [genre], [previous])
+
+
+def base_year_cases(app, args):
+    """Chaque position du slider des années de référence."""
+    import evolutions  # pylint: disable=import-outside-toplevel
+    _, index_by_base_year = evolutions.get_popular_songs()
+    for base_year in index_by_base_year:
+        yield case(str(base_year), [int(base_year)])
+
+
+def artist_search_cases(app, args):
+    """Chaque genre, puis la saisie des premières lettres de ses artistes les plus représentés."""
+    import adaptation  # pylint: disable=import-outside-toplevel
+    for genre in [None] + GENRES:
+        yield case(str(genre), [genre, None], [None])
+    for genre in GENRES:
+        for option in adaptation.get_artist_options(genre)[:args.top_artists]:
+            for length in (1, 3):
+                search = option["value"][:length]
+                yield case(f"{genre} / {search!r}", [genre, search], [None], changed=["artist_dropdown.search_value"])
+
+
+def genre_artist_cases(app, args):
+    """Chaque genre, sans artiste puis avec chacun de ses artistes les plus représentés."""
+    import adaptation  # pylint: disable=import-outside-toplevel
+    yield case("None", [None, None])
+    for genre in GENRES:
+        for artist in [None] + [option["value"] for option in adaptation.get_artist_options(genre)[:args.top_artists]]:
+            yield case(f"{genre} / {artist}", [genre, artist])
+
+
+def longevite_cases(app, args):
+    """Chaque caractéristique du dropdown."""
+    import longevite  # pylint: disable=import-outside-toplevel
+    for feature in longevite.features:
+        yield case(feature, [feature])
+
+
+def lazy_section_cases(app, args):
+    """Chargement de chaque section paresseuse."""
+    import lazy_sections  # pylint: disable=import-outside-toplevel
+    for name in lazy_sections.SECTIONS:
+        section_id = {"type": "lazy-section", "index": name}
+        visible_id = {"type": "lazy-visible", "index": name}
+        yield case(name, [{"id": visible_id, "property": "data", "value": True}],
+                   [{"id": section_id, "property": "id", "value": section_id}],
+                   changed=[f"{pattern_id(visible_id)}.data"],
+                   outputs={"id": section_id, "property": "children"})
+
+
+# Générateur des cas de chaque callback, selon ses entrées (identifiant.propriété)
+CASES = {
+    ('{"index":["ALL"],"type":"feature-tab"}.n_clicks_timestamp',): feature_tab_cases,
+    ("next-button-q1.n_clicks", "prev-button-q1.n_clicks"): story_navigation_cases,
+    ("story-page-q1.data",): story_page_cases,
+    ("year-slider.value", "genre-dropdown.value", "features-store.data"): story_charts_cases,
+    ("genre-selector.value",): evolutions_genre_cases,
+    ("base-year-slider.value",): base_year_cases,
+    ("genre_dropdown.value", "artist_dropdown.search_value"): artist_search_cases,
+    ("genre_dropdown.value", "artist_dropdown.value"): genre_artist_cases,
+    ("feature-dropdown-q13.value",): longevite_cases,
+    ('{"index":["MATCH"],"type":"lazy-visible"}.data',): lazy_section_cases,
+}
+
+
+def default_cases(app, args, callback):
+    """Callback inconnu du banc : un seul appel avec des entrées vides."""
+    yield case("default", [None] * len(callback["inputs"]), [None] * len(callback["state"]))
+
+
+def callback_cases(app, args, key):
+    callback = app.callback_map[key]
+    inputs = tuple(f"{item['id']}.{item['property']}" for item in callback["inputs"])
+    generator = CASES.get(inputs)
+    if generator is None:
+        return list(default_cases(app, args, callback)), False
+    return list(generator(app, args)), True
+
+
+def run(app, client, key, item, encoding="identity"):
+    response, elapsed = call_callback(app, client, key, item["inputs"], item["state"], changed=item["changed"],
+                                      headers={"Accept-Encoding": encoding}, outputs=item["outputs"])
+    if response.status_code not in (200, 204):
+        raise RuntimeError(f"{key} [{item['label']}]: HTTP {response.status_code} {response.data[:200]!r}")
+    return response, elapsed
+
+
+def clear_caches(app):
+    """Vide les caches de résultats (callbacks mémoïsés et cache de figures)."""
+    from figure_cache import figures  # pylint: disable=import-outside-toplevel
+    figures.clear()
+    for callback in app.callback_map.values():
+        cache = getattr(callback.get("callback", None) and callback["callback"].__wrapped__, "cache", None)
+        if cache is not None:
+            cache.clear()
+
+
+def summary_ms(timings):
+    return {f"p{q}": round(percentile(timings, q) * 1000, 3) for q in (50, 95, 99)}
+
+
+def measure(app, client, key, cases, repeat):
+    cold, warm, sizes = [], [], []
+    wire = {encoding: [] for encoding in ENCODINGS}
+    for item in cases:
+        response, elapsed = run(app, client, key, item)
+        cold.append(elapsed)
+        sizes.append(len(response.data))
+        for encoding in ENCODINGS:
+            wire[encoding].append(len(run(app, client, key, item, encoding)[0].data))
+    for item in cases:
+        for _ in range(repeat):
+            warm.append(run(app, client, key, item)[1])
+
+    # Mémoire : un appel par cas, résultats non mis en cache
+    peak = 0
+    for item in cases:
+        clear_caches(app)
+        tracemalloc.start()
+        run(app, client, key, item)
+        peak = max(peak, tracemalloc.get_traced_memory()[1])
+        tracemalloc.stop()
+
+    return {
+        "cases": len(cases),
+        "cold_ms": summary_ms(cold),
+        "warm_ms": summary_ms(warm),
+        "bytes": {"mean": round(sum(sizes) / len(sizes)), "max": max(sizes)},
+        "wire_bytes": {encoding: round(sum(values) / len(values)) for encoding, values in wire.items()},
+        "peak_kib": round(peak / 1024, 1),
+    }
+
+
+def git_commit():
+    try:
+        return subprocess.run(["git", "rev-parse", "--short", "HEAD"], cwd=ROOT, capture_output=True, text=True,
+                              check=True).stdout.strip()
+    except (OSError, subprocess.CalledProcessError):
+        return None
+
+
+def wire_kb(result, encoding):
+    """Octets moyens sur le réseau pour un encodage (rapports plus anciens : taille JSON)."""
+    return result.get("wire_bytes", {}).get(encoding, result["bytes"]["mean"]) / 1024
+
+
+def compare(report, baseline, threshold):
+    print(f"\n{'callback':<60} {'p50 before':>11} {'p50 now':>9} {'ratio':>7} "
+          f"{'KB before':>10} {'KB now':>7} {'br before':>10} {'br now':>7}")
+    for key, result in report["callbacks"].items():
+        previous = baseline["callbacks"].get(key, {})
+        before = previous.get("warm_ms")
+        if "warm_ms" not in result or before is None:
+            continue
+        ratio = result["warm_ms"]["p50"] / before["p50"] if before["p50"] else float("inf")
+        flag = "  REGRESSION" if ratio > threshold else ""
+        print(f"{key[:60]:<60} {before['p50']:>11.2f} {result['warm_ms']['p50']:>9.2f} {ratio:>7.2f} "
+              f"{previous['bytes']['mean'] / 1024:>10.1f} {result['bytes']['mean'] / 1024:>7.1f} "
+              f"{wire_kb(previous, 'br'):>10.1f} {wire_kb(result, 'br'):>7.1f}{flag}")
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--repeat", type=int, default=20, help="warm calls of each input combination")
+    parser.add_argument("--top-artists", type=int, default=3, help="artists per genre for the adaptation callbacks")
+    parser.add_argument("--output", default="callbacks.json", help="JSON report to write")
+    parser.add_argument("--baseline", help="earlier JSON report to compare with")
+    parser.add_argument("--threshold", type=float, default=1.2, help="p50 ratio reported as a regression")
+    args = parser.parse_args()
+
+    app, client = load_app()
+    client.get("/")
+    report = {
+        "meta": {
+            "commit": git_commit(),
+            "date": datetime.datetime.now().isoformat(timespec="seconds"),
+            "python": platform.python_version(),
+            "dash": dash.__version__,
+            "pandas": pd.__version__,
+            "repeat": args.repeat,
+            "top_artists": args.top_artists,
+        },
+        "callbacks": {},
+    }
+
+    layout = {encoding: len(client.get("/_dash-layout", headers={"Accept-Encoding": encoding}).data)
+              for encoding in ["identity"] + ENCODINGS}
+    report["layout"] = {"bytes": {"mean": layout["identity"], "max": layout["identity"]},
+                        "wire_bytes": {encoding: layout[encoding] for encoding in ENCODINGS}}
+    print("/_dash-layout: " + ", ".join(f"{encoding} {size / 1024:.1f} KB" for encoding, size in layout.items()) + "\n")
+
+    print(f"{'callback':<60} {'cases':>5} {'cold p50':>9} {'p50':>7} {'p95':>7} {'p99':>7} {'KB':>7} {'gzip':>6} "
+          f"{'br':>6} {'peak KiB':>9}")
+    for key, callback in app.callback_map.items():
+        if "callback" not in callback:
+            report["callbacks"][key] = {"clientside": True}
+            print(f"{key[:60]:<60} {'clientside':>10}")
+            continue
+        cases, known = callback_cases(app, args, key)
+        result = measure(app, client, key, cases, args.repeat)
+        result["section"] = callback["callback"].__wrapped__.__module__
+        result["default_inputs"] = not known
+        report["callbacks"][key] = result
+        print(f"{key[:60]:<60} {result['cases']:>5} {result['cold_ms']['p50']:>9.2f} {result['warm_ms']['p50']:>7.2f} "
+              f"{result['warm_ms']['p95']:>7.2f} {result['warm_ms']['p99']:>7.2f} {result['bytes']['mean'] / 1024:>7.1f} "
+              f"{wire_kb(result, 'gzip'):>6.1f} {wire_kb(result, 'br'):>6.1f} {result['peak_kib']:>9.1f}")
+
+    with open(args.output, "w", encoding="utf-8") as file:
+        json.dump(report, file, indent=2, sort_keys=True)
+    print(f"\nreport written to {args.output}")
+
+    if args.baseline:
+        with open(args.baseline, encoding="utf-8") as file:
+            compare(report, json.load(file), args.threshold)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,66 @@
+"""
+Check and benchmark of the correlation engine of the correlation section.
+
+Computes the per-genre correlation matrices of the top-N most popular
+tracks with `correlation.compute_correlations` (one batched pass) and with
+a loop of `DataFrame.corr` over the genres, for Pearson and Spearman, checks
+that they agree and prints both timings and the resulting importance matrix.
+
+Usage:
+    python benchmarks/bench_correlation.py [--top-n 1000] [--repeat 10]
+"""
+import argparse
+import os
+import sys
+import time
+
+import numpy as np
+
+ROOT = os.path.abspath(os.path.join(os.path.dirname(__file__), '..'))
+sys.path.insert(0, ROOT)
+os.chdir(ROOT)
+
+import correlation  # noqa: E402
+import dataset  # noqa: E402
+
+
+def loop_correlations(songs, top_n, method):
+    """Reference: one DataFrame.corr per genre."""
+    matrices = []
+    for genre in correlation.genres:
+        genre_songs = songs[songs["playlist_genre"] == genre].nlargest(top_n, "track_popularity")
+        matrices.append(genre_songs[correlation.x_labels].astype("float64").corr(method=method).to_numpy())
+    return np.stack(matrices)
+
+
+def best_time(func, repeat):
+    timings = []
+    for _ in range(repeat):
+        start = time.perf_counter()
+        result = func()
+        timings.append(time.perf_counter() - start)
+    return result, min(timings)
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--top-n", type=int, default=correlation.TOP_N)
+    parser.add_argument("--repeat", type=int, default=10)
+    args = parser.parse_args()
+
+    songs = dataset.get_songs_since_1970()
+    for method in ("pearson", "spearman"):
+        expected, loop = best_time(lambda: loop_correlations(songs, args.top_n, method), args.repeat)
+        actual, batched = best_time(lambda: correlation.compute_correlations(songs, args.top_n, method), args.repeat)
+        assert np.allclose(expected, actual, atol=1e-9), f"{method}: max difference {np.abs(expected - actual).max()}"
+        print(f"{method:<9} loop: {loop * 1000:7.1f} ms   batched: {batched * 1000:6.1f} ms   (max difference {np.abs(expected - actual).max():.1e})")
+
+    print(f"\nimportance (|r| >= {correlation.CORRELATION_THRESHOLD}, top {args.top_n}, {correlation.CORRELATION_METHOD}):")
+    importance = correlation.importance_matrix(correlation.compute_correlations(songs, args.top_n))
+    print(" " * 8 + " ".join(label[:5].rjust(5) for label in correlation.x_labels))
+    for genre, row in zip(correlation.genres, importance):
+        print(f"{genre:<8}" + " ".join(str(value).rjust(5) for value in row))
+
+
+if __name__ == "__main__":
+    main()
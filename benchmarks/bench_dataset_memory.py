@@ -0,0 +1,105 @@
+"""
+Memory report of the compact songs table, and chart check.
+
+Prints the memory used by each column of the songs table with the former
+types (object strings, float64) and with the compact types of
+`dataset.SCHEMA`, then rebuilds the data behind the charts of the
+adaptation, evolutions, longevite and caracteristiques sections with both
+tables and checks that they are identical (up to float32 precision).
+
+Usage:
+    python benchmarks/bench_dataset_memory.py
+"""
+import importlib
+import os
+import sys
+
+import numpy as np
+import pandas as pd
+
+ROOT = os.path.abspath(os.path.join(os.path.dirname(__file__), '..'))
+sys.path.insert(0, ROOT)
+os.chdir(ROOT)
+
+import dataset  # noqa: E402
+
+SECTIONS = ["adaptation", "evolutions", "longevite", "caracteristiques"]
+GENRES = ["edm", "latin", "pop", "r&b", "rap", "rock"]
+
+
+def figure_data(fig):
+    """Trace arrays of a figure, keyed by trace index and attribute."""
+    data = {}
+    for i, trace in enumerate(fig.data):
+        for attr in ("x", "y", "customdata"):
+            values = getattr(trace, attr, None)
+            if values is not None:
+                data[f"{i}.{attr}"] = np.asarray(values)
+    return data
+
+
+def frame_data(frame):
+    return {column: frame[column].to_numpy() for column in frame.columns}
+
+
+def render_charts(songs, artists):
+    """Data behind every chart of the checked sections, computed from `songs`."""
+    # Nouvel instantané : les sections recalculent leurs données à partir de `songs`
+    dataset.set_snapshot(dataset.Snapshot(dataset.get_version(), dataset._build_tables(songs)))  # pylint: disable=protected-access
+    modules = {name: importlib.reload(importlib.import_module(name)) for name in SECTIONS}
+
+    charts = {"adaptation/genres": figure_data(modules["adaptation"].get_figure_genre())}
+    for genre in GENRES:
+        charts[f"adaptation/subgenres/{genre}"] = figure_data(modules["adaptation"].get_subgenre_figure(genre))
+        charts[f"adaptation/artist/{genre}"] = frame_data(
+            modules["adaptation"].data_preprocess_artist_cumulative(artists[genre], genre))
+
+    df_popular, index_by_base_year = modules["evolutions"].get_popular_songs()
+    for base_year, df_index in index_by_base_year.items():
+        charts[f"evolutions/{base_year}"] = frame_data(df_index)
+
+    for feature in modules["longevite"].features:
+        charts[f"longevite/{feature}"] = figure_data(modules["longevite"].generate_line_chart(feature))
+
+    grouped_df, grouped_df_genre = modules["caracteristiques"].get_grouped_data()
+    charts["caracteristiques/all"] = frame_data(grouped_df)
+    charts["caracteristiques/genres"] = frame_data(grouped_df_genre)
+    return charts
+
+
+def same_values(expected, actual):
+    if expected.shape != actual.shape:
+        return False
+    if expected.dtype.kind in "iufb" and actual.dtype.kind in "iufb":
+        return np.allclose(expected.astype(float), actual.astype(float), rtol=1e-5, equal_nan=True)
+    return (pd.Series(expected.ravel()).astype(str) == pd.Series(actual.ravel()).astype(str)).all()
+
+
+def main():
+    before = dataset.load_songs(compact=False)
+    after = dataset.apply_schema(before)
+
+    with pd.option_context("display.width", 120, "display.max_columns", None):
+        print(dataset.memory_report(before, after))
+    total = dataset.memory_report(before, after).loc["total"]
+    print(f"\n{total['bytes_before'] / 2**20:.1f} MiB -> {total['bytes_after'] / 2**20:.1f} MiB "
+          f"({total['bytes_after'] / total['bytes_before']:.0%})\n")
+
+    # Artiste le plus prolifique de chaque genre (graphe cumulatif de la section adaptation)
+    artists = {genre: before[before["playlist_genre"] == genre]["track_artist"].value_counts().index[0] for genre in GENRES}
+    expected = render_charts(before, artists)
+    actual = render_charts(after, artists)
+    mismatches = [
+        f"{chart} [{key}]"
+        for chart, arrays in expected.items()
+        for key, values in arrays.items()
+        if key not in actual[chart] or not same_values(values, actual[chart][key])
+    ]
+    for mismatch in mismatches:
+        print(f"MISMATCH {mismatch}")
+    print(f"{len(expected)} charts checked, {len(mismatches)} mismatches")
+    sys.exit(1 if mismatches else 0)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,66 @@
+"""
+Payload and latency of the evolutions updates: full figure versus dash.Patch.
+
+The former callback rebuilt the whole 2 x 3 subplot figure (36 traces) and
+its `html.Div` wrapper for every genre or base-year change. This compares
+that path (rebuilt in-process with `evolutions.create_figure`) with the
+two partial-update callbacks: the genre path, which only patches the
+opacity of the traces that change, and the base-year path, which only
+patches the y arrays. Payload sizes are the JSON response bodies.
+
+Usage:
+    python benchmarks/bench_evolutions_patch.py [--repeat 20]
+"""
+import argparse
+import statistics
+import time
+
+from dash import dcc, html
+from plotly.io.json import to_json_plotly
+
+from dash_client import call_callback, load_app
+
+
+def full_update(evolutions, base_year, genre):
+    """Reference: the former callback output, a new figure inside a new html.Div."""
+    figure = evolutions.create_figure(base_year, genre)
+    return to_json_plotly([dcc.Markdown(""), html.Div([dcc.Graph(figure=figure, style={'width': '100%', 'height': '800px'})])])
+
+
+def median_ms(func, repeat):
+    timings = []
+    for _ in range(repeat):
+        start = time.perf_counter()
+        func()
+        timings.append(time.perf_counter() - start)
+    return statistics.median(timings) * 1000
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--repeat", type=int, default=20)
+    args = parser.parse_args()
+
+    app, client = load_app()
+    import evolutions  # pylint: disable=import-outside-toplevel
+    genre_key = next(key for key in app.callback_map if "evolutions-genre.data" in key)
+    base_year_key = "evolutions-graph.figure"
+
+    print(f"{'update':<28} {'full (KB)':>10} {'full (ms)':>10} {'patch (KB)':>11} {'patch (ms)':>11}")
+    cases = [
+        ("genre all -> rock", genre_key, ["rock"], ["all"], 2001, "rock"),
+        ("genre rock -> pop", genre_key, ["pop"], ["rock"], 2001, "pop"),
+        ("genre pop -> all", genre_key, ["all"], ["pop"], 2001, "all"),
+        ("base year 2001", base_year_key, [2001], [], 2001, "all"),
+        ("base year 2010", base_year_key, [2010], [], 2010, "all"),
+    ]
+    for label, key, inputs, state, base_year, genre in cases:
+        full_size = len(full_update(evolutions, base_year, genre)) / 1024
+        full_time = median_ms(lambda: full_update(evolutions, base_year, genre), args.repeat)
+        response, _ = call_callback(app, client, key, inputs, state)
+        patch_time = median_ms(lambda: call_callback(app, client, key, inputs, state), args.repeat)
+        print(f"{label:<28} {full_size:>10.1f} {full_time:>10.1f} {len(response.data) / 1024:>11.2f} {patch_time:>11.2f}")
+
+
+if __name__ == "__main__":
+    main()
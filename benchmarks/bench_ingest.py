@@ -0,0 +1,117 @@
+"""
+Incremental ingestion (ingest.append_tracks) against a full rebuild.
+
+In a temporary copy of the dataset directory, the CSV is cut in two: the
+application loads the first part, builds its aggregates, then receives the
+remaining tracks as --batches batches, followed by a synthetic batch that
+adds a new genre and subgenre and moves artists to the long-career cohort.
+Each batch is timed, then the first read of the tables it extends (joined
+lazily, see dataset.Snapshot.table). The time of a full rebuild from the
+grown CSV is printed for reference; --scale repeats the tracks of the
+dataset to measure both on a larger catalogue. The equality of both states
+is checked by tests/test_ingest.py.
+
+Usage:
+    python benchmarks/bench_ingest.py [--base 0.8] [--batches 4] [--scale 1]
+"""
+import argparse
+import os
+import shutil
+import sys
+import tempfile
+import time
+
+import numpy as np
+import pandas as pd
+
+ROOT = os.path.abspath(os.path.join(os.path.dirname(__file__), '..'))
+sys.path.insert(0, ROOT)
+
+import aggregates  # noqa: E402
+import caracteristiques  # noqa: E402
+import dataset  # noqa: E402
+import evolutions  # noqa: E402
+import ingest  # noqa: E402
+import pop_vs_duree  # noqa: E402
+
+
+def promoting_batch(rows):
+    """Lot synthétique : un nouveau genre, et des artistes présents sur 2 décennies qui en gagnent une 3e."""
+    years = pd.to_numeric(rows["track_album_release_date"].astype(str).str[:4], errors="coerce")
+    decades = (years // 10 * 10).groupby(rows["track_artist"]).agg(["nunique", "min"])
+    artists = decades[decades["nunique"] == 2].index[:5]
+    promoted = rows[rows["track_artist"].isin(artists)].drop_duplicates("track_artist").copy()
+    promoted["track_id"] = promoted["track_id"].astype(str) + "-promoted"
+    # Une décennie avant la plus ancienne de l'artiste
+    promoted["track_album_release_date"] = (decades.loc[promoted["track_artist"], "min"] - 10).astype(int).astype(str).to_numpy()
+    new_genre = rows.head(3).copy()
+    new_genre["track_id"] = new_genre["track_id"].astype(str) + "-jazz"
+    new_genre["playlist_genre"] = "jazz"
+    new_genre["playlist_subgenre"] = "bebop"
+    return pd.concat([promoted, new_genre]), len(artists)
+
+
+def reset():
+    """Oublie l'instantané du processus (rechargé depuis le CSV au prochain usage)."""
+    dataset.set_snapshot(None)
+
+
+def state():
+    """Tables et agrégats de la version actuelle."""
+    return {
+        "version": dataset.get_version(),
+        "tables": {name: dataset._get_table(name) for name in dataset.TABLES},  # pylint: disable=protected-access
+        "cube": aggregates.get_cube(),
+        "artist_decades": aggregates.get_artist_decades(),
+        "caracteristiques": caracteristiques.get_grouped_data(),
+        "evolutions": evolutions.get_popular_songs()[0],
+        "evolutions_index": evolutions.get_popular_songs()[1],
+        "duration_sums": pop_vs_duree.get_duration_sums(),
+        "density_grid": pop_vs_duree.get_density_grid(),
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--base", type=float, default=0.8, help="fraction of the tracks loaded before the batches")
+    parser.add_argument("--batches", type=int, default=4)
+    parser.add_argument("--scale", type=int, default=1, help="repeat the dataset's tracks this many times")
+    args = parser.parse_args()
+
+    rows = pd.read_csv(os.path.join(ROOT, "dataset", "spotify_songs_clean.csv"))
+    if args.scale > 1:
+        rows = pd.concat([rows.assign(track_id=rows["track_id"].astype(str) + f"-{copy}") for copy in range(args.scale)],
+                         ignore_index=True)
+    n_base = int(len(rows) * args.base)
+    batches = np.array_split(rows.iloc[n_base:], args.batches)
+    extra, n_promoted = promoting_batch(rows.iloc[:n_base])
+
+    directory = tempfile.mkdtemp()
+    try:
+        os.makedirs(os.path.join(directory, "dataset"))
+        os.chdir(directory)
+        rows.iloc[:n_base].to_csv(dataset.DATASET_PATH, index=False)
+
+        start = time.perf_counter()
+        state()
+        print(f"base: {n_base} tracks loaded and aggregated in {time.perf_counter() - start:.2f} s")
+        for batch in batches + [extra]:
+            result = ingest.append_tracks(batch)
+            start = time.perf_counter()
+            dataset.get_songs()
+            print(f"  batch of {result['tracks']:>5} tracks ingested in {result['seconds'] * 1000:>7.1f} ms, "
+                  f"tables joined on first read in {(time.perf_counter() - start) * 1000:>6.1f} ms")
+        print(f"  (the last batch adds a genre and moves {n_promoted} artists to the long-career cohort)")
+
+        reset()
+        shutil.rmtree(dataset.CACHE_DIR, ignore_errors=True)
+        start = time.perf_counter()
+        rebuilt = state()
+        print(f"full rebuild of {len(rebuilt['tables']['all'])} tracks: {time.perf_counter() - start:.2f} s")
+    finally:
+        os.chdir(ROOT)
+        shutil.rmtree(directory, ignore_errors=True)
+
+
+if __name__ == "__main__":
+    main()
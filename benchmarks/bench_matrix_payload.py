@@ -0,0 +1,105 @@
+"""
+Payload and build time of the correlation matrix figure.
+
+Compares the former renderer (one scatter trace per column) with
+`correlation.create_figure` (a single trace with flattened arrays) for the
+genre x feature matrix of the page and for larger matrices (every subgenre
+x every feature, and a synthetic one), then compares the size of a
+navigation step sent as a whole figure with the size of a navigation
+state, which only lists the cells whose border colour changes (see
+`correlation.get_navigation_states`; the step itself is applied client
+side).
+
+Usage:
+    python benchmarks/bench_matrix_payload.py [--repeat 20]
+"""
+import argparse
+import os
+import sys
+import time
+
+import numpy as np
+import plotly.graph_objs as go
+from plotly.io.json import to_json_plotly
+
+ROOT = os.path.abspath(os.path.join(os.path.dirname(__file__), '..'))
+sys.path.insert(0, ROOT)
+os.chdir(ROOT)
+
+import correlation  # noqa: E402
+import dataset  # noqa: E402
+
+
+def per_column_figure(borders_colors, x_labels, y_labels):
+    """Reference: the former renderer, one scatter trace per column."""
+    rows, columns = borders_colors.shape
+    fig = go.Figure(layout=correlation.create_figure(borders_colors[:1, :1]).layout)
+    fig.update_layout(xaxis={'tickvals': np.arange(columns), 'ticktext': x_labels},
+                      yaxis={'tickvals': np.arange(rows), 'ticktext': y_labels})
+    for i in range(columns):
+        fig.add_scatter(x=np.ones(rows) * i, y=np.arange(rows), mode='markers', hoverinfo="none",
+                        marker={'symbol': 'square', 'size': 45, 'color': borders_colors[:, i], 'showscale': False,
+                                'line': {'color': borders_colors[:, i], 'width': 4}},
+                        showlegend=False)
+    return fig
+
+
+def best_time(func, repeat):
+    timings = []
+    for _ in range(repeat):
+        start = time.perf_counter()
+        result = func()
+        timings.append(time.perf_counter() - start)
+    return result, min(timings)
+
+
+def selection(colors, column, rng):
+    """Border colours of a navigation step: the selected column and a few correlated cells."""
+    selected = colors.copy()
+    selected[rng.random(colors.shape) < 0.2] = correlation.selection_color_map["positive"]
+    selected[:, column] = correlation.selection_color_map["selected"]
+    return selected
+
+
+def state_changes(selected, borders):
+    """Cases dont la bordure change, comme dans les états de get_navigation_states."""
+    codes, selected_codes = correlation.color_codes(borders), correlation.color_codes(selected)
+    return [[int(index), int(selected_codes[index])] for index in np.flatnonzero(selected_codes != codes)]
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--repeat", type=int, default=20)
+    args = parser.parse_args()
+
+    rng = np.random.default_rng(0)
+    subgenres = sorted(dataset.get_songs()["playlist_subgenre"].unique())
+    colors = correlation.get_colors()
+    matrices = {
+        "genres x features": (colors, correlation.x_labels, correlation.y_labels,
+                              correlation.get_selection_colors(colors, 0)),
+    }
+    for name, y_labels in [("subgenres x features", subgenres), ("500 rows x features", [str(i) for i in range(500)])]:
+        random_colors = np.where(rng.random((len(y_labels), len(correlation.x_labels))) < 0.5, "#008000", "white")
+        matrices[name] = (random_colors, correlation.x_labels, y_labels, selection(random_colors, 0, rng))
+
+    print(f"{'matrix':<30} {'renderer':<12} {'traces':>6} {'build (ms)':>11} {'figure (KB)':>12} {'step (KB)':>10}")
+    for name, (borders, x_labels, y_labels, selected) in matrices.items():
+        label = f"{name} ({borders.shape[0]}x{borders.shape[1]})"
+        fig, build = best_time(lambda: per_column_figure(borders, x_labels, y_labels), args.repeat)
+        size = len(to_json_plotly(fig)) / 1024
+        print(f"{label:<30} {'per column':<12} {len(fig.data):>6} {build * 1000:>11.2f} {size:>12.1f} {size:>10.1f}")
+
+        fig, build = best_time(lambda: correlation.create_figure(borders, x_labels=x_labels, y_labels=y_labels), args.repeat)
+        size = len(to_json_plotly(fig)) / 1024
+        step = len(to_json_plotly(state_changes(selected, borders))) / 1024
+        print(f"{'':<30} {'single trace':<12} {len(fig.data):>6} {build * 1000:>11.2f} {size:>12.1f} {step:>10.1f}")
+
+    navigation = correlation.get_navigation_states()
+    dense = [np.ravel(correlation.get_selection_colors(colors, column)).tolist() for column in range(colors.shape[1])]
+    print(f"\nnavigation store: {len(to_json_plotly(navigation)) / 1024:.1f} KB "
+          f"(dense colours of every state: {len(to_json_plotly(dense)) / 1024:.1f} KB)")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,104 @@
+"""
+Cost of the density mode of pop_vs_duree against the number of tracks.
+
+For synthetic catalogues of increasing size (durations and popularities
+drawn like the dataset's), this measures:
+
+- the construction of the base grid (`build_density_grid`): one pass over
+  the tracks, done once;
+- the re-aggregation for a zoom (`aggregate_density` + `get_density_figure`)
+  and the size of the figure sent: they depend on the number of grid cells,
+  not on the number of tracks;
+- for reference, the size of a scatter plot with one marker per track.
+
+The aggregated counts are checked against `np.histogram2d` on the same bins.
+
+Usage:
+    python benchmarks/bench_pop_density.py [--rows 100000 1000000 10000000] [--repeat 20]
+"""
+import argparse
+import os
+import statistics
+import sys
+import time
+from unittest import mock
+
+import numpy as np
+import plotly.graph_objects as go
+
+ROOT = os.path.abspath(os.path.join(os.path.dirname(__file__), '..'))
+sys.path.insert(0, ROOT)
+os.chdir(ROOT)
+
+import pop_vs_duree  # noqa: E402
+
+ZOOMS = [
+    ("full view", None, None),
+    ("2.5-4 min x 40-80", (2.5, 4.0), (40, 80)),
+    ("3-3.25 min x 60-70", (3.0, 3.25), (60, 70)),
+    ("1.1-7.3 min x 5-95", (1.1, 7.3), (5, 95)),
+]
+
+
+def synthetic_tracks(rows, seed=0):
+    rng = np.random.default_rng(seed)
+    duration_ms = np.clip(rng.lognormal(np.log(215000), 0.3, rows), 30000, 600000).astype(np.int64)
+    popularity = np.clip(rng.normal(42, 25, rows), 0, 100).astype(np.int64)
+    return duration_ms, popularity
+
+
+def median_ms(func, repeat):
+    timings = []
+    for _ in range(repeat):
+        start = time.perf_counter()
+        func()
+        timings.append(time.perf_counter() - start)
+    return statistics.median(timings) * 1000
+
+
+def check(grid, duration_ms, popularity, duration_range, popularity_range):
+    """Comptes agrégés identiques à np.histogram2d sur les mêmes cases."""
+    counts, x_centers, y_centers = pop_vs_duree.aggregate_density(grid, duration_range, popularity_range)
+    minutes = pop_vs_duree.DENSITY_RESOLUTION_MS / 60000
+    columns = duration_ms // pop_vs_duree.DENSITY_RESOLUTION_MS
+    # Cases regroupées, en indices de la grille de base (durée à la seconde, popularité entière)
+    step_x = int(round((x_centers[1] - x_centers[0]) / minutes)) if len(x_centers) > 1 else 1
+    step_y = int(round(y_centers[1] - y_centers[0])) if len(y_centers) > 1 else 1
+    i0 = int(round(x_centers[0] / minutes - step_x / 2))
+    j0 = int(round(y_centers[0] - (step_y - 1) / 2))
+    # Cases de base visibles : la dernière case regroupée peut être tronquée
+    i1 = min(int(np.ceil(duration_range[1] / minutes)), grid.shape[0]) if duration_range else grid.shape[0]
+    j1 = min(int(np.floor(popularity_range[1])) + 1, grid.shape[1]) if popularity_range else grid.shape[1]
+    visible = (columns >= i0) & (columns < i1) & (popularity >= j0) & (popularity < j1)
+    # Bords décalés d'une demi-case : les valeurs entières ne tombent jamais sur un bord
+    x_edges = i0 + np.arange(counts.shape[0] + 1) * step_x - 0.5
+    y_edges = j0 + np.arange(counts.shape[1] + 1) * step_y - 0.5
+    expected, _, _ = np.histogram2d(columns[visible], popularity[visible], bins=[x_edges, y_edges])
+    return np.array_equal(counts, expected)
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--rows", type=int, nargs="+", default=[100_000, 1_000_000, 10_000_000])
+    parser.add_argument("--repeat", type=int, default=20)
+    args = parser.parse_args()
+
+    print(f"{'rows':>10} {'grid (ms)':>10} {'scatter (KB)':>13}  {'zoom':<20} {'cells':>6} {'zoom (ms)':>10} {'figure (KB)':>12} {'exact':>6}")
+    for rows in args.rows:
+        duration_ms, popularity = synthetic_tracks(rows)
+        grid_time = median_ms(lambda: pop_vs_duree.build_density_grid(duration_ms, popularity), max(1, args.repeat // 5))
+        grid = pop_vs_duree.build_density_grid(duration_ms, popularity)
+        scatter = go.Figure(go.Scattergl(x=duration_ms / 60000, y=popularity, mode="markers")).to_json()
+
+        for index, (label, duration_range, popularity_range) in enumerate(ZOOMS):
+            with mock.patch.object(pop_vs_duree, "get_density_grid", return_value=grid):
+                zoom_time = median_ms(lambda: pop_vs_duree.get_density_figure(duration_range, popularity_range).to_json(), args.repeat)
+                figure = pop_vs_duree.get_density_figure(duration_range, popularity_range).to_json()
+            counts, _, _ = pop_vs_duree.aggregate_density(grid, duration_range, popularity_range)
+            exact = check(grid, duration_ms, popularity, duration_range, popularity_range)
+            prefix = (f"{rows:>10} {grid_time:>10.1f} {len(scatter) / 1024:>13.0f}" if index == 0 else " " * 35)
+            print(f"{prefix}  {label:<20} {counts.size:>6} {zoom_time:>10.2f} {len(figure) / 1024:>12.1f} {str(exact):>6}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,76 @@
+"""
+Micro-benchmark of the release date parsing.
+
+Compares the former row-wise `convert_date` (applied with `Series.apply`)
+with `dataset.parse_release_dates` on a synthetic column. That both give
+the same dates is checked by tests/test_dataset.py.
+
+Usage:
+    python benchmarks/bench_release_dates.py [--rows 1000000] [--reference-rows 50000]
+"""
+import argparse
+import os
+import sys
+import time
+
+import numpy as np
+import pandas as pd
+
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+import dataset  # noqa: E402
+
+
+def convert_date(date):
+    """Former per-row conversion used by adaptation.py and discographie.py."""
+    try:
+        return pd.to_datetime(date, format="%Y-%m-%d")
+    except ValueError:
+        try:
+            return pd.to_datetime(date, format="%Y") + pd.offsets.DateOffset(months=0, days=0)
+        except ValueError:
+            return pd.NaT
+
+
+def synthetic_dates(rows, seed=0):
+    """Mix of full dates, bare years, year-months and invalid values."""
+    rng = np.random.default_rng(seed)
+    years = rng.integers(1950, 2021, rows).astype(str)
+    months = np.char.zfill(rng.integers(1, 13, rows).astype(str), 2)
+    days = np.char.zfill(rng.integers(1, 29, rows).astype(str), 2)
+    kind = rng.random(rows)
+    values = np.where(kind < 0.80, np.char.add(np.char.add(np.char.add(years, "-"), np.char.add(months, "-")), days),
+             np.where(kind < 0.95, years,
+             np.where(kind < 0.99, np.char.add(np.char.add(years, "-"), months), "unknown")))
+    dates = pd.Series(values, dtype=object)
+    dates[rng.random(rows) < 0.001] = np.nan
+    return dates
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--rows", type=int, default=1_000_000)
+    parser.add_argument("--reference-rows", type=int, default=50_000,
+                        help="rows converted with the row-wise reference (its time is extrapolated to --rows)")
+    args = parser.parse_args()
+
+    dates = synthetic_dates(args.rows)
+
+    start = time.perf_counter()
+    parsed, precision = dataset.parse_release_dates(dates)
+    vectorized = time.perf_counter() - start
+
+    sample = dates.iloc[:args.reference_rows]
+    start = time.perf_counter()
+    sample.apply(convert_date)
+    reference = (time.perf_counter() - start) * len(dates) / len(sample)
+
+    print(f"rows: {len(dates)}")
+    print(f"precisions: {dataset.count_release_date_precisions(precision)}")
+    print(f"row-wise apply: {reference:.2f} s (extrapolated from {len(sample)} rows)")
+    print(f"vectorized:     {vectorized:.3f} s")
+    print(f"speedup:        x{reference / vectorized:.0f}")
+
+
+if __name__ == "__main__":
+    main()
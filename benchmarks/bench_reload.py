@@ -0,0 +1,179 @@
+"""
+Hot reload of the dataset (reloader.py) while requests are being served.
+
+In a temporary copy of the dataset directory, the application is loaded
+and warmed up, then --clients threads call memoized and non-memoized
+callbacks through the Flask test client for the whole run. Meanwhile the
+CSV is replaced (atomically) by a version without one track out of ten;
+the watcher of the process notices it, builds the new snapshot in the
+background and swaps it.
+
+Reported:
+
+- the time from the replacement of the file to the swap, and the time of
+  the build itself;
+- the request latency before, during and after the build: requests keep
+  being answered from the served snapshot, without paying for the build
+  (after the swap, the first call of a memoized callback computes its
+  result for the new version, as after a start);
+- consistency: every response must be exactly the response of the old
+  version or of the new one (never a mix of both, nor an error);
+- in-flight requests: a context that pinned the snapshot before a second
+  reload still reads the old version until it unpins it.
+
+Usage:
+    python benchmarks/bench_reload.py [--clients 4] [--interval 0.2] [--after 2]
+"""
+import argparse
+import logging
+import os
+import shutil
+import sys
+import tempfile
+import threading
+import time
+
+import pandas as pd
+
+ROOT = os.path.abspath(os.path.join(os.path.dirname(__file__), '..'))
+
+CALLS = [
+    ("line_chart-q13.figure", ["track_popularity"]),
+    ("charts-container.children", [[1970, 2020], "all", ["danceability", "energy", "valence"]]),
+    ("artist_subgenre_graph.figure", ["pop", None]),
+    ("evolutions-graph.figure", [2001]),
+]
+
+
+def replace_csv(rows, path):
+    """Remplace le CSV d'un seul coup, comme un déploiement de nouvelles données."""
+    tmp_path = f"{path}.tmp"
+    rows.to_csv(tmp_path, index=False)
+    os.replace(tmp_path, path)
+
+
+def wait_for_version(dataset, old_version, timeout=120):
+    """Attend que l'instantané servi change de version, retourne l'heure du changement."""
+    deadline = time.perf_counter() + timeout
+    while dataset.get_served_snapshot().version == old_version:
+        if time.perf_counter() > deadline:
+            raise SystemExit("the dataset was not reloaded")
+        time.sleep(0.005)
+    return time.perf_counter()
+
+
+def latency_row(label, timings, percentile):
+    if not timings:
+        return f"  {label:<8} {0:>9} {'-':>9} {'-':>9} {'-':>9}"
+    return (f"  {label:<8} {len(timings):>9} {percentile(timings, 50) * 1000:>9.1f} "
+            f"{percentile(timings, 99) * 1000:>9.1f} {max(timings) * 1000:>9.1f}")
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--clients", type=int, default=4, help="threads calling callbacks during the reload")
+    parser.add_argument("--interval", type=float, default=0.2, help="seconds between two checks of the CSV")
+    parser.add_argument("--after", type=float, default=2.0, help="seconds of requests after the swap")
+    args = parser.parse_args()
+
+    # Intervalle du watcher lu à l'import de reloader
+    os.environ["DATASET_RELOAD_INTERVAL"] = str(args.interval)
+    sys.path.insert(0, os.path.join(ROOT, "benchmarks"))
+    from dash_client import call_callback, load_app, percentile  # pylint: disable=import-outside-toplevel
+
+    rows = pd.read_csv(os.path.join(ROOT, "dataset", "spotify_songs_clean.csv"))
+    directory = tempfile.mkdtemp()
+    try:
+        os.makedirs(os.path.join(directory, "dataset"))
+        os.chdir(directory)
+        import dataset  # pylint: disable=import-outside-toplevel
+        rows.to_csv(dataset.DATASET_PATH, index=False)
+
+        app, client = load_app()
+        import server  # pylint: disable=import-outside-toplevel
+        start = time.perf_counter()
+        server.warm_up()
+        print(f"warm-up of {len(rows)} tracks: {time.perf_counter() - start:.2f} s")
+
+        def call(test_client, key, inputs):
+            response, elapsed = call_callback(app, test_client, key, inputs)
+            return response.status_code, response.get_data(as_text=True), elapsed
+
+        # Résultats des rechargements, lus dans le journal du watcher
+        reloads = []
+        handler = logging.Handler()
+        handler.emit = lambda record: reloads.append(dict(zip(("version", "tracks", "seconds"), record.args)))
+        logger = logging.getLogger("reloader")
+        logger.setLevel(logging.INFO)
+        logger.addHandler(handler)
+
+        old = {key: call(client, key, inputs)[1] for key, inputs in CALLS}
+        old_version = dataset.get_served_snapshot().version
+
+        results = []
+        stop = threading.Event()
+
+        def run_client(index):
+            test_client = app.server.test_client()
+            while not stop.is_set():
+                key, inputs = CALLS[index % len(CALLS)]
+                index += 1
+                started = time.perf_counter()
+                status, body, elapsed = call(test_client, key, inputs)
+                results.append((started, key, status, body, elapsed))
+
+        threads = [threading.Thread(target=run_client, args=(index,)) for index in range(args.clients)]
+        for thread in threads:
+            thread.start()
+        time.sleep(1.0)
+
+        replaced = time.perf_counter()
+        replace_csv(rows[rows.index % 10 != 0], dataset.DATASET_PATH)
+        swapped = wait_for_version(dataset, old_version)
+        time.sleep(args.after)
+        stop.set()
+        for thread in threads:
+            thread.join()
+
+        new = {key: call(client, key, inputs)[1] for key, inputs in CALLS}
+        new_version = dataset.get_served_snapshot().version
+
+        # Requête en cours pendant un autre rechargement : elle garde son instantané
+        token = dataset.pin()
+        try:
+            pinned_tracks = len(dataset.get_songs())
+            replace_csv(rows, dataset.DATASET_PATH)
+            wait_for_version(dataset, new_version)
+            in_flight = dataset.get_version() == new_version and len(dataset.get_songs()) == pinned_tracks
+        finally:
+            dataset.unpin(token)
+        after_unpin = dataset.get_version() != new_version and len(dataset.get_songs()) == len(rows)
+    finally:
+        os.chdir(ROOT)
+        shutil.rmtree(directory, ignore_errors=True)
+
+    # Construction : les secondes journalisées par le watcher, juste avant le remplacement de l'instantané
+    build_seconds = reloads[0]["seconds"]
+    build_start = swapped - build_seconds
+    print(f"file replaced -> new snapshot served: {swapped - replaced:.2f} s (watcher interval {args.interval} s), "
+          f"build: {build_seconds:.2f} s")
+    print(f"\n{'requests':<10} {'count':>9} {'p50 (ms)':>9} {'p99 (ms)':>9} {'max (ms)':>9}")
+    print(latency_row("before", [r[4] for r in results if r[0] < build_start], percentile))
+    print(latency_row("during", [r[4] for r in results if build_start <= r[0] < swapped], percentile))
+    print(latency_row("after", [r[4] for r in results if r[0] >= swapped], percentile))
+
+    errors = sum(status != 200 for _, _, status, _, _ in results)
+    from_old = sum(status == 200 and body == old[key] for _, key, status, body, _ in results)
+    from_new = sum(status == 200 and body != old[key] and body == new[key] for _, key, status, body, _ in results)
+    mixed = len(results) - from_old - from_new - errors
+    changed = sum(old[key] != new[key] for key, _ in CALLS)
+    print(f"\n{len(results)} responses: {from_old} as in the old version, {from_new} only in the new one, {mixed} other, {errors} errors "
+          f"({changed} of {len(CALLS)} callbacks differ between versions)")
+    print(f"pinned context kept the old snapshot during a reload: {in_flight}; new snapshot after unpin: {after_unpin}")
+    failed = errors or mixed or not in_flight or not after_unpin or any(r[0] >= swapped and r[3] != new[r[1]] for r in results)
+    print("reload consistent" if not failed else "RELOAD INCONSISTENT")
+    sys.exit(1 if failed else 0)
+
+
+if __name__ == "__main__":
+    main()
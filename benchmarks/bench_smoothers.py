@@ -0,0 +1,113 @@
+"""
+Trend curve of pop_vs_duree: NumPy smoother against statsmodels LOWESS.
+
+- import time, in a fresh interpreter, of `smoothers` and of
+  `statsmodels.nonparametric.smoothers_lowess` (the former dependency);
+- fit time of `smoothers.lowess` and statsmodels `lowess` on the means
+  per bin of the dataset, for every bin width of the section and several
+  spans (their closeness is checked by tests/test_smoothers.py);
+- binning time: the former group-by over the tracks for each bin width,
+  against `bin_durations` on the sums computed once by `build_duration_sums`,
+  on the dataset and on a synthetic catalogue of --rows tracks.
+
+statsmodels is only needed for the reference columns; without it they are
+skipped.
+
+Usage:
+    python benchmarks/bench_smoothers.py [--rows 1000000] [--repeat 20]
+"""
+import argparse
+import os
+import statistics
+import subprocess
+import sys
+import time
+
+import numpy as np
+import pandas as pd
+
+ROOT = os.path.abspath(os.path.join(os.path.dirname(__file__), '..'))
+sys.path.insert(0, ROOT)
+os.chdir(ROOT)
+
+import dataset  # noqa: E402
+import pop_vs_duree  # noqa: E402
+import smoothers  # noqa: E402
+
+try:
+    from statsmodels.nonparametric.smoothers_lowess import lowess as statsmodels_lowess
+except ImportError:
+    statsmodels_lowess = None
+
+SPANS = [0.2, 0.3, 0.5, 2 / 3]
+
+
+def median_ms(func, repeat):
+    timings = []
+    for _ in range(repeat):
+        start = time.perf_counter()
+        func()
+        timings.append(time.perf_counter() - start)
+    return statistics.median(timings) * 1000
+
+
+def import_ms(module, repeat):
+    """Durée médiane de l'import de `module` dans un nouvel interpréteur."""
+    code = f"import time; start = time.perf_counter(); import {module}; print(time.perf_counter() - start)"
+    timings = []
+    for _ in range(repeat):
+        result = subprocess.run([sys.executable, "-c", code], cwd=ROOT, capture_output=True, text=True, check=True)
+        timings.append(float(result.stdout))
+    return statistics.median(timings) * 1000
+
+
+def groupby_bins(data, bin_width):
+    """Ancien calcul des classes : un passage sur tous les morceaux par largeur."""
+    data = data.assign(duration_bin=(data["duration_ms"] / 60000 / bin_width).round() * bin_width)
+    return data.groupby("duration_bin", as_index=False).agg({"track_popularity": "mean", "track_id": "count"})
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--rows", type=int, default=1_000_000, help="size of the synthetic catalogue")
+    parser.add_argument("--repeat", type=int, default=20)
+    args = parser.parse_args()
+
+    print("import (ms)")
+    print(f"  {'smoothers':<42} {import_ms('smoothers', 5):>8.1f}")
+    if statsmodels_lowess is not None:
+        print(f"  {'statsmodels.nonparametric.smoothers_lowess':<42} {import_ms('statsmodels.nonparametric.smoothers_lowess', 5):>8.1f}")
+
+    sums = pop_vs_duree.get_duration_sums()
+    print(f"\n{'width':>6} {'span':>5} {'bins':>5} {'numpy (ms)':>11} {'statsmodels (ms)':>17}")
+    for bin_width in pop_vs_duree.BIN_WIDTHS:
+        bins = pop_vs_duree.bin_durations(sums, bin_width)
+        x, y = bins["duration_bin"].to_numpy(), bins["track_popularity"].round(2).to_numpy()
+        for span in SPANS:
+            numpy_time = median_ms(lambda: smoothers.lowess(x, y, span=span), args.repeat)
+            if statsmodels_lowess is None:
+                print(f"{bin_width:>6} {span:>5.2f} {len(x):>5} {numpy_time:>11.3f} {'-':>17}")
+                continue
+            reference_time = median_ms(lambda: statsmodels_lowess(y, x, frac=span), args.repeat)
+            print(f"{bin_width:>6} {span:>5.2f} {len(x):>5} {numpy_time:>11.3f} {reference_time:>17.3f}")
+
+    rng = np.random.default_rng(0)
+    synthetic = pd.DataFrame({
+        "duration_ms": np.clip(rng.lognormal(np.log(215000), 0.3, args.rows), 30000, 600000).astype(np.int64),
+        "track_popularity": np.clip(rng.normal(42, 25, args.rows), 0, 100).astype(np.int64),
+        "track_id": np.arange(args.rows),
+    })
+    print(f"\n{'tracks':>9} {'sums once (ms)':>15}  {'width':>6} {'group-by (ms)':>14} {'from sums (ms)':>15}")
+    for data in (dataset.get_songs()[["duration_ms", "track_popularity", "track_id"]], synthetic):
+        duration_ms, popularity = data["duration_ms"].to_numpy(), data["track_popularity"].to_numpy()
+        sums_time = median_ms(lambda: pop_vs_duree.build_duration_sums(duration_ms, popularity), max(1, args.repeat // 5))
+        data_sums = pop_vs_duree.build_duration_sums(duration_ms, popularity)
+        for index, bin_width in enumerate(pop_vs_duree.BIN_WIDTHS):
+            groupby_time = median_ms(lambda: groupby_bins(data, bin_width), max(1, args.repeat // 5))
+            bins_time = median_ms(lambda: pop_vs_duree.bin_durations(data_sums, bin_width), args.repeat)
+            prefix = f"{len(data):>9} {sums_time:>15.1f}" if index == 0 else " " * 25
+            print(f"{prefix}  {bin_width:>6} {groupby_time:>14.1f} {bins_time:>15.3f}")
+
+
+if __name__ == "__main__":
+    main()
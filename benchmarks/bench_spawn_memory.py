@@ -0,0 +1,110 @@
+"""
+Memory of worker processes started with "spawn" that read the songs table.
+
+Starts N fresh interpreters with `multiprocessing` in "spawn" mode. Each one
+loads the shared tables through `dataset` and runs the sections on top of
+them (longevite, adaptation, discographie, evolutions), then waits while
+the parent reads its memory from /proc/<pid>/smaps (Linux only):
+
+- PSS and private memory of each process;
+- resident and proportional size of the mappings of the dataset cache
+  files: with memory-mapped tables this part is shared by all the
+  processes, its total PSS stays the same whatever N is.
+
+`--root` points at another checkout (for instance the commit before the
+memory-mapped tables) to compare both.
+
+Usage:
+    python benchmarks/bench_spawn_memory.py [--workers 1 4 16] [--root PATH]
+"""
+import argparse
+import multiprocessing
+import os
+import sys
+
+ROOT = os.path.abspath(os.path.join(os.path.dirname(__file__), '..'))
+
+GENRES = ["edm", "latin", "pop", "r&b", "rap", "rock"]
+
+
+def run_sections(root, ready, done):
+    """Processus fils : charge les tables et exécute les sections, puis attend la mesure."""
+    sys.path.insert(0, root)
+    os.chdir(root)
+    import adaptation  # pylint: disable=import-outside-toplevel
+    import discographie  # pylint: disable=import-outside-toplevel
+    import evolutions  # pylint: disable=import-outside-toplevel
+    import longevite  # pylint: disable=import-outside-toplevel
+
+    for feature in longevite.features:
+        longevite.generate_line_chart(feature)
+    adaptation.get_figure_genre()
+    for genre in GENRES:
+        adaptation.get_subgenre_figure(genre)
+        for option in adaptation.get_artist_options(genre)[:3]:
+            adaptation.get_artist_figure(genre, option["value"])
+    discographie.get_figure()
+    df_popular, _ = evolutions.get_popular_songs()
+    evolutions.create_figure(df_popular["year_group"].dt.year.min())
+
+    ready.put(os.getpid())
+    done.wait()
+
+
+def memory(pid, cache_dir):
+    """PSS et mémoire privée du processus, et taille des projections des fichiers du cache, en Kio."""
+    totals = {"pss": 0, "private": 0, "cache_rss": 0, "cache_pss": 0}
+    in_cache = False
+    with open(f"/proc/{pid}/smaps", encoding="utf-8") as file:
+        for line in file:
+            parts = line.split()
+            if not parts[0].endswith(":"):
+                # En-tête d'une projection : adresses, droits, ..., chemin éventuel
+                in_cache = len(parts) >= 6 and parts[5].startswith(cache_dir)
+                continue
+            if parts[0] == "Pss:":
+                totals["pss"] += int(parts[1])
+                if in_cache:
+                    totals["cache_pss"] += int(parts[1])
+            elif parts[0] in ("Private_Clean:", "Private_Dirty:"):
+                totals["private"] += int(parts[1])
+            elif parts[0] == "Rss:" and in_cache:
+                totals["cache_rss"] += int(parts[1])
+    return totals
+
+
+def measure(root, workers):
+    context = multiprocessing.get_context("spawn")
+    ready, done = context.Queue(), context.Event()
+    processes = [context.Process(target=run_sections, args=(root, ready, done)) for _ in range(workers)]
+    for process in processes:
+        process.start()
+    try:
+        pids = [ready.get(timeout=600) for _ in processes]
+        cache_dir = os.path.realpath(os.path.join(root, "dataset", ".cache"))
+        results = [memory(pid, cache_dir) for pid in pids]
+    finally:
+        done.set()
+        for process in processes:
+            process.join()
+    return {key: sum(result[key] for result in results) / 1024 for key in results[0]}
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--workers", type=int, nargs="+", default=[1, 4, 16])
+    parser.add_argument("--root", default=ROOT, help="checkout of the application to measure")
+    args = parser.parse_args()
+
+    root = os.path.abspath(args.root)
+    print(root)
+    print(f"{'workers':>7} {'PSS/worker':>11} {'private/worker':>15} {'total PSS':>10} "
+          f"{'cache RSS/worker':>17} {'cache PSS total':>16}  (MiB)")
+    for workers in args.workers:
+        result = measure(root, workers)
+        print(f"{workers:>7} {result['pss'] / workers:>11.1f} {result['private'] / workers:>15.1f} {result['pss']:>10.1f} "
+              f"{result['cache_rss'] / workers:>17.1f} {result['cache_pss']:>16.1f}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,87 @@
+"""
+Worker boot and first-byte benchmark.
+
+Starts fresh Python processes that import the Dash app and request the page
+the way a browser does before its first paint (`/`, `/_dash-layout`,
+`/_dash-dependencies`), then load each lazy section through its callback
+when the tree has them. `--root` points at another checkout (for instance
+the commit before lazy sections) to compare both. When the tree has an
+artifact bundle (`python artifacts.py`), it is loaded the way
+`server.create_app` does, unless `--no-bundle` is given.
+
+Usage:
+    python benchmarks/bench_startup.py [--root PATH] [--runs 3] [--no-bundle]
+"""
+import argparse
+import json
+import os
+import statistics
+import subprocess
+import sys
+
+ROOT = os.path.abspath(os.path.join(os.path.dirname(__file__), '..'))
+
+# Mesures faites dans un processus neuf (aucun module ni cache en mémoire)
+PROBE = r'''
+import json, os, sys, time
+NO_BUNDLE = bool(os.environ.get("NO_BUNDLE"))
+start = time.perf_counter()
+from app import app
+timings = {"import": time.perf_counter() - start}
+try:
+    import artifacts
+except ImportError:
+    artifacts = None
+if artifacts is not None and not NO_BUNDLE:
+    start = time.perf_counter()
+    timings["bundle"] = time.perf_counter() - start if artifacts.load() else float("nan")
+client = app.server.test_client()
+for name, path in [("GET /", "/"), ("GET /_dash-layout", "/_dash-layout"), ("GET /_dash-dependencies", "/_dash-dependencies")]:
+    start = time.perf_counter()
+    assert client.get(path).status_code == 200
+    timings[name] = time.perf_counter() - start
+timings["first paint"] = sum(timings.values())
+
+try:
+    import lazy_sections
+except ImportError:
+    lazy_sections = None
+if lazy_sections is not None:
+    key = next(key for key in app.callback_map if '"lazy-section"' in key)
+    for name in lazy_sections.SECTIONS:
+        payload = {
+            "output": key,
+            "outputs": {"id": {"type": "lazy-section", "index": name}, "property": "children"},
+            "inputs": [{"id": {"type": "lazy-visible", "index": name}, "property": "data", "value": True}],
+            "state": [{"id": {"type": "lazy-section", "index": name}, "property": "id", "value": {"type": "lazy-section", "index": name}}],
+            "changedPropIds": [json.dumps({"index": name, "type": "lazy-visible"}, separators=(",", ":")) + ".data"],
+        }
+        start = time.perf_counter()
+        assert client.post("/_dash-update-component", json=payload).status_code == 200
+        timings[f"section {name}"] = time.perf_counter() - start
+print("TIMINGS " + json.dumps(timings))
+'''
+
+
+def run_probe(root, bundle=True):
+    env = dict(os.environ, PYTHONPATH=root, NO_BUNDLE="" if bundle else "1")
+    result = subprocess.run([sys.executable, "-c", PROBE], cwd=root, capture_output=True, text=True, check=True, env=env)
+    line = next(line for line in result.stdout.splitlines() if line.startswith("TIMINGS "))
+    return json.loads(line[len("TIMINGS "):])
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--root", default=ROOT, help="checkout of the application to measure")
+    parser.add_argument("--runs", type=int, default=3, help="fresh processes to start")
+    parser.add_argument("--no-bundle", action="store_true", help="do not load the artifact bundle")
+    args = parser.parse_args()
+
+    runs = [run_probe(os.path.abspath(args.root), bundle=not args.no_bundle) for _ in range(args.runs)]
+    print(f"{args.root} ({args.runs} runs, median)")
+    for name in runs[0]:
+        print(f"  {name:<28} {statistics.median(run[name] for run in runs) * 1000:>9.1f} ms")
+
+
+if __name__ == "__main__":
+    main()
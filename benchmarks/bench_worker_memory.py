@@ -0,0 +1,181 @@
+"""
+Memory of the gunicorn workers: proportional set size (PSS) per worker.
+
+Starts gunicorn with `gunicorn.conf.py` for each worker count, with the
+application preloaded in the master (the multi-worker mode) and, with
+`--compare`, loaded by each worker. Once the workers are idle, every one of
+them serves a round of requests (every lazy section, artist searches, base
+year changes), then the PSS of the master and of each worker is read from
+/proc/<pid>/smaps_rollup (Linux only).
+
+PSS divides each shared page between the processes that map it: the sum
+over the master and the workers is the real memory used by the server, and
+its growth per added worker is the private part of a worker.
+
+Usage:
+    python benchmarks/bench_worker_memory.py [--workers 1 4 16] [--compare] [--rounds 3]
+"""
+import argparse
+import json
+import os
+import socket
+import subprocess
+import sys
+import time
+import urllib.error
+import urllib.request
+
+from dash_client import ROOT, call_callback, load_app, pattern_id
+
+
+class HttpClient:
+    """Same interface as the Flask test client (post), over HTTP."""
+
+    class Response:
+        def __init__(self, status_code, data):
+            self.status_code = status_code
+            self.data = data
+
+    def __init__(self, base_url):
+        self.base_url = base_url
+
+    def request(self, path, payload=None):
+        data = json.dumps(payload).encode() if payload is not None else None
+        request = urllib.request.Request(self.base_url + path, data=data, headers={"Content-Type": "application/json"})
+        try:
+            with urllib.request.urlopen(request, timeout=120) as response:
+                return self.Response(response.status, response.read())
+        except urllib.error.HTTPError as error:
+            return self.Response(error.code, error.read())
+
+    def get(self, path):
+        return self.request(path)
+
+    def post(self, path, json=None, headers=None):  # pylint: disable=redefined-outer-name,unused-argument
+        return self.request(path, json)
+
+
+def free_port():
+    with socket.socket() as sock:
+        sock.bind(("127.0.0.1", 0))
+        return sock.getsockname()[1]
+
+
+def children(pid):
+    try:
+        with open(f"/proc/{pid}/task/{pid}/children", encoding="ascii") as file:
+            return [int(child) for child in file.read().split()]
+    except OSError:
+        return []
+
+
+def cpu_ticks(pids):
+    total = 0
+    for pid in pids:
+        try:
+            with open(f"/proc/{pid}/stat", encoding="ascii") as file:
+                fields = file.read().rsplit(")", 1)[1].split()
+            total += int(fields[11]) + int(fields[12])
+        except OSError:
+            pass
+    return total
+
+
+def smaps_rollup(pid):
+    """Compteurs de /proc/<pid>/smaps_rollup, en Kio."""
+    values = {}
+    with open(f"/proc/{pid}/smaps_rollup", encoding="ascii") as file:
+        for line in file:
+            parts = line.split()
+            if len(parts) == 3 and parts[2] == "kB":
+                values[parts[0].rstrip(":")] = int(parts[1])
+    return values
+
+
+def wait_idle(pids, idle=2.0, timeout=600):
+    """Attend que les processus n'aient plus consommé de temps CPU pendant `idle` secondes."""
+    deadline = time.time() + timeout
+    last, since = cpu_ticks(pids), time.time()
+    while time.time() < deadline:
+        time.sleep(0.5)
+        ticks = cpu_ticks(pids)
+        if ticks != last:
+            last, since = ticks, time.time()
+        elif time.time() - since >= idle:
+            return
+    raise RuntimeError("workers still busy")
+
+
+def traffic(app, client):
+    """Une série de requêtes qui touche les données de chaque section."""
+    import lazy_sections  # pylint: disable=import-outside-toplevel
+    assert client.get("/").status_code == 200
+    assert client.get("/_dash-layout").status_code == 200
+    key = next(key for key in app.callback_map if '"lazy-section"' in key)
+    for name in lazy_sections.SECTIONS:
+        section_id = {"type": "lazy-section", "index": name}
+        visible_id = {"type": "lazy-visible", "index": name}
+        call_callback(app, client, key, [{"id": visible_id, "property": "data", "value": True}],
+                      [{"id": section_id, "property": "id", "value": section_id}],
+                      changed=[f"{pattern_id(visible_id)}.data"], outputs={"id": section_id, "property": "children"})
+    search_key = next(key for key in app.callback_map if "artist_dropdown.options" in key)
+    for genre, search in [("pop", "a"), ("rock", "the"), ("rap", "li")]:
+        call_callback(app, client, search_key, [genre, search], [None], changed=["artist_dropdown.search_value"])
+    for base_year in (2001, 2010, 2019):
+        call_callback(app, client, "evolutions-graph.figure", [base_year])
+
+
+def measure(app, workers, preload, rounds):
+    port = free_port()
+    env = dict(os.environ, WEB_CONCURRENCY=str(workers), PORT=str(port), GUNICORN_PRELOAD="1" if preload else "0")
+    master = subprocess.Popen([sys.executable, "-m", "gunicorn", "-c", "gunicorn.conf.py", "--bind", f"127.0.0.1:{port}",
+                               "server:server"], cwd=ROOT, env=env, stdout=subprocess.DEVNULL, stderr=subprocess.DEVNULL)
+    try:
+        deadline = time.time() + 600
+        while len(children(master.pid)) < workers:
+            if master.poll() is not None or time.time() > deadline:
+                raise RuntimeError("gunicorn did not start")
+            time.sleep(0.2)
+        pids = [master.pid] + children(master.pid)
+        wait_idle(pids)
+
+        # Chaque worker reçoit des requêtes (la répartition est faite par le noyau) : rounds séries par worker
+        client = HttpClient(f"http://127.0.0.1:{port}")
+        for _ in range(rounds * workers):
+            traffic(app, client)
+        wait_idle(pids)
+
+        master_pss = smaps_rollup(master.pid)
+        worker_pss = [smaps_rollup(pid) for pid in children(master.pid)]
+    finally:
+        master.terminate()
+        master.wait()
+
+    private = [values.get("Private_Clean", 0) + values.get("Private_Dirty", 0) for values in worker_pss]
+    return {
+        "master_pss_mib": master_pss["Pss"] / 1024,
+        "worker_pss_mib": sum(values["Pss"] for values in worker_pss) / len(worker_pss) / 1024,
+        "worker_private_mib": sum(private) / len(private) / 1024,
+        "total_pss_mib": (master_pss["Pss"] + sum(values["Pss"] for values in worker_pss)) / 1024,
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--workers", type=int, nargs="+", default=[1, 4, 16])
+    parser.add_argument("--compare", action="store_true", help="also measure without preloading the application")
+    parser.add_argument("--rounds", type=int, default=3, help="series of requests per worker")
+    args = parser.parse_args()
+
+    app, _ = load_app()
+    modes = [True, False] if args.compare else [True]
+    print(f"{'workers':>7} {'mode':<10} {'master PSS':>11} {'worker PSS':>11} {'worker private':>15} {'total PSS':>10}  (MiB)")
+    for preload in modes:
+        for workers in args.workers:
+            result = measure(app, workers, preload, args.rounds)
+            print(f"{workers:>7} {'preload' if preload else 'per worker':<10} {result['master_pss_mib']:>11.1f} "
+                  f"{result['worker_pss_mib']:>11.1f} {result['worker_private_mib']:>15.1f} {result['total_pss_mib']:>10.1f}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,78 @@
+"""
+Helpers to drive the Dash callbacks of `app.app` through the Flask test client.
+
+Requests go through the same `/_dash-update-component` endpoint as the
+browser, so the timings include input validation, the callback itself and
+the JSON serialization of its outputs.
+"""
+import json
+import os
+import sys
+import time
+
+ROOT = os.path.abspath(os.path.join(os.path.dirname(__file__), '..'))
+sys.path.insert(0, ROOT)
+os.chdir(ROOT)
+
+
+def load_app():
+    """Imports the Dash app and returns it with a Flask test client."""
+    from app import app  # pylint: disable=import-outside-toplevel
+    return app, app.server.test_client()
+
+
+def parse_outputs(key):
+    """Splits a `callback_map` key into its list of outputs."""
+    parts = key[2:-2].split("...") if key.startswith("..") else [key]
+    outputs = []
+    for part in parts:
+        component_id, prop = part.rsplit(".", 1)
+        outputs.append({"id": component_id, "property": prop})
+    return outputs
+
+
+def pattern_id(component_id):
+    """String form of a pattern-matching id, as used in `changedPropIds`."""
+    return json.dumps(component_id, sort_keys=True, separators=(",", ":"))
+
+
+def _entry(item, value):
+    # Les entrées à motif (ALL, MATCH) sont passées déjà développées : une liste
+    # (ALL) ou un dict (MATCH) de {"id": ..., "property": ..., "value": ...}
+    if item["id"].startswith("{"):
+        return value
+    return dict(item, value=value)
+
+
+def call_callback(app, client, key, inputs, state=(), changed=None, headers=None, outputs=None):
+    """
+    Calls the callback registered under `key` with the given input and state values.
+
+    Values of pattern-matching inputs and states are given already expanded,
+    and `outputs` must then be given too (see `pattern_id`).
+
+    Returns:
+        The Flask response and the elapsed time in seconds.
+    """
+    callback = app.callback_map[key]
+    if outputs is None:
+        outputs = parse_outputs(key)
+        outputs = outputs if len(outputs) > 1 else outputs[0]
+    trigger = callback["inputs"][0]
+    payload = {
+        "output": key,
+        "outputs": outputs,
+        "inputs": [_entry(item, value) for item, value in zip(callback["inputs"], inputs)],
+        "state": [_entry(item, value) for item, value in zip(callback["state"], state)],
+        "changedPropIds": changed if changed is not None else [f"{trigger['id']}.{trigger['property']}"],
+    }
+    start = time.perf_counter()
+    response = client.post("/_dash-update-component", json=payload, headers=headers)
+    return response, time.perf_counter() - start
+
+
+def percentile(values, q):
+    """Percentile `q` (0-100) of a list of timings, by nearest rank."""
+    ordered = sorted(values)
+    index = min(len(ordered) - 1, max(0, int(round(q / 100 * len(ordered) + 0.5)) - 1))
+    return ordered[index]
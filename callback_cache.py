@@ -0,0 +1,213 @@
+"""
+Mémoïsation des callbacks Dash qui ne dépendent que de leurs entrées et du jeu de données.
+"""
+import functools
+import hashlib
+import json
+import os
+import threading
+import time
+from collections import OrderedDict
+
+import dataset
+import metrics
+from plotly.io.json import to_json_plotly
+
+BACKEND = os.environ.get("CALLBACK_CACHE_BACKEND", "memory")
+CACHE_DIR = os.environ.get("CALLBACK_CACHE_DIR", os.path.join(dataset.CACHE_DIR, "callbacks"))
+MAXSIZE = int(os.environ.get("CALLBACK_CACHE_MAXSIZE", "512"))
+TTL = float(os.environ.get("CALLBACK_CACHE_TTL", "0"))
+
+_MISSING = object()
+
+
+def make_key(name, args, kwargs):
+    """
+    Clé d'un appel : nom de la fonction, arguments et version du jeu de données
+
+    Les arguments des callbacks sont des valeurs JSON (listes, dict, chaînes,
+    nombres), sérialisées pour obtenir une clé hashable.
+    """
+    payload = json.dumps([args, kwargs], sort_keys=True, default=str)
+    digest = hashlib.sha256(payload.encode("utf-8")).hexdigest()[:32]
+    return f"{name}-{dataset.get_version()}-{digest}"
+
+
+class MemoryBackend:
+    """
+    Cache LRU en mémoire, sûr entre threads
+
+    Args
+    ----
+    maxsize : int
+        Nombre maximal de résultats gardés
+    ttl : float
+        Durée de vie d'un résultat en secondes (0 : pas d'expiration)
+    """
+
+    def __init__(self, maxsize=MAXSIZE, ttl=TTL):
+        self.maxsize = maxsize
+        self.ttl = ttl
+        self.hits = 0
+        self.misses = 0
+        self._lock = threading.Lock()
+        self._entries = OrderedDict()
+
+    def get(self, key):
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is None or (self.ttl and time.monotonic() - entry[0] > self.ttl):
+                self.misses += 1
+                return _MISSING
+            self._entries.move_to_end(key)
+            self.hits += 1
+            return entry[1]
+
+    def set(self, key, value):
+        value = json.loads(to_json_plotly(value))
+        with self._lock:
+            self._entries[key] = (time.monotonic(), value)
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.maxsize:
+                self._entries.popitem(last=False)
+
+    def stats(self):
+        with self._lock:
+            return {"hits": self.hits, "misses": self.misses, "size": len(self._entries), "maxsize": self.maxsize}
+
+    def clear(self):
+        with self._lock:
+            self._entries.clear()
+            self.hits = 0
+            self.misses = 0
+
+
+class DiskBackend:
+    """
+    Cache sur disque partagé entre les workers (un fichier JSON par résultat)
+
+    Chaque résultat est écrit dans un fichier temporaire puis renommé, de
+    sorte qu'un worker ne lit jamais un fichier partiel. La date de
+    modification d'un fichier est mise à jour à chaque lecture : au-delà de
+    `maxsize` fichiers, les moins récemment utilisés sont supprimés.
+
+    Args
+    ----
+    directory : str
+        Dossier du cache
+    maxsize : int
+        Nombre maximal de résultats gardés
+    ttl : float
+        Durée de vie d'un résultat en secondes (0 : pas d'expiration)
+    """
+
+    def __init__(self, directory=CACHE_DIR, maxsize=MAXSIZE, ttl=TTL):
+        self.directory = directory
+        self.maxsize = maxsize
+        self.ttl = ttl
+        self.hits = 0
+        self.misses = 0
+
+    def _path(self, key):
+        return os.path.join(self.directory, f"{key}.json")
+
+    def get(self, key):
+        path = self._path(key)
+        try:
+            with open(path, encoding="utf-8") as file:
+                created = float(file.readline())
+                value = json.load(file)
+            if self.ttl and time.time() - created > self.ttl:
+                os.remove(path)
+                raise FileNotFoundError(path)
+            os.utime(path)
+        except (OSError, ValueError):
+            self.misses += 1
+            return _MISSING
+        self.hits += 1
+        return value
+
+    def set(self, key, value):
+        os.makedirs(self.directory, exist_ok=True)
+        path = self._path(key)
+        tmp_path = f"{path}.{os.getpid()}.{threading.get_ident()}.tmp"
+        with open(tmp_path, "w", encoding="utf-8") as file:
+            # Première ligne : date d'écriture (TTL), puis le résultat sérialisé
+            file.write(f"{time.time()}\n")
+            file.write(to_json_plotly(value))
+        os.replace(tmp_path, path)
+        self._prune()
+
+    def _prune(self):
+        entries = []
+        for name in os.listdir(self.directory):
+            if name.endswith(".json"):
+                path = os.path.join(self.directory, name)
+                try:
+                    entries.append((os.path.getmtime(path), path))
+                except OSError:
+                    pass
+        for _, path in sorted(entries)[:max(len(entries) - self.maxsize, 0)]:
+            try:
+                os.remove(path)
+            except OSError:
+                pass
+
+    def stats(self):
+        size = len([name for name in os.listdir(self.directory) if name.endswith(".json")]) if os.path.isdir(self.directory) else 0
+        return {"hits": self.hits, "misses": self.misses, "size": size, "maxsize": self.maxsize}
+
+    def clear(self):
+        if os.path.isdir(self.directory):
+            for name in os.listdir(self.directory):
+                if name.endswith(".json"):
+                    os.remove(os.path.join(self.directory, name))
+        self.hits = 0
+        self.misses = 0
+
+
+def make_backend(backend=BACKEND, maxsize=MAXSIZE, ttl=TTL):
+    """Crée un backend "memory" ou "disk"."""
+    if backend == "memory":
+        return MemoryBackend(maxsize=maxsize, ttl=ttl)
+    if backend == "disk":
+        return DiskBackend(maxsize=maxsize, ttl=ttl)
+    raise ValueError(f"Unknown callback cache backend: {backend!r} (expected 'memory' or 'disk')")
+
+
+def memoize(backend=None, maxsize=MAXSIZE, ttl=TTL):
+    """
+    Décorateur de mémoïsation des callbacks
+
+    À placer sous `@app.callback(...)`. Le backend utilisé est exposé dans
+    l'attribut `cache` de la fonction décorée.
+
+    Args
+    ----
+    backend : str or object, optional
+        "memory", "disk" ou un backend déjà créé (par défaut CALLBACK_CACHE_BACKEND)
+    maxsize : int, optional
+        Nombre maximal de résultats gardés
+    ttl : float, optional
+        Durée de vie d'un résultat en secondes (0 : pas d'expiration)
+    """
+    if backend is None or isinstance(backend, str):
+        backend = make_backend(backend or BACKEND, maxsize=maxsize, ttl=ttl)
+
+    def decorator(func):
+        name = f"{func.__module__}.{func.__qualname__}".replace("<locals>.", "")
+
+        @functools.wraps(func)
+        def wrapper(*args, **kwargs):
+            key = make_key(name, args, kwargs)
+            value = backend.get(key)
+            metrics.count_cache("callback", func.__module__, value is not _MISSING)
+            if value is _MISSING:
+                value = func(*args, **kwargs)
+                backend.set(key, value)
+            return value
+
+        wrapper.cache = backend
+        return wrapper
+
+    return decorator
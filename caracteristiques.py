@@ -5,36 +5,39 @@ from dash import State
 from dash import callback_context as ctx
 from dash import ctx, no_update
 
+import aggregates
+import dataset
+from callback_cache import memoize
 
 
-# dataset et caractéristiques audio
-dataset_path = "./dataset/spotify_songs_clean.csv"
+# caractéristiques audio
 carac_audio = [
     "danceability", "energy", "key", "loudness", "mode", 
     "speechiness", "acousticness", "instrumentalness", "liveness", "valence"
 ]
 
-def preprocess_data():
-    df = pd.read_csv(dataset_path)
-    
-    # Release date -> datetime et extract year
-    df["track_album_release_date"] = pd.to_datetime(df["track_album_release_date"], errors="coerce")
-    df["year"] = df["track_album_release_date"].dt.year
-    
-    # Garder les données après 1970
-    df = df[df["year"] >= 1970]
+def preprocess_data(cube=None):
+    # Cellules du cube d'agrégats (celui de la version actuelle par défaut) après 1970
+    cells = aggregates.get_cube() if cube is None else cube
+    cells = cells[cells["year"] >= 1970]
+    measures = ["track_popularity"] + carac_audio
     
     # Moyenne de popularite par an pour chaque caracteristique audio
-    grouped_df = df.groupby("year")[["track_popularity"] + carac_audio].mean().reset_index()
+    grouped_df = aggregates.aggregate(cells, ["year"], measures)[measures].reset_index()
     
     # On groupe par genre et par année
-    grouped_df_genre = df.groupby(["year", "playlist_genre"])[["track_popularity"] + carac_audio].mean().reset_index()
+    grouped_df_genre = aggregates.aggregate(cells, ["year", "playlist_genre"], measures)[measures].reset_index()
 
     return grouped_df,grouped_df_genre
 
-grouped_df,grouped_df_genre = preprocess_data()
+def get_grouped_data():
+    """
+    Moyennes par année, et par année et par genre (calculées une seule fois)
+    """
+    return dataset.get_snapshot().memo("caracteristiques.grouped_data", preprocess_data)
 
 def filter_df(year_range, genre):
+    grouped_df, grouped_df_genre = get_grouped_data()
     start_year, end_year = year_range
     if genre == "all":
         return grouped_df[(grouped_df["year"] >= start_year) & (grouped_df["year"] <= end_year)]
@@ -42,61 +45,64 @@ def filter_df(year_range, genre):
         filtered = grouped_df_genre[(grouped_df_genre["playlist_genre"] == genre)]
         return filtered[(filtered["year"] >= start_year) & (filtered["year"] <= end_year)]
 
-layout = html.Div([
-    html.H1("Évolution des caractéristiques audio et leur impact sur la popularité"),
-    html.Label("Sélectionnez un genre :"),
-    dcc.Dropdown(
-        id='genre-dropdown',
-        options=[{'label': 'Tous les genres', 'value': 'all'}] + [
-            {'label': genre, 'value': genre} for genre in sorted(grouped_df_genre['playlist_genre'].dropna().unique())
-        ],
-        value='all',
-        
-        clearable=False,
-        style={"width": "35%", "margin-bottom": "10px"},
-        className="custom-dropdown",
-    ),
-    html.Label("Sélectionnez l'intervalle de temps :"),
-    dcc.RangeSlider(
-        id="year-slider",
-        min=grouped_df["year"].min(),
-        max=grouped_df["year"].max(),
-        value=[1970, 2020],
-        marks={str(year): str(year) for year in range(grouped_df["year"].min(), grouped_df["year"].max()+1, 10)},
-        step=10,
-    ),
-
-                # Boutons centrés au-dessus du graphique
-                html.Div([
-                    html.Button("← Précédent", id="prev-button-q1", n_clicks=0, className='custom-button'),
-                    html.Button("Suivant →", id="next-button-q1", n_clicks=0, className='custom-button'),
-                    html.Div(id="page-indicator-q1", style={"padding": "0 20px", "color": "white"}),
-                ], style={
-                    'display': 'flex',
-                    'justifyContent': 'center',
-                    'gap': '20px',
-                    'marginTop': '20px',
-                    'marginBottom': '20px'
-                }),
-            # Analyse et texte
-            html.Div(
-                id="analysis-text-q1",
-                style={
-                    'color': 'white',
-                    'fontSize': '16px',
-                    'marginTop': '20px',
-                    'textAlign': 'center'
-                },
-                children="Pour les caractéristiques audio on remarque une très faible corrélation entre leur variations et celles de la popularité indiquant un rôle faible dans la popularité de la musique."
-            ),
-                
-                
-    html.Div(id="charts-container", style={"display": "grid", "grid-template-columns": "repeat(3, 1fr)", "gap": "20px"}),
-    dcc.Store(id='story-page-q1', data=1),
-    dcc.Store(id="features-store", data=carac_audio),
+def get_layout():
+    grouped_df, grouped_df_genre = get_grouped_data()
+
+    return html.Div([
+        html.H1("Évolution des caractéristiques audio et leur impact sur la popularité"),
+        html.Label("Sélectionnez un genre :"),
+        dcc.Dropdown(
+            id='genre-dropdown',
+            options=[{'label': 'Tous les genres', 'value': 'all'}] + [
+                {'label': genre, 'value': genre} for genre in sorted(grouped_df_genre['playlist_genre'].dropna().unique())
+            ],
+            value='all',
+            
+            clearable=False,
+            style={"width": "35%", "margin-bottom": "10px"},
+            className="custom-dropdown",
+        ),
+        html.Label("Sélectionnez l'intervalle de temps :"),
+        dcc.RangeSlider(
+            id="year-slider",
+            min=grouped_df["year"].min(),
+            max=grouped_df["year"].max(),
+            value=[1970, 2020],
+            marks={str(year): str(year) for year in range(grouped_df["year"].min(), grouped_df["year"].max()+1, 10)},
+            step=10,
+        ),
+
+                    # Boutons centrés au-dessus du graphique
+                    html.Div([
+                        html.Button("← Précédent", id="prev-button-q1", n_clicks=0, className='custom-button'),
+                        html.Button("Suivant →", id="next-button-q1", n_clicks=0, className='custom-button'),
+                        html.Div(id="page-indicator-q1", style={"padding": "0 20px", "color": "white"}),
+                    ], style={
+                        'display': 'flex',
+                        'justifyContent': 'center',
+                        'gap': '20px',
+                        'marginTop': '20px',
+                        'marginBottom': '20px'
+                    }),
+                # Analyse et texte
+                html.Div(
+                    id="analysis-text-q1",
+                    style={
+                        'color': 'white',
+                        'fontSize': '16px',
+                        'marginTop': '20px',
+                        'textAlign': 'center'
+                    },
+                    children="Pour les caractéristiques audio on remarque une très faible corrélation entre leur variations et celles de la popularité indiquant un rôle faible dans la popularité de la musique."
+                ),
+                    
+                    
+        html.Div(id="charts-container", style={"display": "grid", "grid-template-columns": "repeat(3, 1fr)", "gap": "20px"}),
+        dcc.Store(id='story-page-q1', data=1),
+        dcc.Store(id="features-store", data=carac_audio),
 
-    
-])
+        
+    ])
 
 # Register callbacks with the main app.
 def register_callbacks(app):
@@ -178,6 +184,7 @@ def register_callbacks(app):
         Input("genre-dropdown", "value"),
         Input("features-store", "data")
     )
+    @memoize()
     def update_charts(year_range, selected_genre, features):
         filtered_df = filter_df(year_range, selected_genre)
         charts = []
@@ -1,9 +1,11 @@
-import dash
 from dash import dcc, html, Input, Output, State
 import plotly.graph_objs as go
 import numpy as np
 import pandas as pd
 
+import dataset
+
+
 button_style = {
     'backgroundColor': '#222',
     'color': 'white',
@@ -17,17 +19,6 @@ button_style = {
 }
 
 
-# Load dataset
-def get_dataframe(path):
-    """Load and preprocess the Spotify dataset."""
-    data = pd.read_csv(path)
-    data["track_album_release_date"] = pd.to_datetime(data["track_album_release_date"])
-    data = data[data["track_album_release_date"].dt.year >= 1970]
-    return data
-
-# Load data
-data = get_dataframe("dataset/spotify_songs_clean.csv")
-
 # Taille de la matrice
 x_size = 10
 y_size = 6
@@ -37,23 +28,121 @@ y_labels = ["Pop", "Latin", "R&B", "Rap", "EDM", "Rock"][::-1]
 x_labels = ["loudness", "energy", "acousticness", "valence", "danceability", 
             "tempo", "instrumentalness", "duration_ms", "speechiness", "liveness"]
 
-# Default color mapping (white for 0, green for 1)
-color_map = {0: "white", 1: "#008000"}  # Green for 1, white for 0
+# Genres des lignes de la matrice (même ordre que y_labels)
+genres = ["pop", "latin", "r&b", "rap", "edm", "rock"][::-1]
 
-# Data matrix (Green = 1, White = 0)
-arr = np.array([[1,1,1,1,1,1,0,0,0,0],
-                [1,1,1,1,1,1,0,0,0,0],
-                [1,1,1,1,1,1,0,0,0,0],
-                [1,1,1,1,0,0,1,0,0,0],
-                [1,1,1,1,1,1,1,1,0,1],
-                [1,1,1,1,1,1,0,1,1,0]])[::-1].copy()
+# Une caractéristique est importante pour un genre si elle a une corrélation
+# d'au moins CORRELATION_THRESHOLD (en valeur absolue) avec une autre caractéristique,
+# parmi les TOP_N morceaux les plus populaires du genre
+CORRELATION_THRESHOLD = 0.2
+TOP_N = 1000
+# Coefficient de corrélation : "pearson" ou "spearman"
+CORRELATION_METHOD = "pearson"
 
-# Convert matrix values to colors
-borders_colors = np.vectorize(color_map.get)(arr)
-colors_inside = np.vectorize(color_map.get)(arr)
-
-def create_figure(borders_colors):
-    """Creates a new figure based on the color matrix."""
+# Default color mapping (white for 0, green for 1)
+color_map = {0: "white", 1: "#008000"}  # Green for 1, white for 0
+# Couleurs des bordures quand une colonne est sélectionnée (voir get_selection_colors)
+selection_color_map = {"selected": "#90EE90", "positive": "#66a3ff", "negative": "#ff9999"}
+# Toutes les couleurs de la matrice : la figure reçoit l'indice de la couleur de chaque case dans cette palette
+palette = list(color_map.values()) + list(selection_color_map.values())
+
+
+def compute_correlations(songs, top_n=TOP_N, method=CORRELATION_METHOD):
+    """
+    Matrices de corrélation des caractéristiques de chaque genre, calculées en une seule passe
+
+    Args
+    ----
+    songs : pd.DataFrame
+        Table des chansons
+    top_n : int
+        Nombre de morceaux les plus populaires retenus par genre
+    method : str
+        "pearson" ou "spearman"
+
+    Returns
+    -------
+    np.ndarray
+        Tableau (genre, caractéristique, caractéristique) dans l'ordre de genres et x_labels
+    """
+    if method not in ("pearson", "spearman"):
+        raise ValueError(f"Unknown correlation method: {method!r} (expected 'pearson' or 'spearman')")
+
+    # TOP_N morceaux les plus populaires de chaque genre (à popularité égale, l'ordre du jeu de données)
+    songs = songs[["playlist_genre", "track_popularity"] + x_labels]
+    top = songs[songs["playlist_genre"].isin(genres)].sort_values("track_popularity", ascending=False, kind="mergesort")
+    positions = top.groupby("playlist_genre", observed=True).cumcount().to_numpy()
+    top, positions = top[positions < top_n], positions[positions < top_n]
+    values = top[x_labels].astype("float64")
+    if method == "spearman":
+        # Rangs par genre de toutes les caractéristiques à la fois
+        values = values.groupby(top["playlist_genre"], observed=True).rank()
+
+    # Tableau (genre, morceau, caractéristique), complété par des NaN si un genre a moins de top_n morceaux
+    genre_codes = pd.Categorical(top["playlist_genre"], categories=genres).codes
+    stacked = np.full((len(genres), positions.max() + 1, len(x_labels)), np.nan)
+    stacked[genre_codes, positions] = values.to_numpy()
+
+    counts = np.bincount(genre_codes, minlength=len(genres))
+    centered = np.nan_to_num(stacked - np.nanmean(stacked, axis=1, keepdims=True))
+    covariance = np.einsum("gni,gnj->gij", centered, centered) / (counts - 1)[:, None, None]
+    std = np.sqrt(np.diagonal(covariance, axis1=1, axis2=2))
+    return covariance / (std[:, :, None] * std[:, None, :])
+
+def get_correlations(top_n=TOP_N, method=CORRELATION_METHOD):
+    """Matrices de corrélation (compute_correlations) de la version actuelle du jeu de données, calculées une seule fois."""
+    return dataset.get_snapshot().memo(
+        ("correlation.correlations", top_n, method),
+        lambda: compute_correlations(dataset.get_songs_since_1970(), top_n=top_n, method=method))
+
+def importance_matrix(correlations, threshold=CORRELATION_THRESHOLD):
+    """
+    Matrice (genre, caractéristique) : 1 si la caractéristique a une corrélation d'au moins
+    `threshold` en valeur absolue avec une autre caractéristique du genre, 0 sinon
+    """
+    strong = np.abs(correlations) >= threshold
+    features = np.arange(len(x_labels))
+    strong[:, features, features] = False
+    return strong.any(axis=2).astype(int)
+
+def get_colors():
+    """Couleurs des cases de la matrice (vert : caractéristique importante, blanc : insignifiante)."""
+    # Indexation d'un tableau de couleurs : np.vectorize prendrait la taille de chaîne de la première case
+    return np.array([color_map[0], color_map[1]])[importance_matrix(get_correlations())]
+
+def color_codes(colors):
+    """Indices dans `palette` des couleurs d'une matrice, à plat ligne par ligne."""
+    codes = {color: code for code, color in enumerate(palette)}
+    return np.array([codes[color] for color in np.ravel(colors)], dtype=np.int8)
+
+def create_figure(borders_colors, colors_inside=None, x_labels=x_labels, y_labels=y_labels):
+    """
+    Figure de la matrice, en une seule trace : les cases sont les marqueurs d'un nuage
+    de points, ligne par ligne (la case (ligne, colonne) est le point ligne * nb_colonnes + colonne)
+
+    Les couleurs sont envoyées comme indices dans `palette` avec une échelle de couleurs
+    discrète : des tableaux d'entiers plus légers que des chaînes, et que plotly n'a pas
+    à valider case par case.
+
+    Args
+    ----
+    borders_colors : np.ndarray
+        Couleurs des bordures (lignes, colonnes), parmi celles de `palette`
+    colors_inside : np.ndarray, optional
+        Couleurs de l'intérieur des cases (par défaut celles des bordures)
+    x_labels, y_labels : list of str, optional
+        Labels des colonnes et des lignes, pour des matrices d'une autre taille
+
+    Returns
+    -------
+    go.Figure
+        Figure de la matrice
+    """
+    if colors_inside is None:
+        colors_inside = borders_colors
+    rows, columns = np.shape(borders_colors)
+    # Les cases rapetissent quand la matrice dépasse la zone de tracé (660 x 460 px)
+    marker_size = max(min(45, int(0.7 * min(660 / columns, 460 / rows))), 2)
     fig = go.Figure(
         layout={
             'height': 500,
@@ -63,7 +152,7 @@ def create_figure(borders_colors):
                 'showgrid': False,
                 'zeroline': False,
                 'tickmode': 'array',
-                'tickvals': np.arange(x_size),
+                'tickvals': np.arange(columns),
                 'ticktext': x_labels,
                 'tickangle': -45,
                 'tickfont': {
@@ -75,7 +164,7 @@ def create_figure(borders_colors):
                 'showgrid': False,
                 'zeroline': False,
                 'tickmode': 'array',
-                'tickvals': np.arange(y_size),
+                'tickvals': np.arange(rows),
                 'ticktext': y_labels,
                 'tickfont': {
                     'size': 14,  # 👈 increase font size
@@ -87,156 +176,255 @@ def create_figure(borders_colors):
         }
     )
 
-    # Add scatter points for each column
-    for i in range(x_size):
-        fig.add_scatter(
-            x=np.ones(y_size) * i,
-            y=np.arange(y_size),
-            mode='markers',
-            hoverinfo="none",
-            marker={
-            'symbol': 'square',
-            'size': 45,
-            'color': colors_inside[:, i],
-            'showscale': False,
-            'line': {
-                'color': borders_colors[:, i],  # Couleur de la bordure
-                'width': 4  # Largeur de la bordure
-            }
-            },
-            showlegend=False
-        )
-    
+    # Une seule trace pour toute la matrice, quelle que soit sa taille
+    colorscale = [[code / (len(palette) - 1), color] for code, color in enumerate(palette)]
+    fig.add_scatter(
+        x=np.tile(np.arange(columns), rows),
+        y=np.repeat(np.arange(rows), columns),
+        mode='markers',
+        hoverinfo="none",
+        marker={
+        'symbol': 'square',
+        'size': marker_size,
+        'color': color_codes(colors_inside),
+        'colorscale': colorscale,
+        'cmin': 0,
+        'cmax': len(palette) - 1,
+        'showscale': False,
+        'line': {
+            'color': color_codes(borders_colors),  # Couleur de la bordure
+            'colorscale': colorscale,
+            'cmin': 0,
+            'cmax': len(palette) - 1,
+            'width': 4 if marker_size >= 20 else 1  # Largeur de la bordure
+        }
+        },
+        showlegend=False
+    )
+
     return fig
 
-# Dash layout
-layout = html.Div([
-    dcc.Store(id="color-store", data=borders_colors.tolist()),
-    dcc.Store(id="selected-column", data=None),
-    html.H1("Portraits sonores : comment chaque genre musical se distingue"),
-    html.Div(
-        dcc.Markdown("""
-        Une caractéristique est considérée comme importante si, au sein d’un même genre musical, elle présente une **corrélation d’au moins 0,2 en valeur absolue** avec une autre caractéristique, parmi les 1000 morceaux les plus populaires d'un genre."""),
-        style={'padding': '20px', 'backgroundColor': '#121212', 'borderRadius': '8px'}
-    ),
-    html.Div(  # Conteneur global
-        style={'display': 'flex', 'justifyContent': 'center', 'gap': '10px', 'alignItems': 'flex-start'},
-        children=[
-
-            # Légende à gauche
-            html.Div(
-                style={
-                    'flex': '1',
-                    'display': 'flex',
-                    'flexDirection': 'column',
-                    'gap': '25px',
-                    'color': 'white',
-                    'marginTop': '100px'
-                },
-                children=[
-                    html.Div([
-                        html.Strong("Importance de la caractéristique pour le genre", style={'marginBottom': '40px'}),
-                        html.Div(style={'display': 'flex', 'alignItems': 'center', 'gap': '10px', 'marginTop': '10px', 'marginBottom': '10px'}, children=[
-                            html.Div(style={'width': '15px', 'height': '15px', 'backgroundColor': '#008000'}),
-                            html.Span("Importante")
-                        ]),
-                        html.Div(style={'display': 'flex', 'alignItems': 'center', 'gap': '10px'}, children=[
-                            html.Div(style={'width': '15px', 'height': '15px', 'backgroundColor': 'white'}),
-                            html.Span("Insignifiante")
-                        ]),
-                    ], style={'marginBottom': '30px'}),
+# Analyses par caractéristique
+analyses = {
+    "loudness": "La loudness est un élément important pour tous les genres. Elle accompagne souvent l’énergie pour intensifier un morceau. Dans la Pop, le Latin ou le R&B, elle soutient des ambiances joyeuses, renforcées par une valence plus élevée. À l’inverse, la loudness s’atténue dans les morceaux plus acoustiques.",
+    "energy": "L’énergie constitue une caractéristique clé, notamment dans la Pop, le Latin et le R&B, où elle va de pair avec une forte loudness. Elle est généralement opposée à l’acousticness, révélant un contraste entre sons produits et ambiances acoustiques.",
+    "acousticness": "L’acousticness présente une corrélation négative avec l’énergie et le volume, traduisant une atmosphère plus douce et organique. Elle est peu présente dans les genres modernes et très produits comme l’EDM, la Pop ou le Rock.",
+    "valence": "La valence, reflet de la positivité émotionnelle, est une variable influente dans tous les genres. Elle est souvent renforcée par l’énergie et la danceability, ce qui en fait un indicateur clé des morceaux joyeux et entraînants.",
+    "danceability": "La danceability est largement valorisée dans la plupart des genres, sauf le Rap, pour générer une ambiance positive. En R&B, elle occupe une place centrale et dépend de multiples facteurs comme l’énergy ou la loudness, illustrant une richesse musicale.",
+    "tempo": "Le tempo intervient comme un facteur structurant dans tous les styles, à l’exception du Rap. Un rythme trop rapide peut limiter la danceability dans certains genres (Pop, Latin, EDM), mais dans l’EDM, il soutient directement l’energy.",
+    "instrumentalness": "L’instrumentalness se révèle importante dans l’EDM et le Rap, bien que de façon opposée : l’EDM favorise les sons artificiels puissants, tandis que le Rap alterne entre morceaux vocaux dominants et productions plus instrumentales.",
+    "duration_ms": "La durée des morceaux joue un rôle secondaire, sauf en EDM et en Rock. Dans ces styles, des morceaux plus courts peuvent amplifier l’impact sonore et émotionnel, en accentuant la puissance ou la positivité du morceau.",
+    "speechiness": "La speechiness est une dimension particulièrement marquée dans le Rock, où les passages parlés apportent intensité et énergie. Elle contribue à renforcer le lien avec l’auditeur.",
+    "liveness": "L’EDM se distingue par sa liveness, suggérant une forte interaction avec le public. Cela renforce l’effet de loudness et d’énergy, en particulier lorsqu’une ambiance de concert est recréée à l’écoute."
+}
 
-                    html.Div([
-                        html.Strong("Corrélations entre les caractéristiques", style={'marginTop':'30px', 'marginBottom': '40px'}),
-                        html.Div(style={'display': 'flex', 'alignItems': 'center', 'gap': '10px', 'marginTop': '10px', 'marginBottom': '10px'}, children=[
-                            html.Div(style={'width': '15px', 'height': '15px', 'border':'3px solid #90EE90','boxSizing': 'border-box'}),
-                            html.Span("Caractéristique sélectionnée")
-                        ]),
-                        html.Div(style={'display': 'flex', 'alignItems': 'center', 'gap': '10px', 'marginBottom': '10px'}, children=[
-                            html.Div(style={'width': '15px', 'height': '15px', 'border': '3px solid #66a3ff','boxSizing': 'border-box'}),
-                            html.Span("Forte corrélation positive (> 0.2)")
-                        ]),
-                        html.Div(style={'display': 'flex', 'alignItems': 'center', 'gap': '10px', 'marginBottom': '10px'}, children=[
-                            html.Div(style={'width': '15px', 'height': '15px', 'border': '3px solid #ff9999','boxSizing': 'border-box'}),
-                            html.Span("Forte corrélation négative (< -0.2)")
+def get_selection_colors(colors, selected_column):
+    """
+    Couleurs des bordures quand une colonne est sélectionnée : la colonne en vert clair et,
+    pour chaque genre, les caractéristiques importantes fortement corrélées en bleu (positive) ou en rouge (négative)
+    """
+    selected_colors = colors.copy()
+
+    selected_correlations = get_correlations()[:, selected_column, :]
+    strong = (np.abs(selected_correlations) >= CORRELATION_THRESHOLD) & (selected_colors != "white")
+    strong[:, selected_column] = False
+    selected_colors[strong & (selected_correlations > 0)] = selection_color_map["positive"]
+    selected_colors[strong & (selected_correlations <= 0)] = selection_color_map["negative"]
+
+    column_colors = selected_colors[:, selected_column]  # vue sur la colonne sélectionnée
+    column_colors[column_colors != "white"] = selection_color_map["selected"]
+    return selected_colors
+
+def get_navigation_states():
+    """
+    États de la navigation dans la matrice : aucune colonne sélectionnée, puis chaque colonne
+
+    Returns
+    -------
+    dict
+        Couleurs des bordures sans sélection, en indices de `palette` à plat ligne par ligne ("colors"),
+        et pour chaque état ("states") : colonne sélectionnée ("column"), texte affiché ("display"),
+        cases dont la couleur change ("changes", liste de [indice de la case, indice de la couleur])
+        et analyse ("analysis")
+    """
+    colors = get_colors()
+    codes = color_codes(colors)
+    states = [{
+        "column": None,
+        "display": "Explorez avec les flèches",
+        "changes": [],
+        "analysis": "La pop, latin et R&B partagent des caractéristiques communes, tandis que les autres genres se distinguent davantage par des particularités propres."
+    }]
+    for column, characteristic in enumerate(x_labels):
+        selected_codes = color_codes(get_selection_colors(colors, column))
+        changed = np.flatnonzero(selected_codes != codes)
+        states.append({
+            "column": column,
+            "display": characteristic.capitalize(),
+            "changes": [[int(index), int(selected_codes[index])] for index in changed],
+            "analysis": analyses.get(characteristic, "")
+        })
+    return {"colors": codes.tolist(), "states": states}
+
+# Dash layout
+def get_layout():
+    colors = get_colors()
+    threshold = f"{CORRELATION_THRESHOLD:g}"
+
+    return html.Div([
+        dcc.Store(id="navigation-states", data=get_navigation_states()),
+        dcc.Store(id="selected-column", data=None),
+        html.H1("Portraits sonores : comment chaque genre musical se distingue"),
+        html.Div(
+            dcc.Markdown(f"""
+        Une caractéristique est considérée comme importante si, au sein d’un même genre musical, elle présente une **corrélation d’au moins {threshold.replace(".", ",")} en valeur absolue** avec une autre caractéristique, parmi les {TOP_N} morceaux les plus populaires d'un genre."""),
+            style={'padding': '20px', 'backgroundColor': '#121212', 'borderRadius': '8px'}
+        ),
+        html.Div(  # Conteneur global
+            style={'display': 'flex', 'justifyContent': 'center', 'gap': '10px', 'alignItems': 'flex-start'},
+            children=[
+
+                # Légende à gauche
+                html.Div(
+                    style={
+                        'flex': '1',
+                        'display': 'flex',
+                        'flexDirection': 'column',
+                        'gap': '25px',
+                        'color': 'white',
+                        'marginTop': '100px'
+                    },
+                    children=[
+                        html.Div([
+                            html.Strong("Importance de la caractéristique pour le genre", style={'marginBottom': '40px'}),
+                            html.Div(style={'display': 'flex', 'alignItems': 'center', 'gap': '10px', 'marginTop': '10px', 'marginBottom': '10px'}, children=[
+                                html.Div(style={'width': '15px', 'height': '15px', 'backgroundColor': '#008000'}),
+                                html.Span("Importante")
+                            ]),
+                            html.Div(style={'display': 'flex', 'alignItems': 'center', 'gap': '10px'}, children=[
+                                html.Div(style={'width': '15px', 'height': '15px', 'backgroundColor': 'white'}),
+                                html.Span("Insignifiante")
+                            ]),
+                        ], style={'marginBottom': '30px'}),
+
+                        html.Div([
+                            html.Strong("Corrélations entre les caractéristiques", style={'marginTop':'30px', 'marginBottom': '40px'}),
+                            html.Div(style={'display': 'flex', 'alignItems': 'center', 'gap': '10px', 'marginTop': '10px', 'marginBottom': '10px'}, children=[
+                                html.Div(style={'width': '15px', 'height': '15px', 'border':'3px solid #90EE90','boxSizing': 'border-box'}),
+                                html.Span("Caractéristique sélectionnée")
+                            ]),
+                            html.Div(style={'display': 'flex', 'alignItems': 'center', 'gap': '10px', 'marginBottom': '10px'}, children=[
+                                html.Div(style={'width': '15px', 'height': '15px', 'border': '3px solid #66a3ff','boxSizing': 'border-box'}),
+                                html.Span(f"Forte corrélation positive (> {threshold})")
+                            ]),
+                            html.Div(style={'display': 'flex', 'alignItems': 'center', 'gap': '10px', 'marginBottom': '10px'}, children=[
+                                html.Div(style={'width': '15px', 'height': '15px', 'border': '3px solid #ff9999','boxSizing': 'border-box'}),
+                                html.Span(f"Forte corrélation négative (< -{threshold})")
+                            ])
                         ])
-                    ])
-                ]
-            ),
+                    ]
+                ),
 
-            # Colonne centrale (boutons + graphique)
-            html.Div([
+                # Colonne centrale (boutons + graphique)
                 html.Div([
-                    html.Button("⬅", id="prev-button", n_clicks=0,
-                                style={
-                                    'backgroundColor': 'transparent',
-                                    'border': 'none',
-                                    'color': '#1DB954',
-                                    'fontWeight': 'bold',
-                                    'fontSize': '24px',
-                                    'cursor': 'pointer',
-                                    'color': '#1DB954'
-                                }),
-
-                    html.Div(id='selected-feature-display', style={
-                        'color': 'white',
-                        'fontWeight': 'bold',
-                        'fontSize': '16px',
-                        'padding': '0 20px',
+                    html.Div([
+                        html.Button("⬅", id="prev-button", n_clicks=0,
+                                    style={
+                                        'backgroundColor': 'transparent',
+                                        'border': 'none',
+                                        'color': '#1DB954',
+                                        'fontWeight': 'bold',
+                                        'fontSize': '24px',
+                                        'cursor': 'pointer',
+                                        'color': '#1DB954'
+                                    }),
+
+                        html.Div(id='selected-feature-display', style={
+                            'color': 'white',
+                            'fontWeight': 'bold',
+                            'fontSize': '16px',
+                            'padding': '0 20px',
+                            'display': 'flex',
+                            'alignItems': 'center',
+                            'justifyContent': 'center',
+                            'minWidth': '150px',  # Pour garder un bel espace au centre
+                            'textAlign': 'center',
+                            'width': '220px'
+                        }),
+
+                        html.Button("➡", id="next-button", n_clicks=0,
+                                    style={
+                                        'backgroundColor': 'transparent',
+                                        'border': 'none',
+                                        'color': '#1DB954',
+                                        'fontWeight': 'bold',
+                                        'fontSize': '24px',
+                                        'cursor': 'pointer',
+                                        'color': '#1DB954'
+                                    }),
+                    ], style={
+                        'flex': '2',
                         'display': 'flex',
-                        'alignItems': 'center',
                         'justifyContent': 'center',
-                        'minWidth': '150px',  # Pour garder un bel espace au centre
-                        'textAlign': 'center',
-                        'width': '220px'
+                        'gap': '20px',
+                        'marginBottom': '20px'
                     }),
-
-                    html.Button("➡", id="next-button", n_clicks=0,
-                                style={
-                                    'backgroundColor': 'transparent',
-                                    'border': 'none',
-                                    'color': '#1DB954',
-                                    'fontWeight': 'bold',
-                                    'fontSize': '24px',
-                                    'cursor': 'pointer',
-                                    'color': '#1DB954'
-                                }),
-                ], style={
-                    'flex': '2',
-                    'display': 'flex',
-                    'justifyContent': 'center',
-                    'gap': '20px',
-                    'marginBottom': '20px'
-                }),
-                
-
-                # Graphique
-                dcc.Graph(
-                    id="music-matrix",
-                    figure=create_figure(borders_colors),   
-                    config={'staticPlot': True}
+                    
+
+                    # Graphique
+                    dcc.Graph(
+                        id="music-matrix",
+                        figure=create_figure(colors),   
+                        config={'staticPlot': True}
+                    )
+                ]),
+
+                # Analyse à droite
+                html.Div(
+                    id="analysis-text",
+                    style={
+                        'flex': '1',
+                        'width': '500px',
+                        'color': 'white',
+                        'fontSize': '16px',
+                        'marginTop': '100px'
+                    },
+                    children="Les genres pop, latin et R&B partagent des caractéristiques communes, tandis que les autres genres se distinguent davantage par des particularités propres."
                 )
-            ]),
-
-            # Analyse à droite
-            html.Div(
-                id="analysis-text",
-                style={
-                    'flex': '1',
-                    'width': '500px',
-                    'color': 'white',
-                    'fontSize': '16px',
-                    'marginTop': '100px'
-                },
-                children="Les genres pop, latin et R&B partagent des caractéristiques communes, tandis que les autres genres se distinguent davantage par des particularités propres."
-            )
-        ]
-    )
-])
+            ]
+        )
+    ])
 
 
 def register_callbacks(app):
-    @app.callback(
+    # Navigation entre les colonnes de la matrice, côté client : les couleurs et les textes
+    # de chaque état sont précalculés par le serveur (get_navigation_states)
+    app.clientside_callback(
+        """
+        function(prevClicks, nextClicks, selectedColumn, navigation, figure) {
+            const ctx = dash_clientside.callback_context;
+            const trigger = ctx.triggered.length ? ctx.triggered[0].prop_id.split(".")[0] : null;
+            const states = navigation.states;
+
+            // État 0 : aucune colonne sélectionnée, état i + 1 : colonne i
+            const current = (selectedColumn === null || selectedColumn === undefined) ? 0 : selectedColumn + 1;
+            let index = 0;
+            if (trigger === "prev-button") {
+                index = (current - 1 + states.length) % states.length;
+            } else if (trigger === "next-button") {
+                index = (current + 1) % states.length;
+            }
+            const state = states[index];
+
+            // Seules les couleurs des bordures de l'unique trace changent d'un état à l'autre
+            const colors = navigation.colors.slice();
+            state.changes.forEach(function (change) { colors[change[0]] = change[1]; });
+            const trace = figure.data[0];
+            const marker = Object.assign({}, trace.marker, {line: Object.assign({}, trace.marker.line, {color: colors})});
+            const data = [Object.assign({}, trace, {marker: marker})];
+            return [state.display, Object.assign({}, figure, {data: data}), state.column, state.analysis];
+        }
+        """,
         Output("selected-feature-display", "children"),
         Output("music-matrix", "figure"),
         Output("selected-column", "data"),
@@ -244,147 +432,6 @@ def register_callbacks(app):
         Input("prev-button", "n_clicks"),
         Input("next-button", "n_clicks"),
         State("selected-column", "data"),
-        State("color-store", "data")
+        State("navigation-states", "data"),
+        State("music-matrix", "figure")
     )
-    def navigate_columns(prev_clicks, next_clicks, selected_column, stored_colors):
-        stored_colors = np.array(stored_colors)
-
-        all_columns = [None] + list(range(len(x_labels)))
-        ctx = dash.callback_context
-        button_id = ctx.triggered[0]["prop_id"].split(".")[0] if ctx.triggered else None
-        current_index = all_columns.index(selected_column)
-
-        if button_id == "prev-button":
-            new_index = (current_index - 1) % len(all_columns)
-        elif button_id == "next-button":
-            new_index = (current_index + 1) % len(all_columns)
-        else:
-            new_index = 0
-
-        selected_column = all_columns[new_index]
-
-        if selected_column is None:
-            return (
-                "Explorez avec les flèches",
-                create_figure(stored_colors),
-                None,
-                "La pop, latin et R&B partagent des caractéristiques communes, tandis que les autres genres se distinguent davantage par des particularités propres."
-            )
-        
-        selected_characteristic = x_labels[selected_column]
-        temp_colors = stored_colors.copy()
-
-        rock_idx = 0
-        edm_idx = 1
-        rap_idx = 2
-        rb_idx = 3
-        latin_idx = 4
-        pop_idx = 5
-
-        loudness_idx = x_labels.index("loudness")
-        energy_idx = x_labels.index("energy")
-        acousticness_idx = x_labels.index("acousticness")
-        valence_idx = x_labels.index("valence")
-        danceability_idx = x_labels.index("danceability")
-        tempo_idx = x_labels.index("tempo")
-        instrumentalness_idx = x_labels.index("instrumentalness")
-        duration_idx = x_labels.index("duration_ms")
-        speechiness_idx = x_labels.index("speechiness")
-        liveness_idx = x_labels.index("liveness")
-
-        correlations = {
-            pop_idx: {
-                (loudness_idx, energy_idx): 0.67,
-                (acousticness_idx, energy_idx): -0.53,
-                (acousticness_idx, loudness_idx): -0.36,
-                (valence_idx, energy_idx): 0.36,
-                (valence_idx, danceability_idx): 0.34,
-                (valence_idx, loudness_idx): 0.28,
-                (tempo_idx, danceability_idx): -0.24
-            },
-            rap_idx: {
-                (loudness_idx, energy_idx): 0.69,
-                (instrumentalness_idx, loudness_idx): -0.42,
-                (instrumentalness_idx, energy_idx): -0.36,
-                (valence_idx, energy_idx): 0.35,
-                (instrumentalness_idx, acousticness_idx): 0.31,
-                (acousticness_idx, energy_idx): -0.3,
-                (acousticness_idx, loudness_idx): -0.26
-            },
-            rock_idx: {
-                (loudness_idx, energy_idx): 0.76,
-                (acousticness_idx, energy_idx): -0.62,
-                (valence_idx, danceability_idx): 0.53,
-                (acousticness_idx, loudness_idx): -0.49,
-                (energy_idx, speechiness_idx): 0.29,
-                (tempo_idx, danceability_idx): -0.25,
-                (speechiness_idx, loudness_idx): 0.22,
-                (duration_idx, valence_idx): -0.22,
-                (tempo_idx, speechiness_idx): 0.21
-            },
-            latin_idx: {
-                (loudness_idx, energy_idx): 0.7,
-                (acousticness_idx, energy_idx): -0.45,
-                (valence_idx, energy_idx): 0.4,
-                (acousticness_idx, loudness_idx): -0.33,
-                (valence_idx, danceability_idx): 0.32,
-                (valence_idx, loudness_idx): 0.29,
-                (tempo_idx, danceability_idx): -0.22
-            },
-            rb_idx: {
-                (loudness_idx, energy_idx): 0.68,
-                (acousticness_idx, energy_idx): -0.57,
-                (valence_idx, energy_idx): 0.43,
-                (valence_idx, danceability_idx): 0.42,
-                (acousticness_idx, loudness_idx): -0.4,
-                (acousticness_idx, danceability_idx): -0.37,
-                (valence_idx, loudness_idx): 0.24,
-                (energy_idx, danceability_idx): 0.23,
-                (tempo_idx, acousticness_idx): -0.22,
-                (loudness_idx, danceability_idx): 0.21
-            },
-            edm_idx: {
-                (loudness_idx, energy_idx): 0.66,
-                (acousticness_idx, energy_idx): -0.42,
-                (valence_idx, danceability_idx): 0.38,
-                (duration_idx, loudness_idx): -0.3,
-                (duration_idx, instrumentalness_idx): 0.28,
-                (acousticness_idx, loudness_idx): -0.25,
-                (instrumentalness_idx, loudness_idx): -0.21,
-                (tempo_idx, energy_idx): 0.21,
-                (liveness_idx, energy_idx): 0.22,
-                (loudness_idx, liveness_idx): 0.21
-            }
-        }
-
-        def update_colors(selected_characteristic, temp_colors):
-            selected_idx = x_labels.index(selected_characteristic)
-            for genre, correlations_dict in correlations.items():
-                for (feature1, feature2), value in correlations_dict.items():
-                    if selected_idx in (feature1, feature2):
-                        target_feature = feature2 if feature1 == selected_idx else feature1 
-                        if temp_colors[genre, target_feature] != "white":
-                            temp_colors[genre, target_feature] = "#66a3ff" if value > 0 else "#ff9999"
-        update_colors(selected_characteristic, temp_colors)
-
-        for y in range(y_size):
-            if temp_colors[y, selected_column] != "white":
-                temp_colors[y, selected_column] = "#90EE90"
-
-        # Analyses par caractéristique
-            analyses = {
-                "loudness": "La loudness est un élément important pour tous les genres. Elle accompagne souvent l’énergie pour intensifier un morceau. Dans la Pop, le Latin ou le R&B, elle soutient des ambiances joyeuses, renforcées par une valence plus élevée. À l’inverse, la loudness s’atténue dans les morceaux plus acoustiques.",
-                "energy": "L’énergie constitue une caractéristique clé, notamment dans la Pop, le Latin et le R&B, où elle va de pair avec une forte loudness. Elle est généralement opposée à l’acousticness, révélant un contraste entre sons produits et ambiances acoustiques.",
-                "acousticness": "L’acousticness présente une corrélation négative avec l’énergie et le volume, traduisant une atmosphère plus douce et organique. Elle est peu présente dans les genres modernes et très produits comme l’EDM, la Pop ou le Rock.",
-                "valence": "La valence, reflet de la positivité émotionnelle, est une variable influente dans tous les genres. Elle est souvent renforcée par l’énergie et la danceability, ce qui en fait un indicateur clé des morceaux joyeux et entraînants.",
-                "danceability": "La danceability est largement valorisée dans la plupart des genres, sauf le Rap, pour générer une ambiance positive. En R&B, elle occupe une place centrale et dépend de multiples facteurs comme l’énergy ou la loudness, illustrant une richesse musicale.",
-                "tempo": "Le tempo intervient comme un facteur structurant dans tous les styles, à l’exception du Rap. Un rythme trop rapide peut limiter la danceability dans certains genres (Pop, Latin, EDM), mais dans l’EDM, il soutient directement l’energy.",
-                "instrumentalness": "L’instrumentalness se révèle importante dans l’EDM et le Rap, bien que de façon opposée : l’EDM favorise les sons artificiels puissants, tandis que le Rap alterne entre morceaux vocaux dominants et productions plus instrumentales.",
-                "duration_ms": "La durée des morceaux joue un rôle secondaire, sauf en EDM et en Rock. Dans ces styles, des morceaux plus courts peuvent amplifier l’impact sonore et émotionnel, en accentuant la puissance ou la positivité du morceau.",
-                "speechiness": "La speechiness est une dimension particulièrement marquée dans le Rock, où les passages parlés apportent intensité et énergie. Elle contribue à renforcer le lien avec l’auditeur.",
-                "liveness": "L’EDM se distingue par sa liveness, suggérant une forte interaction avec le public. Cela renforce l’effet de loudness et d’énergy, en particulier lorsqu’une ambiance de concert est recréée à l’écoute."
-            }
-
-        analysis = analyses.get(selected_characteristic, "")
-
-        return selected_characteristic.capitalize(), create_figure(temp_colors), selected_column, analysis
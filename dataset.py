@@ -0,0 +1,610 @@
+"""
+Jeu de données des chansons, lu et nettoyé une fois puis partagé par les sections.
+"""
+import contextvars
+import glob
+import hashlib
+import os
+import threading
+
+import numpy as np
+import pandas as pd
+from pandas.api.types import is_integer_dtype, union_categoricals
+
+try:
+    import pyarrow as pa
+    from pyarrow import feather
+except ImportError:  # pragma: no cover - le cache est optionnel
+    feather = None
+
+DATASET_PATH = "./dataset/spotify_songs_clean.csv"
+CACHE_DIR = "./dataset/.cache"
+
+# Formats acceptés pour "track_album_release_date", du plus précis au moins précis
+RELEASE_DATE_FORMATS = {
+    "day": "%Y-%m-%d",
+    "month": "%Y-%m",
+    "year": "%Y",
+}
+
+# Caractéristiques audio continues, stockées en float32
+AUDIO_FEATURES = [
+    "danceability", "energy", "loudness", "speechiness", "acousticness",
+    "instrumentalness", "liveness", "valence", "tempo",
+]
+
+# Types compacts de la table partagée (voir apply_schema)
+SCHEMA = {
+    **dict.fromkeys([
+        "track_artist", "track_album_id", "track_album_name", "playlist_name",
+        "playlist_id", "playlist_genre", "playlist_subgenre", "release_date_precision",
+        "year_month",
+    ], "category"),
+    **dict.fromkeys(AUDIO_FEATURES, "float32"),
+    "key": "int8",
+    "mode": "int8",
+    "duration_ms": "int32",
+    "year": "int16",
+    "decade": "int16",
+    "year_group": "int16",
+}
+
+_lock = threading.Lock()
+# Instantané servi (voir Snapshot), remplacé d'un seul coup par set_snapshot
+_snapshot = None
+# Instantané épinglé par la requête ou la construction en cours (voir pin)
+_pinned = contextvars.ContextVar("dataset_snapshot", default=None)
+# Une seule mise à jour de l'instantané servi à la fois (ingest, reloader)
+update_lock = threading.Lock()
+
+
+def parse_release_dates(dates):
+    """
+    Convertit une colonne de dates de sortie en une seule passe vectorisée
+
+    Les valeurs sont classées selon leur forme (date complète "YYYY-MM-DD",
+    année et mois "YYYY-MM" ou année seule "YYYY") puis chaque groupe est
+    converti avec le format correspondant de RELEASE_DATE_FORMATS. Les dates
+    incomplètes sont ramenées au premier jour du mois ou de l'année.
+
+    Args
+    ----
+    dates : pd.Series
+        Dates de sortie sous forme de texte
+
+    Returns
+    -------
+    pd.Series
+        Dates converties (NaT si la valeur ne correspond à aucun format)
+    pd.Series
+        Précision de chaque date ("day", "month", "year" ou NaN si non convertie)
+    """
+    text = dates.astype(str)
+    separators = text.str.count("-").to_numpy()
+    parsed = np.full(len(dates), np.datetime64("NaT"), dtype="datetime64[ns]")
+    precision = np.full(len(dates), np.nan, dtype=object)
+
+    valid = dates.notna().to_numpy()
+    for name, n_separators in zip(RELEASE_DATE_FORMATS, (2, 1, 0)):
+        rows = np.flatnonzero(valid & (separators == n_separators))
+        if not len(rows):
+            continue
+        converted = pd.to_datetime(text.iloc[rows], format=RELEASE_DATE_FORMATS[name], errors="coerce")
+        converted = converted.to_numpy(dtype="datetime64[ns]")
+        matched = ~np.isnat(converted)
+        parsed[rows[matched]] = converted[matched]
+        precision[rows[matched]] = name
+
+    return pd.Series(parsed, index=dates.index), pd.Series(precision, index=dates.index)
+
+
+def count_release_date_precisions(precision):
+    """
+    Nombre de dates dans chaque précision ("invalid" pour les dates non converties)
+    """
+    counts = precision.fillna("invalid").value_counts()
+    return {name: int(counts.get(name, 0)) for name in list(RELEASE_DATE_FORMATS) + ["invalid"]}
+
+
+def apply_schema(data, schema=SCHEMA):
+    """
+    Convertit les colonnes de la table dans les types compacts de SCHEMA
+
+    Les colonnes entières contenant des valeurs manquantes utilisent le type
+    entier « nullable » de pandas correspondant (ex. "Int16" pour "int16").
+
+    Args
+    ----
+    data : pd.DataFrame
+        Table des chansons
+    schema : dict, optional
+        Type cible de chaque colonne
+
+    Returns
+    -------
+    pd.DataFrame
+        Table aux types compacts
+    """
+    dtypes = {}
+    for column, dtype in schema.items():
+        if column not in data:
+            continue
+        if dtype.startswith("int") and data[column].isna().any():
+            dtype = dtype.capitalize()
+        dtypes[column] = dtype
+    return data.astype(dtypes)
+
+
+def memory_report(before, after):
+    """
+    Compare la mémoire occupée par deux versions de la table, colonne par colonne
+
+    Returns
+    -------
+    pd.DataFrame
+        Octets avant et après, type de chaque colonne, avec une ligne "total"
+    """
+    report = pd.DataFrame({
+        "dtype_before": before.dtypes.astype(str),
+        "bytes_before": before.memory_usage(index=False, deep=True),
+        "dtype_after": after.dtypes.astype(str),
+        "bytes_after": after.memory_usage(index=False, deep=True),
+    })
+    report.loc["total"] = ["", report["bytes_before"].sum(), "", report["bytes_after"].sum()]
+    return report
+
+
+def load_songs(path=DATASET_PATH, compact=True):
+    """
+    Lit et nettoie le fichier CSV des chansons
+
+    Args
+    ----
+    path : str
+        Chemin du fichier CSV
+    compact : bool, optional
+        Applique les types compacts de SCHEMA (apply_schema)
+
+    Returns
+    -------
+    pd.DataFrame
+        Toutes les chansons, nettoyées (voir clean_songs)
+    """
+    return clean_songs(pd.read_csv(path), compact)
+
+
+def clean_songs(data, compact=True):
+    """
+    Nettoie des lignes lues du CSV des chansons
+
+    Args
+    ----
+    data : pd.DataFrame
+        Lignes brutes, avec les colonnes du CSV
+    compact : bool, optional
+        Applique les types compacts de SCHEMA (apply_schema)
+
+    Returns
+    -------
+    pd.DataFrame
+        Chansons avec la date de sortie convertie dans "track_album_release_date",
+        sa précision dans "release_date_precision" et les colonnes temporelles
+        dérivées : "year", "decade", "year_month" (texte "YYYY-MM") et "year_group"
+        (tranches de 3 ans)
+    """
+    data["track_album_release_date"], data["release_date_precision"] = parse_release_dates(data["track_album_release_date"])
+    data["year"] = data["track_album_release_date"].dt.year
+    data["decade"] = (data["year"] // 10) * 10
+    data["year_month"] = data["track_album_release_date"].dt.to_period("M").astype(str)
+    data["year_group"] = (data["year"] // 3) * 3
+    if compact:
+        data = apply_schema(data)
+    return data
+
+
+def coerce_batch(batch, songs):
+    """
+    Lot de nouvelles chansons (clean_songs) aux types de la table
+
+    Une colonne entière du lot qui contient des valeurs manquantes garde son type
+    (entier « nullable » d'apply_schema, ou flottant) : la concaténation l'étend à
+    la table, comme apply_schema sur le fichier complet. Une colonne catégorielle
+    prend les catégories de la table si le lot n'apporte pas de nouvelle valeur
+    (sinon voir concat_songs).
+
+    Args
+    ----
+    batch : pd.DataFrame
+        Nouvelles chansons nettoyées (clean_songs)
+    songs : pd.DataFrame
+        Table des chansons
+
+    Returns
+    -------
+    pd.DataFrame
+        Lot avec les colonnes de la table, dans le même ordre
+    """
+    batch = batch[songs.columns].copy(deep=False)
+    for column, dtype in songs.dtypes.items():
+        values = batch[column]
+        if isinstance(dtype, pd.CategoricalDtype):
+            if not isinstance(values.dtype, pd.CategoricalDtype) or values.cat.categories is not dtype.categories:
+                categorical = pd.Categorical(values, dtype=dtype)
+                if np.array_equal(categorical.codes == -1, values.isna().to_numpy()):
+                    batch[column] = categorical
+        elif values.dtype != dtype and not (is_integer_dtype(dtype) and values.isna().any()):
+            batch[column] = values.astype(dtype)
+    return batch
+
+
+def concat_songs(songs, batches):
+    """
+    Table des chansons suivie de lots de nouvelles chansons
+
+    Les lots sont d'abord convertis aux types de la table (coerce_batch). Les
+    catégories ne sont réunies (union_categoricals, triées comme si la table
+    entière était convertie par apply_schema) que pour les colonnes où un lot
+    apporte de nouvelles valeurs ; sinon les codes sont simplement mis bout à bout.
+
+    Args
+    ----
+    songs : pd.DataFrame
+        Table complète des chansons
+    batches : list of pd.DataFrame
+        Nouvelles chansons nettoyées (clean_songs), indexées à la suite de la table
+
+    Returns
+    -------
+    pd.DataFrame
+        Nouvelle table (la table d'origine n'est pas modifiée)
+    """
+    batches = [coerce_batch(batch, songs) for batch in batches]
+    columns = {}
+    for column, dtype in songs.dtypes.items():
+        parts = [songs[column]] + [batch[column] for batch in batches]
+        if not isinstance(dtype, pd.CategoricalDtype):
+            columns[column] = pd.concat(parts, ignore_index=True).array
+        elif all(part.cat.categories is dtype.categories for part in parts):
+            # Catégories de la table (coerce_batch) : pas de comparaison ni de hachage des catégories
+            columns[column] = pd.Categorical.from_codes(np.concatenate([part.cat.codes for part in parts]), dtype=dtype)
+        else:
+            columns[column] = union_categoricals(parts, sort_categories=True)
+    return pd.DataFrame(columns, index=songs.index.append([batch.index for batch in batches]))
+
+
+def file_stat(path=DATASET_PATH):
+    """Taille et date de modification (ns) du CSV : un changement du fichier change ce couple."""
+    stat = os.stat(path)
+    return stat.st_size, stat.st_mtime_ns
+
+
+def file_digest(path=DATASET_PATH):
+    """
+    Empreinte SHA-256 du contenu du CSV (objet hashlib) : une copie complétée par
+    update(octets ajoutés) est l'empreinte du fichier agrandi, sans le relire
+    """
+    digest = hashlib.sha256()
+    with open(path, "rb") as file:
+        for chunk in iter(lambda: file.read(1 << 20), b""):
+            digest.update(chunk)
+    return digest
+
+
+def dataset_fingerprint(path=DATASET_PATH, digest=None):
+    """
+    Clé du cache : taille, date de modification et empreinte SHA-256 du CSV
+
+    Args
+    ----
+    path : str
+        Chemin du CSV
+    digest : hashlib object, optional
+        Empreinte du contenu actuel du fichier (file_digest), sinon le fichier est lu
+    """
+    stat = os.stat(path)
+    if digest is None:
+        digest = file_digest(path)
+    return f"{stat.st_size}-{stat.st_mtime_ns}-{digest.hexdigest()[:16]}"
+
+
+def get_cache_path(path=DATASET_PATH, cache_dir=CACHE_DIR, table="all", version=None):
+    """
+    Chemin du fichier Feather d'une table (voir TABLES) pour une version du CSV
+    (dataset_fingerprint, calculée si elle n'est pas donnée) et pour SCHEMA
+    """
+    if version is None:
+        version = dataset_fingerprint(path)
+    schema_key = hashlib.sha256(repr(sorted(SCHEMA.items())).encode()).hexdigest()[:8]
+    suffix = "" if table == "all" else f"-{table}"
+    return os.path.join(cache_dir, f"songs-{version}-{schema_key}{suffix}.feather")
+
+
+def _has_version(path, version):
+    # Taille et date du fichier toujours celles de la version (début de dataset_fingerprint)
+    return version.startswith("{}-{}-".format(*file_stat(path)))
+
+
+def build_cache(path=DATASET_PATH, cache_dir=CACHE_DIR, version=None):
+    """
+    Écrit la table nettoyée et ses sous-ensembles dans le cache Feather et supprime les versions périmées
+
+    Args
+    ----
+    path : str
+        Chemin du CSV
+    cache_dir : str
+        Répertoire du cache
+    version : str, optional
+        Version du CSV (dataset_fingerprint), calculée si elle n'est pas donnée
+
+    Returns
+    -------
+    str
+        Chemin du fichier de la table complète
+    pd.DataFrame
+        Table nettoyée
+    """
+    if version is None:
+        version = dataset_fingerprint(path)
+    data = load_songs(path)
+    cache_paths = [get_cache_path(path, cache_dir, name, version) for name in TABLES]
+    if not _has_version(path, version):
+        # Le CSV a changé depuis le calcul de la version : ces tables ne sont pas écrites sous son nom
+        return cache_paths[0], data
+    os.makedirs(cache_dir, exist_ok=True)
+    for name, table in _build_tables(data).items():
+        cache_path = get_cache_path(path, cache_dir, name, version)
+        # Écriture dans un fichier temporaire puis renommage : un autre worker ne lit jamais un fichier partiel
+        tmp_path = f"{cache_path}.{os.getpid()}.tmp"
+        # Sans compression et en un seul bloc par colonne : les colonnes lues sont des vues du fichier projeté
+        feather.write_feather(table, tmp_path, compression="uncompressed", chunksize=max(len(table), 1))
+        os.replace(tmp_path, cache_path)
+    for stale in glob.glob(os.path.join(cache_dir, "songs-*.feather")):
+        if stale not in cache_paths:
+            os.remove(stale)
+    return cache_paths[0], data
+
+
+def read_table(cache_path):
+    """
+    Table d'un fichier du cache, projeté en mémoire
+
+    Les colonnes numériques, les dates et les codes des catégories sont des vues
+    du fichier (sans copie) ; le texte reste dans les buffers Arrow du fichier.
+    """
+    table = feather.read_table(cache_path, memory_map=True)
+    return table.to_pandas(split_blocks=True, types_mapper={pa.string(): pd.StringDtype("pyarrow")}.get)
+
+
+def read_tables(path=DATASET_PATH, cache_dir=CACHE_DIR, version=None):
+    """
+    Tables nettoyées (voir _build_tables), lues depuis le cache Feather s'il est à jour
+
+    Le cache est reconstruit de façon transparente si le CSV a changé. Sans
+    pyarrow, ou si le cache ne peut pas être écrit, le CSV est lu directement.
+    La version du CSV (dataset_fingerprint) est calculée une seule fois si elle
+    n'est pas donnée.
+    """
+    if feather is None:
+        return _build_tables(load_songs(path))
+
+    if version is None:
+        version = dataset_fingerprint(path)
+    cache_paths = {name: get_cache_path(path, cache_dir, name, version) for name in TABLES}
+    if not all(os.path.exists(cache_path) for cache_path in cache_paths.values()):
+        try:
+            _, data = build_cache(path, cache_dir, version)
+        except OSError:
+            return _build_tables(load_songs(path))
+        if not all(os.path.exists(cache_path) for cache_path in cache_paths.values()):
+            return _build_tables(data)
+    return {name: read_table(cache_path) for name, cache_path in cache_paths.items()}
+
+
+def read_songs(path=DATASET_PATH, cache_dir=CACHE_DIR):
+    """Table nettoyée complète (voir read_tables)."""
+    return read_tables(path, cache_dir)["all"]
+
+
+def is_after_2000(songs):
+    """Chansons sorties après janvier 2000 (même filtre que la section évolutions)."""
+    return songs["track_album_release_date"].dt.to_period("M") > "2000-01"
+
+
+# Tables partagées : toutes les chansons et les sous-ensembles utilisés par les sections
+TABLES = ["all", "since_1970", "after_2000"]
+
+
+def _build_tables(songs):
+    return {
+        "all": songs,
+        # Conserver uniquement des dates supérieures à 1970
+        "since_1970": songs[songs["year"] >= 1970],
+        "after_2000": songs[is_after_2000(songs)],
+    }
+
+
+class Snapshot:
+    """
+    Une version du jeu de données : ses tables et les données que les sections en dérivent
+
+    Les valeurs dérivées (agrégats, index, tables des sections) sont gardées dans
+    l'instantané (voir memo) : remplacer l'instantané servi remplace d'un seul
+    coup les tables et tout ce qui en a été calculé.
+
+    Args
+    ----
+    version : str
+        Version du jeu de données (dataset_fingerprint)
+    tables : dict
+        Tables par nom (voir TABLES)
+    stat : tuple, optional
+        Taille et date de modification du CSV lu (file_stat)
+    digest : hashlib object, optional
+        Empreinte du contenu du CSV lu (file_digest), complétée lors d'un ajout (ingest.py)
+    batches : tuple of pd.DataFrame, optional
+        Lots de chansons ajoutés à la suite des tables (extend_snapshot), réunis
+        aux tables au premier usage (voir table)
+    """
+
+    def __init__(self, version, tables, stat=None, digest=None, batches=()):
+        self.version = version
+        self.tables = tables
+        self.stat = stat
+        self.digest = digest
+        self.batches = batches
+        self.memos = {}
+        self._lock = threading.RLock()
+
+    def __len__(self):
+        """Nombre de chansons, lots compris (sans réunir les tables)."""
+        return len(self.tables["all"]) + sum(len(batch) for batch in self.batches)
+
+    def table(self, name):
+        """Table `name` (voir TABLES), suivie des lots ajoutés."""
+        if not self.batches:
+            return self.tables[name]
+        return self.memo("dataset.tables", lambda: _build_tables(concat_songs(self.tables["all"], self.batches)))[name]
+
+    def memo(self, key, build):
+        """
+        Valeur dérivée `key` de l'instantané, calculée une seule fois par build()
+
+        build() est appelée avec l'instantané épinglé (voir pin) : les tables et
+        les autres valeurs dérivées qu'elle lit sont celles du même instantané.
+        """
+        try:
+            return self.memos[key]
+        except KeyError:
+            pass
+        with self._lock:
+            if key not in self.memos:
+                token = pin(self)
+                try:
+                    self.memos[key] = build()
+                finally:
+                    unpin(token)
+            return self.memos[key]
+
+
+def load_snapshot(path=DATASET_PATH, cache_dir=CACHE_DIR):
+    """Instantané du CSV, sans valeur dérivée (tables lues avec read_tables)."""
+    stat = file_stat(path)
+    digest = file_digest(path)
+    version = dataset_fingerprint(path, digest)
+    return Snapshot(version, read_tables(path, cache_dir, version), stat, digest)
+
+
+def get_served_snapshot():
+    """Instantané servi, chargé au premier usage."""
+    global _snapshot
+    snapshot = _snapshot
+    if snapshot is None:
+        with _lock:
+            if _snapshot is None:
+                _snapshot = load_snapshot()
+            snapshot = _snapshot
+    return snapshot
+
+
+def get_snapshot():
+    """Instantané épinglé par la requête en cours (voir pin), sinon l'instantané servi."""
+    snapshot = _pinned.get()
+    return get_served_snapshot() if snapshot is None else snapshot
+
+
+def set_snapshot(snapshot):
+    """
+    Remplace l'instantané servi (None : rechargé depuis le CSV au prochain usage)
+
+    Les requêtes en cours gardent l'instantané qu'elles ont épinglé.
+    """
+    global _snapshot
+    with _lock:
+        _snapshot = snapshot
+
+
+def pin(snapshot=None):
+    """
+    Épingle un instantané (par défaut l'instantané servi) dans le contexte courant :
+    jusqu'à unpin, toutes les lectures du jeu de données utilisent cet instantané
+
+    Returns
+    -------
+    contextvars.Token
+        Jeton à passer à unpin
+    """
+    return _pinned.set(get_served_snapshot() if snapshot is None else snapshot)
+
+
+def unpin(token):
+    """Rétablit l'instantané épinglé avant pin."""
+    _pinned.reset(token)
+
+
+def extend_snapshot(batch):
+    """
+    Instantané épinglé suivi d'un lot de nouvelles chansons, sans l'installer
+
+    Le lot est gardé à part, aux types de la table (coerce_batch) : les tables ne
+    sont réunies qu'au premier usage (Snapshot.table). Si celles de l'instantané
+    l'ont déjà été, le nouvel instantané part des tables réunies.
+
+    Args
+    ----
+    batch : pd.DataFrame
+        Nouvelles chansons nettoyées (clean_songs)
+
+    Returns
+    -------
+    Snapshot
+        Nouvel instantané, sans version ni valeur dérivée
+    """
+    snapshot = get_snapshot()
+    tables, batches = snapshot.tables, snapshot.batches
+    if "dataset.tables" in snapshot.memos:
+        tables, batches = snapshot.memos["dataset.tables"], ()
+    batch = coerce_batch(batch, tables["all"]).set_axis(pd.RangeIndex(len(snapshot), len(snapshot) + len(batch)))
+    return Snapshot(None, tables, batches=batches + (batch,))
+
+
+def get_version():
+    """
+    Version du jeu de données de l'instantané (voir dataset_fingerprint), utilisée
+    comme clé par les tables et figures dérivées.
+    """
+    return get_snapshot().version
+
+
+def _get_table(name):
+    # Copie superficielle : les colonnes ajoutées par une section ne fuient pas vers les autres
+    return get_snapshot().table(name).copy(deep=False)
+
+
+def get_songs():
+    """
+    Toutes les chansons du jeu de données.
+
+    La table est partagée par toutes les sections : elle doit être traitée en
+    lecture seule (filtrer ou ajouter des colonnes, mais ne pas modifier les
+    valeurs existantes).
+    """
+    return _get_table("all")
+
+
+def get_songs_since_1970():
+    """Chansons sorties à partir de 1970 (lecture seule, voir get_songs)."""
+    return _get_table("since_1970")
+
+
+def get_songs_after_2000():
+    """Chansons sorties après janvier 2000 (lecture seule, voir get_songs)."""
+    return _get_table("after_2000")
+
+
+if __name__ == "__main__":
+    if feather is None:
+        raise SystemExit("pyarrow est nécessaire pour construire le cache")
+    cache_path, songs = build_cache()
+    print(f"{len(songs)} chansons écrites dans {cache_path}")
+    print(f"Précision des dates de sortie : {count_release_date_precisions(songs['release_date_precision'])}")
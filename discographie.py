@@ -2,24 +2,12 @@ import plotly.graph_objects as go
 import pandas as pd
 from dash import dcc, html
 
+import dataset
+from figure_cache import figures
 
-def convert_date(date):
-    try:
-        # Format complet "%Y-%m-%d"
-        return pd.to_datetime(date, format="%Y-%m-%d")
-    except ValueError:
-        try:
-            # Format année seule "%Y", complété par "-01-01"
-            return pd.to_datetime(date, format="%Y") + pd.offsets.DateOffset(months=0, days=0)
-        except ValueError:
-            return pd.NaT
 
-
-def get_dataframe(path):
-    data = pd.read_csv(path)
-    data["track_album_release_date"] = data["track_album_release_date"].apply(convert_date)
-    data = data[data["track_album_release_date"].dt.year >= 1970] # On ne garde que les musiques après 1970, car il n'y a pas assez d'échantillons avant
-    return data
+def get_dataframe():
+    return dataset.get_songs_since_1970() # On ne garde que les musiques après 1970, car il n'y a pas assez d'échantillons avant
 
 def get_hover_template():
     return (
@@ -33,8 +21,8 @@ def get_hover_template():
     )
 
 def get_figure():
-    data = get_dataframe("./dataset/spotify_songs_clean.csv")
-    div_pop_df = data.groupby("track_artist").agg(nb_subgenres=("playlist_subgenre", "nunique"), mean_popularity=("track_popularity", "mean")).reset_index()
+    data = get_dataframe()
+    div_pop_df = data.groupby("track_artist", observed=True).agg(nb_subgenres=("playlist_subgenre", "nunique"), mean_popularity=("track_popularity", "mean")).sort_index().reset_index()
     div_pop_df = div_pop_df.groupby("nb_subgenres").agg(mean_popularity=("mean_popularity", "mean"), nb_artist=("track_artist", "count")).reset_index()
     div_pop_df = div_pop_df[div_pop_df["nb_artist"] > 4]
 
@@ -66,13 +54,17 @@ def get_figure():
     )
     return fig
 
-layout = html.Div([
-    html.H1("Impact d'une discographie variée sur la popularité"),
-    html.Div([
-        dcc.Graph(id="graph-q11", figure=get_figure()),
-    ], style={'width': '60%', 'display': 'inline-block'}),
-    html.Div([
-        dcc.Markdown("""
+def get_layout():
+    """
+    Layout de la section (la figure est lue dans le cache de figures)
+    """
+    return html.Div([
+        html.H1("Impact d'une discographie variée sur la popularité"),
+        html.Div([
+            dcc.Graph(id="graph-q11", figure=figures.get("discographie", (), get_figure)),
+        ], style={'width': '60%', 'display': 'inline-block'}),
+        html.Div([
+            dcc.Markdown("""
             Une discographie diversifiée (avec de nombreux sous-genres) semble impacter positivement la popularité. 
             On pourrait expliquer ce phénomène en supposant que ces artistes :
             - **s’adaptent à leur environnement** en explorant des sous-genres différents pour parfaire leurs musiques vis à vis de leurs auditoires.
@@ -80,14 +72,14 @@ layout = html.Div([
             
             Une majorité des artistes ne possède qu’un seul genre, montrant possiblement la difficulté à changer de style. Ils ont également en moyenne la **popularité** la plus faible.
             """, style={'backgroundColor': '#121212','fontSize': '16px',}),
-            html.Br(),
-            html.Br(),
-            html.Br(),
-            html.Br(),
-        dcc.Markdown("""
+                html.Br(),
+                html.Br(),
+                html.Br(),
+                html.Br(),
+            dcc.Markdown("""
             ### Attention cependant à la lecture de ce graphique!
             Un grand nombre de sous-genre peut signifier beaucoup de tests de la part des artistes en questions, mais pas forcément que ceux-ci ont fait un album complet de chaque genre.
         """, style={'backgroundColor': '#121212','fontSize': '16px',}),
-    ], style={'width': '40%', 'display': 'inline-block', 'verticalAlign': 'top', "marginTop": "100px", 'color': 'white'}),
-])
+        ], style={'width': '40%', 'display': 'inline-block', 'verticalAlign': 'top', "marginTop": "100px", 'color': 'white'}),
+    ])
 
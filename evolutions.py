@@ -1,116 +1,361 @@
+import numpy as np
 import pandas as pd
 import plotly.express as px
-from dash import dcc, html
-from dash.dependencies import Input, Output
+from dash import dcc, html, Patch
+from dash.dependencies import Input, Output, State
 from plotly.subplots import make_subplots
 import plotly.graph_objects as go
 
-def load_and_clean_data(filepath="./dataset/spotify_songs_clean.csv"):
-    df = pd.read_csv(filepath)
-    df = preprocess_dates(df)
-    return df
-
-def preprocess_dates(df):
-    df["track_album_release_date"] = pd.to_datetime(df["track_album_release_date"], errors='coerce') # conversion en datetime
-    df = df[df["track_album_release_date"].notna() & (df["track_album_release_date"].dt.month.notna())] 
-    df["year_month"] = df["track_album_release_date"].dt.to_period('M')
-    df = df[df["year_month"] > '2000-01'] # filtre pour ne garder que les dates après 2000
-    df["year_month"] = df["year_month"].astype(str)
-    return df
-
-def filter_popular_songs(df):
-    popularity_threshold = 50
+import aggregates
+import dataset
+import transport
+from callback_cache import memoize
+from figure_cache import figures
+
+features = ["danceability", "energy", "speechiness", "liveness", "valence", "loudness"]
+genres_couleurs = {
+    "rock": "#FF0000",       # Rouge
+    "latin": "#FFA500",      # Orange
+    "edm": "#f542f5",        # Rose
+    "rap": "#800080",        # Violet
+    "r&b": "#008000",        # Vert
+    "pop": "#ADD8E6"         # Bleu clair
+}
+feature_emojis = {
+    "danceability": "💃",
+    "energy": "⚡",
+    "speechiness": "🗣️",
+    "liveness": "🎤",
+    "valence": "😊",
+    "loudness": "🔊"
+}
+
+# Seuil de popularité des chansons retenues (strictement supérieur)
+popularity_threshold = 50
+
+def filter_popular_songs(cube=None):
     features = ["danceability", "energy", "speechiness", "liveness", "valence", "loudness"]
 
-    df["year_month"] = pd.to_datetime(df["year_month"])
-    df["year"] = df["year_month"].dt.year
-    df["year_group"] = (df["year"] // 3) * 3
-    
-    df_popular = df[df["track_popularity"] > popularity_threshold].groupby(["year_group", "playlist_genre"])[features].mean().reset_index()
+    # Chansons populaires sorties après 2000, lues dans le cube d'agrégats (celui de la version actuelle par défaut)
+    cells = aggregates.get_cube() if cube is None else cube
+    cells = cells[cells["after_2000"] & (cells["popularity_band"] > aggregates.popularity_band(popularity_threshold))]
+    df_popular = aggregates.aggregate(cells, ["year_group", "playlist_genre"], features)[features].reset_index()
     df_popular["year_group"] = pd.to_datetime(df_popular["year_group"], format='%Y')
     return df_popular.sort_values("year_group")
 
 def calculate_index(df_popular, base_year=1998):
+    """
+    Indice de chaque caractéristique par rapport à l'année de référence (base 100), par genre
+
+    Args
+    ----
+    df_popular : pd.DataFrame
+        Moyennes des caractéristiques par groupe d'années et par genre (filter_popular_songs)
+    base_year : int
+        Année de référence
+
+    Returns
+    -------
+    pd.DataFrame
+        Copie de df_popular avec une colonne "<caractéristique>_index" par caractéristique
+    """
     features = ["danceability", "energy", "speechiness", "liveness", "valence", "loudness"]
-    base_values = df_popular[df_popular["year_group"].dt.year == base_year]
-    for feature in features:
-        for genre in df_popular["playlist_genre"].unique():
-            base_value = base_values[base_values["playlist_genre"] == genre][feature].values[0]
-            df_popular.loc[(df_popular["playlist_genre"] == genre), f"{feature}_index"] = (
-                (df_popular[feature] / base_value) * 100
-            ) 
-    return df_popular
+    base_values = df_popular[df_popular["year_group"].dt.year == base_year].set_index("playlist_genre")[features]
+    # Valeurs de référence du genre de chaque ligne, divisées en une seule opération
+    base_values = base_values.reindex(df_popular["playlist_genre"]).to_numpy()
+
+    df_index = df_popular.copy()
+    df_index[[f"{feature}_index" for feature in features]] = (df_popular[features].to_numpy() / base_values) * 100
+    return df_index
 
 # data
-df = load_and_clean_data("./dataset/spotify_songs_clean.csv")
-df_popular = filter_popular_songs(df)
+def build_popular_songs(cube=None):
+    """
+    Chansons populaires et indices précalculés pour chaque position du slider
+
+    Returns
+    -------
+    pd.DataFrame
+        Moyennes des caractéristiques par groupe d'années et par genre (filter_popular_songs)
+    dict
+        Indices (calculate_index) par année de référence, de 3 ans en 3 ans
+    """
+    df_popular = filter_popular_songs(cube)
+    min_year = df_popular["year_group"].dt.year.min()
+    max_year = df_popular["year_group"].dt.year.max()
+    index_by_base_year = {base_year: calculate_index(df_popular, base_year=base_year) for base_year in range(min_year, max_year + 1, 3)}
+    return df_popular, index_by_base_year
+
+def update_popular_songs(popular_songs, cube, songs):
+    """
+    Chansons populaires et indices du slider (build_popular_songs) après l'ajout de chansons au cube
+
+    Seules les tranches de 3 ans des nouvelles chansons populaires sorties après 2000
+    changent : les indices dont l'année de référence est une de ces tranches sont
+    recalculés, les autres seulement sur les lignes de ces tranches. Si les lignes
+    (groupes d'années et genres) changent, tout est recalculé.
+
+    Args
+    ----
+    popular_songs : tuple
+        Chansons populaires et indices avant l'ajout (build_popular_songs)
+    cube : pd.DataFrame
+        Cube d'agrégats après l'ajout (voir aggregates.apply_batch)
+    songs : pd.DataFrame
+        Nouvelles chansons
+
+    Returns
+    -------
+    tuple
+        Mêmes valeurs que build_popular_songs(cube), aux arrondis des sommes près
+    """
+    features = ["danceability", "energy", "speechiness", "liveness", "valence", "loudness"]
+    previous, index_by_base_year = popular_songs
+    df_popular = filter_popular_songs(cube)
+    keys = ["year_group", "playlist_genre"]
+    if not df_popular[keys].equals(previous[keys]):
+        return build_popular_songs(cube)
+
+    popular = dataset.is_after_2000(songs) & (aggregates.popularity_band(songs["track_popularity"]) > aggregates.popularity_band(popularity_threshold))
+    year_groups = set(songs.loc[popular, "year_group"].astype(int))
+    years = df_popular["year_group"].dt.year.to_numpy()
+    genres = df_popular["playlist_genre"].to_numpy()
+    values = df_popular[features].to_numpy()
+    rows = np.flatnonzero(np.isin(years, list(year_groups)))
+    positions = {(year, genre): i for i, (year, genre) in enumerate(zip(years, genres))}
+    updated = {}
+    for base_year, df_index in index_by_base_year.items():
+        if base_year in year_groups:
+            df_index = calculate_index(df_popular, base_year=base_year)
+        elif len(rows):
+            # Lignes des tranches touchées, divisées par les valeurs de référence (inchangées) de leur genre
+            base = np.array([positions.get((base_year, genre), -1) for genre in genres[rows]])
+            base_values = np.where((base >= 0)[:, None], values[base], np.nan)
+            columns = [df_index.columns.get_loc(column) for column in features + [f"{feature}_index" for feature in features]]
+            df_index = df_index.copy()
+            df_index.iloc[rows, columns] = np.hstack([values[rows], values[rows] / base_values * 100])
+        updated[base_year] = df_index
+    return df_popular, updated
+
+def get_popular_songs():
+    """Chansons populaires et indices du slider (build_popular_songs, calculés une seule fois)."""
+    return dataset.get_snapshot().memo("evolutions.popular_songs", build_popular_songs)
+
+def get_index(base_year):
+    """Indices (calculate_index) pour une année de référence, précalculés pour les positions du slider."""
+    df_popular, index_by_base_year = get_popular_songs()
+    df_index = index_by_base_year.get(base_year)
+    if df_index is None:
+        df_index = calculate_index(df_popular, base_year=base_year)
+    return df_index
+
+def get_trace_genres():
+    """Genres des traces de chaque sous-graphique, dans l'ordre où create_figure les ajoute."""
+    df_popular, _ = get_popular_songs()
+    return list(df_popular["playlist_genre"].unique())
+
+def get_opacity(genre, selected_genre):
+    return 1.0 if selected_genre == 'all' or genre == selected_genre else 0.25
+
+def create_figure(base_year, selected_genre='all'):
+    """
+    Figure des indices des caractéristiques (2 x 3 sous-graphiques, une trace par genre)
+
+    Les traces sont ajoutées caractéristique par caractéristique, puis genre par genre
+    (get_trace_genres) : la trace de (caractéristique i, genre j) est data[i * nb_genres + j].
+    """
+    df_popular_updated = get_index(base_year)
+
+    #subplots
+    fig = make_subplots(
+        rows=2, 
+        cols=3,
+        subplot_titles=[
+            f"{feature_emojis[feature]} Évolution de {feature.capitalize()}" 
+            for feature in features
+        ],
+        vertical_spacing=0.15,
+        horizontal_spacing=0.1
+    )
     
-min_year = df_popular["year_group"].dt.year.min()
-max_year = df_popular["year_group"].dt.year.max()
+    #traces
+    for i, feature in enumerate(features):
+        row = (i // 3) + 1
+        col = (i % 3) + 1
+        
+        for genre in get_trace_genres():
+            genre_df = df_popular_updated[df_popular_updated["playlist_genre"] == genre]
 
-#layout
-layout = html.Div([
-    html.H1("Évolution des caractéristiques musicales pour tous les genres"),
-
-    html.Div([
-        dcc.RadioItems(
-            id='genre-selector',
-            options=[{'label': 'Tous', 'value': 'all'}] + [{'label': genre.capitalize(), 'value': genre} for genre in df_popular['playlist_genre'].unique()],
-            value='all',
-            labelStyle={
-                'display': 'inline-block',  # Ensure buttons are displayed inline
-                'marginRight': '10px',
-                'marginLeft': '10px',
-                'padding': '6px 10px',  # Ensure consistent left and right padding
-                'border': 'none',
-                'backgroundColor': '#1DB954',  # Default selected color
-                'color': '#1e1e1e',  # Default selected text color
-                'cursor': 'pointer',
-                'borderRadius': '5px',
-                'fontWeight': 'bold',
-                'transition': 'all 0.3s ease-in-out',
-                'whiteSpace': 'nowrap',
-            },
-            inputStyle={
-      
-                'appearance': 'none',
-                'width': '0',
-                'height': '0'
-            }
+            fig.add_trace(
+                go.Scatter(
+                    x=genre_df["year_group"],
+                    y=genre_df[f"{feature}_index"],
+                    name=genre,
+                    legendgroup=genre,
+                    showlegend=True if i == 0 else False,
+                    hovertemplate=f"<b>{genre}</b>: %{{y:.2f}}<extra></extra>",
+                    line=dict(width=2, color=genres_couleurs.get(genre, "#FFFFFF")),
+                    opacity=get_opacity(genre, selected_genre)
+                ),
+                row=row,
+                col=col
+            )
+        
+        # horizontal line
+        fig.add_hline(
+            y=100,
+            line_dash="dash",
+            line_color="gray",
+            row=row,
+            col=col
         )
-    ], style={'textAlign': 'center', 'marginBottom': '20px'}),  # Center align the buttons
-
-    html.Div(id="analysis-text-container", style={  
-        'color': 'white', 
-        'padding': '20px',
-        'textAlign': 'center',
-        'fontSize': '18px'
-    }),
-    html.Div(id='graphs-container'),
     
-    html.Div(
-        html.H4("Sélectionnez l'année de référence :"),
-        style={
-            'textAlign': 'center',
-            'color': 'white',
-            'marginTop': '20px',
-            'fontSize': '16px'
-        }
-    ),
     
-    html.Div(
-        dcc.Slider(
-            id='base-year-slider',
-            min=min_year,
-            max=max_year,
-            value=min_year,
-            marks={str(year): str(year) for year in range(min_year, max_year + 1, 3)},
-            step=3
+    fig.update_layout(
+        legend=dict(
+            orientation="h",
+            yanchor="bottom",
+            y=-0.2,
+            xanchor="center",
+            x=0.5,
+            title_text="Genres:",
+            font=dict(color="white") 
+        ),
+        dragmode=False,
+        height=800,
+        margin=dict(t=50, b=50),
+        hovermode="x unified",
+        plot_bgcolor='#121212',  
+        paper_bgcolor='#121212',  
+        font=dict(color="white") 
+    )
+    
+    for i, feature in enumerate(features):
+        row = (i // 3) + 1
+        col = (i % 3) + 1
+        fig.update_yaxes(
+            title_text=f"{feature.capitalize()} (%)", 
+            title_font=dict(color="white"),  
+            tickfont=dict(color="white"), 
+            showgrid=False, 
+            row=row, 
+            col=col
+        )
+        fig.update_xaxes(
+            title_text="Année", 
+            title_font=dict(color="white"), 
+            tickfont=dict(color="white"),  
+            showgrid=False,  
+            tickmode="array", 
+            tickvals=df_popular_updated["year_group"].dt.year.unique(),  
+            ticktext=[str(year) for year in df_popular_updated["year_group"].dt.year.unique()], 
+            row=row, 
+            col=col
+        )
+
+    return fig
+
+def get_opacity_patch(selected_genre, previous_genre):
+    """
+    Mise à jour partielle de la figure (dash.Patch) : opacité des seules traces
+    dont l'opacité change entre `previous_genre` et `selected_genre`
+    """
+    patch = Patch()
+    trace_genres = get_trace_genres()
+    for j, genre in enumerate(trace_genres):
+        opacity = get_opacity(genre, selected_genre)
+        if opacity != get_opacity(genre, previous_genre):
+            for i in range(len(features)):
+                patch["data"][i * len(trace_genres) + j]["opacity"] = opacity
+    return patch
+
+def get_index_patch(base_year):
+    """Mise à jour partielle de la figure (dash.Patch) : ordonnées des traces pour une autre année de référence."""
+    patch = Patch()
+    df_index = get_index(base_year)
+    trace_genres = get_trace_genres()
+    for j, genre in enumerate(trace_genres):
+        genre_df = df_index[df_index["playlist_genre"] == genre]
+        for i, feature in enumerate(features):
+            # Tableau typé base64 (comme dans les figures sérialisées par plotly) plutôt qu'une liste JSON
+            patch["data"][i * len(trace_genres) + j]["y"] = transport.typed_array(genre_df[f"{feature}_index"])
+    return patch
+
+#layout
+def get_layout():
+    df_popular, _ = get_popular_songs()
+    min_year = df_popular["year_group"].dt.year.min()
+    max_year = df_popular["year_group"].dt.year.max()
+
+    return html.Div([
+        html.H1("Évolution des caractéristiques musicales pour tous les genres"),
+
+        html.Div([
+            dcc.RadioItems(
+                id='genre-selector',
+                options=[{'label': 'Tous', 'value': 'all'}] + [{'label': genre.capitalize(), 'value': genre} for genre in df_popular['playlist_genre'].unique()],
+                value='all',
+                labelStyle={
+                    'display': 'inline-block',  # Ensure buttons are displayed inline
+                    'marginRight': '10px',
+                    'marginLeft': '10px',
+                    'padding': '6px 10px',  # Ensure consistent left and right padding
+                    'border': 'none',
+                    'backgroundColor': '#1DB954',  # Default selected color
+                    'color': '#1e1e1e',  # Default selected text color
+                    'cursor': 'pointer',
+                    'borderRadius': '5px',
+                    'fontWeight': 'bold',
+                    'transition': 'all 0.3s ease-in-out',
+                    'whiteSpace': 'nowrap',
+                },
+                inputStyle={
+          
+                    'appearance': 'none',
+                    'width': '0',
+                    'height': '0'
+                }
+            )
+        ], style={'textAlign': 'center', 'marginBottom': '20px'}),  # Center align the buttons
+
+        html.Div(id="analysis-text-container", style={  
+            'color': 'white', 
+            'padding': '20px',
+            'textAlign': 'center',
+            'fontSize': '18px'
+        }),
+        dcc.Store(id='evolutions-genre', data='all'),
+        html.Div([
+            dcc.Graph(
+                id='evolutions-graph',
+                figure=figures.get("evolutions", (min_year, 'all'), lambda: create_figure(min_year)),
+                style={'width': '100%', 'height': '800px'}
+            )
+        ], id='graphs-container'),
+        
+        html.Div(
+            html.H4("Sélectionnez l'année de référence :"),
+            style={
+                'textAlign': 'center',
+                'color': 'white',
+                'marginTop': '20px',
+                'fontSize': '16px'
+            }
+        ),
+        
+        html.Div(
+            dcc.Slider(
+                id='base-year-slider',
+                min=min_year,
+                max=max_year,
+                value=min_year,
+                marks={str(year): str(year) for year in range(min_year, max_year + 1, 3)},
+                step=3
+            ),
+            style={'width': '60%', 'margin': '0 auto'}  
         ),
-        style={'width': '60%', 'margin': '0 auto'}  
-    ),
 
-])
+    ])
 
 
 def register_callbacks(app):
@@ -127,127 +372,25 @@ def register_callbacks(app):
 
 
 
+    # Le choix d'un genre ne change que l'opacité des traces, et celui de l'année de
+    # référence que leurs ordonnées : la figure du layout est mise à jour par des Patch
     @app.callback(
     Output('analysis-text-container', 'children'),
-    Output('graphs-container', 'children'),
-    Input('base-year-slider', 'value'),
-    Input('genre-selector', 'value')
+    Output('evolutions-graph', 'figure', allow_duplicate=True),
+    Output('evolutions-genre', 'data'),
+    Input('genre-selector', 'value'),
+    State('evolutions-genre', 'data'),
+    prevent_initial_call='initial_duplicate'
     )
-    
-    
-
-    def update_graphs(base_year, selected_genre):
-        
+    def update_genre(selected_genre, previous_genre):
         selected_key = selected_genre if selected_genre in analyses else "tous"
-        analysis_text = analyses[selected_key]
-        
-        df_popular_updated = calculate_index(df_popular, base_year=base_year)
-        features = ["danceability", "energy", "speechiness", "liveness", "valence", "loudness"]
-        genres_couleurs = {
-            "rock": "#FF0000",       # Rouge
-            "latin": "#FFA500",      # Orange
-            "edm": "#f542f5",        # Rose
-            "rap": "#800080",        # Violet
-            "r&b": "#008000",        # Vert
-            "pop": "#ADD8E6"         # Bleu clair
-        }
-        
-        feature_emojis = {
-            "danceability": "💃",
-            "energy": "⚡",
-            "speechiness": "🗣️",
-            "liveness": "🎤",
-            "valence": "😊",
-            "loudness": "🔊"
-        }
-        
-        #subplots
-        fig = make_subplots(
-            rows=2, 
-            cols=3,
-            subplot_titles=[
-                f"{feature_emojis[feature]} Évolution de {feature.capitalize()}" 
-                for feature in features
-            ],
-            vertical_spacing=0.15,
-            horizontal_spacing=0.1
-        )
-        
-        #traces
-        for i, feature in enumerate(features):
-            row = (i // 3) + 1
-            col = (i % 3) + 1
-            
-            for genre in df_popular_updated["playlist_genre"].unique():
-                genre_df = df_popular_updated[df_popular_updated["playlist_genre"] == genre]
-                
-                opacity = 1.0 if selected_genre == 'all' or genre == selected_genre else 0.25
-
-                fig.add_trace(
-                    go.Scatter(
-                        x=genre_df["year_group"],
-                        y=genre_df[f"{feature}_index"],
-                        name=genre,
-                        legendgroup=genre,
-                        showlegend=True if i == 0 else False,
-                        hovertemplate=f"<b>{genre}</b>: %{{y:.2f}}<extra></extra>",
-                        line=dict(width=2, color=genres_couleurs.get(genre, "#FFFFFF")),
-                        opacity=opacity
-                    ),
-                    row=row,
-                    col=col
-                )
-            
-            # horizontal line
-            fig.add_hline(
-                y=100,
-                line_dash="dash",
-                line_color="gray",
-                row=row,
-                col=col
-            )
-        
-        
-        fig.update_layout(
-            legend=dict(
-                orientation="h",
-                yanchor="bottom",
-                y=-0.2,
-                xanchor="center",
-                x=0.5,
-                title_text="Genres:",
-                font=dict(color="white") 
-            ),
-            dragmode=False,
-            height=800,
-            margin=dict(t=50, b=50),
-            hovermode="x unified",
-            plot_bgcolor='#121212',  
-            paper_bgcolor='#121212',  
-            font=dict(color="white") 
-        )
-        
-        for i, feature in enumerate(features):
-            row = (i // 3) + 1
-            col = (i % 3) + 1
-            fig.update_yaxes(
-                title_text=f"{feature.capitalize()} (%)", 
-                title_font=dict(color="white"),  
-                tickfont=dict(color="white"), 
-                showgrid=False, 
-                row=row, 
-                col=col
-            )
-            fig.update_xaxes(
-                title_text="Année", 
-                title_font=dict(color="white"), 
-                tickfont=dict(color="white"),  
-                showgrid=False,  
-                tickmode="array", 
-                tickvals=df_popular_updated["year_group"].dt.year.unique(),  
-                ticktext=[str(year) for year in df_popular_updated["year_group"].dt.year.unique()], 
-                row=row, 
-                col=col
-            )
-            
-        return dcc.Markdown(analysis_text), html.Div([dcc.Graph(figure=fig, style={'width': '100%', 'height': '800px'})])
+        return dcc.Markdown(analyses[selected_key]), get_opacity_patch(selected_genre, previous_genre), selected_genre
+
+    @app.callback(
+    Output('evolutions-graph', 'figure'),
+    Input('base-year-slider', 'value'),
+    prevent_initial_call=True
+    )
+    @memoize()
+    def update_base_year(base_year):
+        return get_index_patch(base_year)
@@ -0,0 +1,102 @@
+"""
+Cache LRU des figures des sections, stockées en JSON plotly.
+"""
+import json
+import threading
+from collections import OrderedDict
+
+import dataset
+import metrics
+
+# Nombre maximal de figures gardées en cache
+DEFAULT_MAXSIZE = 256
+
+
+class FigureCache:
+    """
+    Cache LRU de figures sérialisées, sûr entre threads
+
+    Args
+    ----
+    maxsize : int
+        Nombre maximal de figures gardées en cache
+    """
+
+    def __init__(self, maxsize=DEFAULT_MAXSIZE):
+        self.maxsize = maxsize
+        self.hits = 0
+        self.misses = 0
+        self._lock = threading.Lock()
+        self._entries = OrderedDict()
+
+    def get(self, section, params, build):
+        """
+        Figure d'une section pour des paramètres donnés
+
+        Args
+        ----
+        section : str
+            Nom de la section (ex. "adaptation")
+        params : tuple
+            Paramètres (hashables) dont dépend la figure
+        build : callable
+            Fonction sans argument qui construit la figure (go.Figure) si elle n'est pas en cache
+
+        Returns
+        -------
+        dict
+            Nouvelle copie de la figure sérialisée ({"data": ..., "layout": ...})
+        """
+        key = (section, params, dataset.get_version())
+        with self._lock:
+            serialized = self._entries.get(key)
+            if serialized is not None:
+                self._entries.move_to_end(key)
+                self.hits += 1
+        metrics.count_cache("figure", section, serialized is not None)
+        if serialized is None:
+            # Construction hors du verrou : deux threads peuvent construire la même figure, le résultat est identique
+            serialized = build().to_json()
+            with self._lock:
+                self.misses += 1
+                self._entries[key] = serialized
+                self._entries.move_to_end(key)
+                while len(self._entries) > self.maxsize:
+                    self._entries.popitem(last=False)
+        return json.loads(serialized)
+
+    def put(self, section, params, serialized):
+        """
+        Ajoute une figure déjà sérialisée (ex. lue dans le bundle d'artefacts, voir artifacts.py)
+
+        Args
+        ----
+        section : str
+            Nom de la section
+        params : tuple
+            Paramètres (hashables) dont dépend la figure
+        serialized : str
+            JSON plotly de la figure
+        """
+        key = (section, params, dataset.get_version())
+        with self._lock:
+            self._entries[key] = serialized
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.maxsize:
+                self._entries.popitem(last=False)
+
+    def stats(self):
+        """Compteurs du cache : succès, échecs et nombre de figures gardées."""
+        with self._lock:
+            return {"hits": self.hits, "misses": self.misses, "size": len(self._entries), "maxsize": self.maxsize}
+
+    def clear(self):
+        """Vide le cache et remet les compteurs à zéro."""
+        with self._lock:
+            self._entries.clear()
+            self.hits = 0
+            self.misses = 0
+
+
+# Cache partagé par toutes les sections
+figures = FigureCache()
@@ -0,0 +1,31 @@
+"""
+Configuration gunicorn du mode multi-workers (voir README.md).
+"""
+import gc
+import os
+
+bind = f"0.0.0.0:{os.environ.get('PORT', '8050')}"
+workers = int(os.environ.get("WEB_CONCURRENCY", "4"))
+preload_app = os.environ.get("GUNICORN_PRELOAD", "1") != "0"
+timeout = 120
+
+# Pas de collecte dans le maître pendant le préchargement : les objets chargés restent groupés en mémoire
+if preload_app:
+    gc.disable()
+
+
+def when_ready(server):
+    """Maître, après le chargement de l'application et avant la création des workers."""
+    if preload_app:
+        import server as application  # pylint: disable=import-outside-toplevel
+        application.warm_up()
+        # Objets chargés exclus des collectes : un worker ne réécrit pas les pages partagées
+        gc.freeze()
+        gc.enable()
+
+
+def post_worker_init(worker):
+    """Worker prêt : sans préchargement, il charge lui-même les données des sections."""
+    if not preload_app:
+        import server as application  # pylint: disable=import-outside-toplevel
+        application.warm_up()
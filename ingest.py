@@ -0,0 +1,126 @@
+"""
+Ajout de nouvelles chansons au jeu de données et aux agrégats des sections, sans redémarrer.
+"""
+import io
+import time
+
+import pandas as pd
+
+import aggregates
+import caracteristiques
+import dataset
+import evolutions
+import pop_vs_duree
+
+
+def read_batch(rows, path=dataset.DATASET_PATH):
+    """
+    Lignes d'un lot telles qu'elles sont écrites dans le CSV, et relues comme lui
+
+    Args
+    ----
+    rows : pd.DataFrame
+        Nouvelles chansons, avec (au moins) les colonnes du CSV
+    path : str
+        Chemin du CSV
+
+    Returns
+    -------
+    str
+        Texte CSV du lot, sans en-tête
+    pd.DataFrame
+        Lignes relues depuis ce texte (mêmes valeurs qu'à la relecture du fichier complet)
+
+    Raises
+    ------
+    ValueError
+        S'il manque des colonnes du CSV
+    """
+    columns = list(pd.read_csv(path, nrows=0).columns)
+    missing = [column for column in columns if column not in rows]
+    if missing:
+        raise ValueError(f"Colonnes manquantes dans le lot : {', '.join(missing)}")
+    text = rows.to_csv(columns=columns, header=False, index=False, lineterminator="\n")
+    return text, pd.read_csv(io.StringIO(text), names=columns, header=None)
+
+
+def append_tracks(rows, path=dataset.DATASET_PATH):
+    """
+    Ajoute un lot de nouvelles chansons au jeu de données et aux agrégats des sections
+
+    Args
+    ----
+    rows : pd.DataFrame
+        Nouvelles chansons, avec les colonnes du CSV
+    path : str
+        Chemin du CSV
+
+    Returns
+    -------
+    dict
+        Nombre de chansons ajoutées ("tracks"), nouvelle version du jeu de données
+        ("version") et durée de l'ajout en secondes ("seconds")
+    """
+    start = time.perf_counter()
+    with dataset.update_lock:
+        text, raw = read_batch(rows, path)
+        if raw.empty:
+            return {"tracks": 0, "version": dataset.get_served_snapshot().version, "seconds": time.perf_counter() - start}
+        batch = dataset.clean_songs(raw)
+
+        # Agrégats de l'instantané servi (même si la requête appelante en a épinglé un autre), puis leurs deltas
+        served = dataset.get_served_snapshot()
+        token = dataset.pin(served)
+        try:
+            snapshot = _apply_batch(batch)
+        finally:
+            dataset.unpin(token)
+
+        # Empreinte du fichier agrandi : celle de l'instantané complétée par les octets ajoutés,
+        # sauf si le fichier a changé depuis qu'il a été lu
+        digest = served.digest.copy() if served.digest is not None and dataset.file_stat(path) == served.stat else None
+        written = text.encode("utf-8")
+        with open(path, "rb+") as file:
+            # Le fichier peut ne pas se terminer par un saut de ligne
+            file.seek(0, 2)
+            if file.tell():
+                file.seek(-1, 2)
+                if file.read(1) != b"\n":
+                    written = b"\n" + written
+            file.write(written)
+        if digest is None:
+            digest = dataset.file_digest(path)
+        else:
+            digest.update(written)
+        snapshot.stat = dataset.file_stat(path)
+        snapshot.digest = digest
+        snapshot.version = dataset.dataset_fingerprint(path, digest)
+        dataset.set_snapshot(snapshot)
+    return {"tracks": len(batch), "version": snapshot.version, "seconds": time.perf_counter() - start}
+
+
+def _apply_batch(batch):
+    """Nouvel instantané : instantané épinglé suivi du lot, et deltas de ses agrégats."""
+    cube, artist_decades = aggregates.get_cube(), aggregates.get_artist_decades()
+    duration_sums, density_grid = pop_vs_duree.get_duration_sums(), pop_vs_duree.get_density_grid()
+    popular_songs = evolutions.get_popular_songs()
+    # Version et date du fichier connues une fois le lot écrit (voir append_tracks)
+    snapshot = dataset.extend_snapshot(batch)
+    batch = snapshot.batches[-1]
+    # Table lue si des artistes changent de cohorte : celle du nouvel instantané, réunie une seule fois
+    token = dataset.pin(snapshot)
+    try:
+        cube, artist_decades = aggregates.apply_batch(cube, artist_decades, batch)
+    finally:
+        dataset.unpin(token)
+    duration_ms, popularity = batch["duration_ms"].to_numpy(), batch["track_popularity"].to_numpy()
+
+    snapshot.memos.update({
+        "aggregates.cube": cube,
+        "aggregates.artist_decades": artist_decades,
+        "caracteristiques.grouped_data": caracteristiques.preprocess_data(cube),
+        "evolutions.popular_songs": evolutions.update_popular_songs(popular_songs, cube, batch),
+        "pop_vs_duree.duration_sums": pop_vs_duree.merge_duration_sums(duration_sums, duration_ms, popularity),
+        "pop_vs_duree.density_grid": pop_vs_duree.add_to_density_grid(density_grid, duration_ms, popularity),
+    })
+    return snapshot
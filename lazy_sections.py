@@ -0,0 +1,46 @@
+"""
+Chargement paresseux des sections : leur layout est construit quand elles deviennent visibles.
+"""
+from dash import dcc, html, Input, Output, State, MATCH, no_update
+
+# Fonctions de construction du layout de chaque section, par nom de section
+SECTIONS = {}
+
+
+def lazy_section(name, get_layout):
+    """
+    Placeholder d'une section dont le layout est construit à la demande
+
+    Args
+    ----
+    name : str
+        Nom de la section
+    get_layout : callable
+        Fonction sans argument qui retourne le layout de la section
+
+    Returns
+    -------
+    html.Div
+        Conteneur de la section, qui ne contient d'abord qu'un message de chargement
+    """
+    SECTIONS[name] = get_layout
+    return html.Div(
+        id={"type": "lazy-section", "index": name},
+        children=html.Div([
+            dcc.Store(id={"type": "lazy-visible", "index": name}, data=False),
+            html.Div("Chargement de la section…", style={"color": "#b3b3b3", "textAlign": "center", "paddingTop": "100px"}),
+        ], className="lazy-placeholder", **{"data-section": name}, style={"minHeight": "600px"}),
+    )
+
+
+def register_callbacks(app):
+    @app.callback(
+        Output({"type": "lazy-section", "index": MATCH}, "children"),
+        Input({"type": "lazy-visible", "index": MATCH}, "data"),
+        State({"type": "lazy-section", "index": MATCH}, "id"),
+        prevent_initial_call=True
+    )
+    def load_section(visible, section_id):
+        if not visible:
+            return no_update
+        return SECTIONS[section_id["index"]]()
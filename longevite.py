@@ -2,30 +2,21 @@ import pandas as pd
 from dash import dcc, html, Input, Output
 import plotly.express as px
 
-file_path = "./dataset/spotify_songs_clean.csv"
-data = pd.read_csv(file_path)
-
-data["track_album_release_date"] = pd.to_datetime(data["track_album_release_date"], errors='coerce')
-data["year"] = data["track_album_release_date"].dt.year
-data["decade"] = (data["year"] // 10) * 10
-
-div_pop_df = data.groupby("track_artist").agg(nb_decennie=("decade", "nunique"))\
-                 .query("nb_decennie >= 3").reset_index()
+import aggregates
+from callback_cache import memoize
 
 features = ["track_popularity", "danceability", "energy", "valence", "tempo"]
 
 def generate_line_chart(selected_feature):
-    data_filtered = data[data["year"] >= 1970]
-
-    long_career_artists = div_pop_df["track_artist"]
-    data_long = data_filtered[data_filtered["track_artist"].isin(long_career_artists)]
-    data_short = data_filtered[~data_filtered["track_artist"].isin(long_career_artists)]
+    # Cellules du cube d'agrégats après 1970, séparées selon la longévité des artistes (3 décennies ou plus)
+    cells = aggregates.get_cube()
+    cells = cells[cells["year"] >= 1970]
 
-    long_data = data_long.groupby("year")[selected_feature].mean().reset_index()
-    long_count = data_long.groupby("year").size().reset_index(name='track_count')
+    long_data = aggregates.aggregate(cells[cells["long_career"]], ["year"], [selected_feature]).reset_index()
+    long_count = long_data.rename(columns={"count": "track_count"})
 
-    short_data = data_short.groupby("year")[selected_feature].mean().reset_index()
-    short_count = data_short.groupby("year").size().reset_index(name='track_count')
+    short_data = aggregates.aggregate(cells[~cells["long_career"]], ["year"], [selected_feature]).reset_index()
+    short_count = short_data.rename(columns={"count": "track_count"})
 
     fig = px.line()
 
@@ -98,23 +89,25 @@ narrative_q13 = html.Div(
     style={'padding': '20px', 'backgroundColor': '#121212', 'borderRadius': '8px'}
 )
 
-layout = html.Div([
-    html.H1("Évolution des caractéristiques musicales des artistes", style={"textAlign": "left"}),
-    narrative_q13,
-    html.Label("Sélectionnez une caractéristique musicale:"),
-    dcc.Dropdown(
-        id='feature-dropdown-q13',
-        options=[{'label': feature.capitalize(), 'value': feature} for feature in features],
-        value='track_popularity',
-        className='custom-dropdown'
-    ),
-    dcc.Graph(id='line_chart-q13')
-])
+def get_layout():
+    return html.Div([
+        html.H1("Évolution des caractéristiques musicales des artistes", style={"textAlign": "left"}),
+        narrative_q13,
+        html.Label("Sélectionnez une caractéristique musicale:"),
+        dcc.Dropdown(
+            id='feature-dropdown-q13',
+            options=[{'label': feature.capitalize(), 'value': feature} for feature in features],
+            value='track_popularity',
+            className='custom-dropdown'
+        ),
+        dcc.Graph(id='line_chart-q13')
+    ])
 
 def register_callbacks(app):
     @app.callback(
         Output('line_chart-q13', 'figure'),
         [Input('feature-dropdown-q13', 'value')]
     )
+    @memoize()
     def update_chart(selected_feature):
         return generate_line_chart(selected_feature)
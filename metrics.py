@@ -0,0 +1,236 @@
+"""
+Durées des callbacks Dash, exposées au format Prometheus sur /metrics.
+"""
+import bisect
+import contextvars
+import threading
+import time
+
+import flask
+
+# Bornes des histogrammes de durée, en secondes
+BUCKETS = (0.001, 0.0025, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0)
+
+# Callback en cours dans le contexte de la requête : {"callback", "section", "serialize"}
+_current = contextvars.ContextVar("current_callback", default=None)
+
+
+def _escape(value):
+    return str(value).replace("\\", "\\\\").replace('"', '\\"').replace("\n", "\\n")
+
+
+def _labels(names, values, extra=()):
+    pairs = list(zip(names, values)) + list(extra)
+    if not pairs:
+        return ""
+    return "{" + ",".join(f'{name}="{_escape(value)}"' for name, value in pairs) + "}"
+
+
+class Histogram:
+    """
+    Histogramme Prometheus, par combinaison de labels, sûr entre threads
+
+    Args
+    ----
+    name : str
+        Nom de la métrique
+    documentation : str
+        Description (ligne HELP)
+    labels : tuple of str
+        Noms des labels
+    buckets : tuple of float
+        Bornes supérieures des classes
+    """
+
+    def __init__(self, name, documentation, labels=(), buckets=BUCKETS):
+        self.name = name
+        self.documentation = documentation
+        self.labels = tuple(labels)
+        self.buckets = tuple(buckets)
+        self._lock = threading.Lock()
+        self._series = {}
+
+    def observe(self, value, *label_values):
+        with self._lock:
+            counts, total = self._series.get(label_values, ([0] * (len(self.buckets) + 1), 0.0))
+            counts[bisect.bisect_left(self.buckets, value)] += 1
+            self._series[label_values] = counts, total + value
+
+    def render(self):
+        lines = [f"# HELP {self.name} {self.documentation}", f"# TYPE {self.name} histogram"]
+        with self._lock:
+            series = sorted((values, (list(counts), total)) for values, (counts, total) in self._series.items())
+        for values, (counts, total) in series:
+            cumulative = 0
+            for bound, count in zip(self.buckets + (float("inf"),), counts):
+                cumulative += count
+                le = "+Inf" if bound == float("inf") else repr(bound)
+                lines.append(f"{self.name}_bucket{_labels(self.labels, values, [('le', le)])} {cumulative}")
+            lines.append(f"{self.name}_sum{_labels(self.labels, values)} {total}")
+            lines.append(f"{self.name}_count{_labels(self.labels, values)} {cumulative}")
+        return "\n".join(lines)
+
+    def clear(self):
+        with self._lock:
+            self._series.clear()
+
+
+class Counter:
+    """
+    Compteur Prometheus, par combinaison de labels, sûr entre threads
+
+    Args
+    ----
+    name : str
+        Nom de la métrique (suffixé par _total)
+    documentation : str
+        Description (ligne HELP)
+    labels : tuple of str
+        Noms des labels
+    """
+
+    def __init__(self, name, documentation, labels=()):
+        self.name = name
+        self.documentation = documentation
+        self.labels = tuple(labels)
+        self._lock = threading.Lock()
+        self._values = {}
+
+    def inc(self, *label_values, amount=1):
+        with self._lock:
+            self._values[label_values] = self._values.get(label_values, 0) + amount
+
+    def render(self):
+        lines = [f"# HELP {self.name} {self.documentation}", f"# TYPE {self.name} counter"]
+        with self._lock:
+            values = sorted(self._values.items())
+        for label_values, value in values:
+            lines.append(f"{self.name}{_labels(self.labels, label_values)} {value}")
+        return "\n".join(lines)
+
+    def clear(self):
+        with self._lock:
+            self._values.clear()
+
+
+callback_duration = Histogram(
+    "dash_callback_duration_seconds", "Duration of the Dash callbacks, by phase (compute or serialize).",
+    ("callback", "section", "phase"))
+section_duration = Histogram(
+    "dash_section_duration_seconds", "Duration of the Dash callbacks of each section, by phase (compute or serialize).",
+    ("section", "phase"))
+request_duration = Histogram(
+    "dash_request_duration_seconds", "Duration of the /_dash-update-component requests.",
+    ("callback", "section"))
+response_bytes = Counter(
+    "dash_response_bytes_total", "Bytes sent by the /_dash-update-component requests.",
+    ("callback", "section"))
+cache_requests = Counter(
+    "dash_cache_requests_total", "Lookups in the callback and figure caches.",
+    ("cache", "section", "result"))
+
+METRICS = [callback_duration, section_duration, request_duration, response_bytes, cache_requests]
+
+
+def count_cache(cache, section, hit):
+    """Compte une lecture d'un cache ("callback" ou "figure") d'une section."""
+    cache_requests.inc(cache, section, "hit" if hit else "miss")
+
+
+def render():
+    """Toutes les métriques au format texte de Prometheus."""
+    return "\n".join(metric.render() for metric in METRICS) + "\n"
+
+
+def clear():
+    for metric in METRICS:
+        metric.clear()
+
+
+def _instrument_callback(key, callback):
+    """Enveloppe un callback Dash (callback_map[key]["callback"]) pour mesurer ses phases."""
+    function = getattr(callback, "__wrapped__", callback)
+    section = function.__module__
+
+    def wrapper(*args, **kwargs):
+        state = {"callback": key, "section": section, "serialize": 0.0}
+        token = _current.set(state)
+        start = time.perf_counter()
+        try:
+            return callback(*args, **kwargs)
+        finally:
+            elapsed = time.perf_counter() - start
+            _current.reset(token)
+            for phase, duration in (("compute", elapsed - state["serialize"]), ("serialize", state["serialize"])):
+                callback_duration.observe(duration, key, section, phase)
+                section_duration.observe(duration, section, phase)
+
+    # Comme Dash, __wrapped__ désigne la fonction du callback (et son éventuel cache)
+    wrapper.__wrapped__ = function
+    wrapper.section = section
+    return wrapper
+
+
+def _timed_to_json(to_json):
+    def wrapper(value):
+        start = time.perf_counter()
+        try:
+            return to_json(value)
+        finally:
+            state = _current.get()
+            if state is not None:
+                state["serialize"] += time.perf_counter() - start
+
+    wrapper.instrumented = True
+    return wrapper
+
+
+def instrument(app):
+    """
+    Instrumente les callbacks d'une application Dash et ajoute la route /metrics
+
+    À appeler une fois tous les callbacks enregistrés.
+    """
+    # Sérialisation des sorties des callbacks par Dash
+    import dash._callback  # pylint: disable=import-outside-toplevel
+    if not getattr(dash._callback.to_json, "instrumented", False):
+        dash._callback.to_json = _timed_to_json(dash._callback.to_json)
+
+    for key, entry in app.callback_map.items():
+        if "callback" in entry and not hasattr(entry["callback"], "section"):
+            entry["callback"] = _instrument_callback(key, entry["callback"])
+
+    server = app.server
+    if "metrics_endpoint" in server.view_functions:
+        return app
+    update_path = f"{app.config.routes_pathname_prefix}_dash-update-component"
+
+    @server.before_request
+    def start_timer():
+        if flask.request.path == update_path:
+            flask.g.metrics_start = time.perf_counter()
+
+    def record_request(response):
+        start = flask.g.pop("metrics_start", None)
+        if start is not None:
+            body = flask.request.get_json(silent=True) or {}
+            key = body.get("output", "")
+            # Sortie envoyée par le client : hors des callbacks connus, une seule série
+            if not isinstance(key, str) or key not in app.callback_map:
+                key = "unknown"
+            callback = app.callback_map.get(key, {}).get("callback")
+            section = getattr(callback, "section", "unknown")
+            request_duration.observe(time.perf_counter() - start, key, section)
+            response_bytes.inc(key, section, amount=response.calculate_content_length() or 0)
+        return response
+
+    # Flask appelle les fonctions after_request dans l'ordre inverse de leur enregistrement :
+    # en tête de liste, record_request est appelée en dernier et compte les octets envoyés
+    # après la compression (voir transport.py)
+    server.after_request_funcs.setdefault(None, []).insert(0, record_request)
+
+    @server.route("/metrics")
+    def metrics_endpoint():
+        return flask.Response(render(), mimetype="text/plain; version=0.0.4")
+
+    return app
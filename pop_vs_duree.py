@@ -1,21 +1,113 @@
-from dash import html, dcc
+from dash import html, dcc, Input, Output, State, ctx, no_update
 import pandas as pd
 import numpy as np
 import plotly.express as px
 import plotly.graph_objects as go
-from statsmodels.nonparametric.smoothers_lowess import lowess
 
-def generate_duration_popularity_plot():
-    data = pd.read_csv("./dataset/spotify_songs_clean.csv")
-    data["duration_min"] = data["duration_ms"] / 60000
-    data["duration_bin"] = (data["duration_min"] * 4).round() / 4
+import dataset
+import smoothers
+from figure_cache import figures
 
-    grouped_data = data.groupby("duration_bin", as_index=False).agg({
-        "track_popularity": "mean",
-        "track_id": "count"
-    }).rename(columns={"track_id": "count"})
+# Largeurs des classes de durée proposées, en minutes : des puissances de deux, pour
+# que durée / largeur soit exacte et que les classes soient celles de (durée / largeur).round()
+BIN_WIDTHS = [0.125, 0.25, 0.5, 1.0]
+DEFAULT_BIN_WIDTH = 0.25
+# Lisseur de la courbe de tendance (voir smoothers.SMOOTHERS) et fraction des classes par régression locale
+TREND_SMOOTHER = "lowess"
+TREND_SPAN = 0.3
+
+def build_duration_sums(duration_ms, popularity):
+    """
+    Durées triées et sommes cumulées de la popularité
+
+    Calculées une seule fois : les effectifs et sommes de popularité de n'importe quelle
+    classe de durée s'en déduisent par deux recherches dichotomiques, sans repasser sur les morceaux.
+
+    Returns
+    -------
+    np.ndarray
+        Durées en minutes, triées
+    np.ndarray
+        Sommes cumulées de la popularité dans cet ordre (précédées de 0)
+    """
+    minutes = np.asarray(duration_ms, dtype=np.int64) / 60000
+    order = np.argsort(minutes, kind="stable")
+    cumulative = np.concatenate([[0], np.cumsum(np.asarray(popularity, dtype=np.int64)[order])])
+    return minutes[order], cumulative
+
+def get_duration_sums():
+    """Sommes cumulées du jeu de données (build_duration_sums, calculées une seule fois)."""
+    def build():
+        data = dataset.get_songs()
+        return build_duration_sums(data["duration_ms"].to_numpy(), data["track_popularity"].to_numpy())
+    return dataset.get_snapshot().memo("pop_vs_duree.duration_sums", build)
+
+def merge_duration_sums(duration_sums, duration_ms, popularity):
+    """
+    Sommes cumulées après l'ajout de nouveaux morceaux, sans trier de nouveau les anciens
+
+    Les nouveaux morceaux sont insérés après les durées égales déjà présentes : le
+    résultat est celui de build_duration_sums sur la table complétée.
+    """
+    minutes, cumulative = duration_sums
+    new_minutes, new_cumulative = build_duration_sums(duration_ms, popularity)
+    positions = np.searchsorted(minutes, new_minutes, side="right")
+    merged_popularity = np.insert(np.diff(cumulative), positions, np.diff(new_cumulative))
+    return np.insert(minutes, positions, new_minutes), np.concatenate([[0], np.cumsum(merged_popularity)])
+
+def bin_durations(duration_sums, bin_width=DEFAULT_BIN_WIDTH):
+    """
+    Nombre de morceaux et popularité moyenne par classe de durée
+
+    La classe d'un morceau est (durée / bin_width).round() : un morceau à égale distance de
+    deux centres va dans la classe paire, comme avec Series.round.
+
+    Args
+    ----
+    duration_sums : tuple
+        Durées triées et sommes cumulées (build_duration_sums)
+    bin_width : float
+        Largeur des classes en minutes (une des BIN_WIDTHS)
+
+    Returns
+    -------
+    pd.DataFrame
+        Colonnes duration_bin (centre de la classe), track_popularity (moyenne) et count,
+        une ligne par classe non vide
+    """
+    minutes, cumulative = duration_sums
+    first, last = np.round(minutes[[0, -1]] / bin_width)
+    keys = np.arange(first, last + 1)
+    edges = (keys[:-1] + 0.5) * bin_width
+    # Une durée égale à une borne va dans la classe paire
+    bounds = np.where(keys[1:] % 2 == 0,
+                      np.searchsorted(minutes, edges, side="left"),
+                      np.searchsorted(minutes, edges, side="right"))
+    bounds = np.concatenate([[0], bounds, [len(minutes)]])
+    counts = np.diff(bounds)
+    sums = np.diff(cumulative[bounds])
+    non_empty = counts > 0
+    return pd.DataFrame({
+        "duration_bin": keys[non_empty] * bin_width,
+        "track_popularity": sums[non_empty] / counts[non_empty],
+        "count": counts[non_empty],
+    })
+
+def generate_duration_popularity_plot(bin_width=DEFAULT_BIN_WIDTH, smoother=TREND_SMOOTHER, span=TREND_SPAN):
+    """
+    Popularité moyenne par classe de durée, avec sa courbe de tendance
+
+    Args
+    ----
+    bin_width : float
+        Largeur des classes de durée en minutes
+    smoother : str
+        Lisseur de la courbe de tendance (voir smoothers.SMOOTHERS)
+    span : float
+        Fraction des classes utilisée par chaque régression locale
+    """
+    grouped_data = bin_durations(get_duration_sums(), bin_width)
 
-    grouped_data["duration_bin"] = grouped_data["duration_bin"].round(2)
     grouped_data["track_popularity"] = grouped_data["track_popularity"].round(2)
     grouped_data["Legend"] = "Nombre de morceaux"
     grouped_data["size_scaled"] = np.sqrt(grouped_data["count"]) * 10
@@ -42,11 +134,12 @@ def generate_duration_popularity_plot():
         color_discrete_map={"Nombre de morceaux": "#2ca02c"}
     )
 
-    lowess_results = lowess(grouped_data["track_popularity"], grouped_data["duration_bin"], frac=0.3)
+    trend = smoothers.smooth(grouped_data["duration_bin"], grouped_data["track_popularity"],
+                             grouped_data["count"], method=smoother, span=span)
 
     fig.add_trace(go.Scatter(
-        x=lowess_results[:, 0],
-        y=lowess_results[:, 1],
+        x=grouped_data["duration_bin"].to_numpy(),
+        y=trend,
         mode="lines",
         line=dict(dash="dot", color="blue"),
         name="Tendance"
@@ -71,6 +164,158 @@ def generate_duration_popularity_plot():
 
     return fig
 
+# Mode densité : grille de base (durée à la seconde x popularité entière), construite une seule fois,
+# puis regroupée en au plus DENSITY_BINS cases pour la plage visible du graphique
+DENSITY_RESOLUTION_MS = 1000
+MAX_POPULARITY = 100
+DENSITY_BINS = (100, 50)
+
+def build_density_grid(duration_ms, popularity, resolution_ms=DENSITY_RESOLUTION_MS):
+    """
+    Nombre de morceaux par case de la grille de base
+
+    Args
+    ----
+    duration_ms : array-like
+        Durée de chaque morceau en millisecondes
+    popularity : array-like
+        Popularité de chaque morceau (entière, de 0 à MAX_POPULARITY)
+    resolution_ms : int
+        Largeur d'une colonne de la grille en millisecondes
+
+    Returns
+    -------
+    np.ndarray
+        Tableau (colonnes de durée, MAX_POPULARITY + 1) : la case [i, j] compte les
+        morceaux de durée dans [i * resolution_ms, (i + 1) * resolution_ms[ et de popularité j
+    """
+    columns = np.asarray(duration_ms, dtype=np.int64) // resolution_ms
+    rows = np.clip(np.asarray(popularity, dtype=np.int64), 0, MAX_POPULARITY)
+    n_columns = int(columns.max()) + 1 if len(columns) else 1
+    counts = np.bincount(columns * (MAX_POPULARITY + 1) + rows, minlength=n_columns * (MAX_POPULARITY + 1))
+    return counts.reshape(n_columns, MAX_POPULARITY + 1)
+
+def add_to_density_grid(grid, duration_ms, popularity, resolution_ms=DENSITY_RESOLUTION_MS):
+    """Grille de base après l'ajout de nouveaux morceaux (agrandie si une durée dépasse la grille)."""
+    delta = build_density_grid(duration_ms, popularity, resolution_ms)
+    n_columns = max(grid.shape[0], delta.shape[0])
+    grid = np.pad(grid, ((0, n_columns - grid.shape[0]), (0, 0)))
+    grid[:delta.shape[0]] += delta
+    return grid
+
+def get_density_grid():
+    """Grille de base du jeu de données (build_density_grid, calculée une seule fois)."""
+    def build():
+        data = dataset.get_songs()
+        return build_density_grid(data["duration_ms"].to_numpy(), data["track_popularity"].to_numpy())
+    return dataset.get_snapshot().memo("pop_vs_duree.density_grid", build)
+
+def aggregate_density(grid, duration_range=None, popularity_range=None, bins=DENSITY_BINS, resolution_ms=DENSITY_RESOLUTION_MS):
+    """
+    Regroupe les cases de la grille de base visibles dans au plus `bins` cases
+
+    Le coût dépend du nombre de cases de la grille, pas du nombre de morceaux.
+
+    Args
+    ----
+    grid : np.ndarray
+        Grille de base (build_density_grid)
+    duration_range : tuple of float, optional
+        Plage de durée visible en minutes (toute la grille par défaut)
+    popularity_range : tuple of float, optional
+        Plage de popularité visible (toute la grille par défaut)
+    bins : tuple of int
+        Nombre maximal de cases en durée et en popularité
+
+    Returns
+    -------
+    np.ndarray
+        Nombre de morceaux par case (durée, popularité)
+    np.ndarray
+        Centre de chaque case en durée (minutes)
+    np.ndarray
+        Centre de chaque case en popularité
+    """
+    minutes = resolution_ms / 60000
+    x_start, x_stop = duration_range or (0, grid.shape[0] * minutes)
+    y_start, y_stop = popularity_range or (0, grid.shape[1] - 1)
+    i0 = int(np.clip(np.floor(x_start / minutes), 0, grid.shape[0] - 1))
+    i1 = int(np.clip(np.ceil(x_stop / minutes), i0 + 1, grid.shape[0]))
+    j0 = int(np.clip(np.floor(y_start), 0, grid.shape[1] - 1))
+    j1 = int(np.clip(np.floor(y_stop) + 1, j0 + 1, grid.shape[1]))
+
+    # Regroupement de step_x x step_y cases de base (complétées par des zéros)
+    step_x = -(-(i1 - i0) // bins[0])
+    step_y = -(-(j1 - j0) // bins[1])
+    visible = grid[i0:i1, j0:j1]
+    visible = np.pad(visible, ((0, -visible.shape[0] % step_x), (0, -visible.shape[1] % step_y)))
+    counts = visible.reshape(visible.shape[0] // step_x, step_x, visible.shape[1] // step_y, step_y).sum(axis=(1, 3))
+
+    x_centers = (i0 + (np.arange(counts.shape[0]) + 0.5) * step_x) * minutes
+    y_centers = j0 + np.arange(counts.shape[1]) * step_y + (step_y - 1) / 2
+    return counts, x_centers, y_centers
+
+def get_density_figure(duration_range=None, popularity_range=None):
+    """
+    Carte de densité des morceaux (durée x popularité) pour la plage visible
+
+    Seule la grille agrégée est envoyée (au plus DENSITY_BINS cases), quel que soit le
+    nombre de morceaux.
+    """
+    counts, x_centers, y_centers = aggregate_density(get_density_grid(), duration_range, popularity_range)
+    # Cases vides transparentes
+    z = np.where(counts > 0, counts, np.nan).T.astype(np.float32)
+
+    fig = go.Figure(go.Heatmap(
+        x=x_centers, y=y_centers, z=z,
+        colorscale=[[0, "#0b3d20"], [1, "#1DB954"]],
+        colorbar=dict(title=dict(text="Morceaux", font=dict(color='white')), tickfont=dict(color='white')),
+        hovertemplate="<b>Durée:</b> %{x:.2f} min<br><b>Popularité:</b> %{y:.0f}<br><b>Nombre de morceaux:</b> %{z:.0f}<extra></extra>",
+    ))
+    fig.update_layout(
+        title="Répartition des morceaux selon leur durée et leur popularité",
+        title_font=dict(size=20, color='white'),
+        # La figure garde la plage zoomée (sans plage : toute la grille)
+        xaxis=dict(title="Durée (min)", title_font=dict(color='white'), tickfont=dict(color='white'),
+                   range=list(duration_range) if duration_range else None),
+        yaxis=dict(title="Popularité", title_font=dict(color='white'), tickfont=dict(color='white'),
+                   range=list(popularity_range) if popularity_range else None),
+        plot_bgcolor='#121212',
+        paper_bgcolor='#121212',
+        height=600
+    )
+    return fig
+
+def get_visible_ranges(relayout_data, ranges=None):
+    """
+    Plages visibles après un zoom, un déplacement ou un double-clic sur le graphique
+
+    Args
+    ----
+    relayout_data : dict
+        relayoutData du graphique ("xaxis.range[0]", "xaxis.autorange", ...)
+    ranges : dict, optional
+        Plages visibles avant l'événement : {"xaxis": [début, fin] ou None, "yaxis": ...}
+
+    Returns
+    -------
+    dict or None
+        Nouvelles plages (None pour un axe qui montre toute la grille), ou None si
+        l'événement ne change pas les plages visibles
+    """
+    relayout_data = relayout_data or {}
+    new_ranges = dict({"xaxis": None, "yaxis": None}, **(ranges or {}))
+    for axis in ("xaxis", "yaxis"):
+        if f"{axis}.range[0]" in relayout_data and f"{axis}.range[1]" in relayout_data:
+            new_ranges[axis] = [float(relayout_data[f"{axis}.range[0]"]), float(relayout_data[f"{axis}.range[1]"])]
+        elif f"{axis}.range" in relayout_data:
+            new_ranges[axis] = [float(value) for value in relayout_data[f"{axis}.range"]]
+        elif relayout_data.get(f"{axis}.autorange"):
+            new_ranges[axis] = None
+    if new_ranges == dict({"xaxis": None, "yaxis": None}, **(ranges or {})):
+        return None
+    return new_ranges
+
 narrative_q4 = html.Div([
     dcc.Markdown("""
 Cette visualisation explore le lien entre la **durée d’un morceau** et sa **popularité moyenne** auprès des auditeurs.
@@ -92,16 +337,72 @@ En termes de popularité globale sur les plateformes, **le format court gagne la
     """)
 ], style={'padding': '20px', 'backgroundColor': '#121212', 'borderRadius': '8px', 'marginLeft': '5%', 'marginRight': '5%'})
 
-layout = html.Div([
-    html.H1("Durée des morceaux et popularité", style={"textAlign": "left", "color": "white"}),
+def get_layout():
+    """
+    Layout de la section (la figure est lue dans le cache de figures)
+    """
+    return html.Div([
+        html.H1("Durée des morceaux et popularité", style={"textAlign": "left", "color": "white"}),
 
-    html.Div([
         html.Div([
-            narrative_q4
-        ], style={'width': '40%', 'display': 'inline-block', 'verticalAlign': 'top', 'marginTop': '10px'}),
+            html.Div([
+                narrative_q4
+            ], style={'width': '40%', 'display': 'inline-block', 'verticalAlign': 'top', 'marginTop': '10px'}),
 
-        html.Div([
-            dcc.Graph(id='scatter-duration-popularity', figure=generate_duration_popularity_plot())
-        ], style={'width': '60%', 'display': 'inline-block'})
+            html.Div([
+                dcc.RadioItems(
+                    id='duration-popularity-mode',
+                    options=[{'label': 'Moyennes par durée', 'value': 'means'},
+                             {'label': 'Densité des morceaux', 'value': 'density'}],
+                    value='means',
+                    inline=True,
+                    labelStyle={'marginRight': '20px', 'color': 'white', 'cursor': 'pointer'},
+                    style={'textAlign': 'center', 'marginBottom': '10px'}
+                ),
+                dcc.RadioItems(
+                    id='duration-bin-width',
+                    options=[{'label': label, 'value': width}
+                             for label, width in zip(['7,5 s', '15 s', '30 s', '1 min'], BIN_WIDTHS)],
+                    value=DEFAULT_BIN_WIDTH,
+                    inline=True,
+                    labelStyle={'marginRight': '20px', 'color': 'white', 'cursor': 'pointer'},
+                    style={'textAlign': 'center', 'marginBottom': '10px'}
+                ),
+                dcc.Store(id='duration-popularity-ranges', data={"xaxis": None, "yaxis": None}),
+                dcc.Graph(id='scatter-duration-popularity', figure=get_means_figure())
+            ], style={'width': '60%', 'display': 'inline-block'})
+        ])
     ])
-])
+
+def get_means_figure(bin_width=DEFAULT_BIN_WIDTH):
+    """Figure des moyennes par classe de durée, lue dans le cache de figures."""
+    return figures.get("pop_vs_duree", ("means", bin_width), lambda: generate_duration_popularity_plot(bin_width))
+
+def register_callbacks(app):
+    # Mode densité : la grille est de nouveau agrégée pour la plage visible à chaque zoom
+    @app.callback(
+        [Output('scatter-duration-popularity', 'figure'),
+         Output('duration-popularity-ranges', 'data')],
+        [Input('duration-popularity-mode', 'value'),
+         Input('duration-bin-width', 'value'),
+         Input('scatter-duration-popularity', 'relayoutData')],
+        State('duration-popularity-ranges', 'data'),
+        prevent_initial_call=True
+    )
+    def update_duration_popularity(mode, bin_width, relayout_data, ranges):
+        if ctx.triggered_id in ('duration-popularity-mode', 'duration-bin-width'):
+            # Changement de mode ou de largeur des classes : vue complète
+            if mode == 'means':
+                return get_means_figure(bin_width), {"xaxis": None, "yaxis": None}
+            if ctx.triggered_id == 'duration-bin-width':
+                return no_update, no_update
+            return figures.get("pop_vs_duree", ("density",), get_density_figure), {"xaxis": None, "yaxis": None}
+
+        if mode != 'density':
+            return no_update, no_update
+        new_ranges = get_visible_ranges(relayout_data, ranges)
+        if new_ranges is None:
+            return no_update, no_update
+        if new_ranges == {"xaxis": None, "yaxis": None}:
+            return figures.get("pop_vs_duree", ("density",), get_density_figure), new_ranges
+        return get_density_figure(new_ranges["xaxis"], new_ranges["yaxis"]), new_ranges
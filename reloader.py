@@ -0,0 +1,164 @@
+"""
+Rechargement à chaud du jeu de données quand son CSV change, sans redémarrer l'application.
+"""
+import logging
+import os
+import threading
+import time
+
+import flask
+
+import dataset
+
+RELOAD_INTERVAL = float(os.environ.get("DATASET_RELOAD_INTERVAL", "2"))
+
+logger = logging.getLogger(__name__)
+
+_lock = threading.Lock()
+# Processus où le watcher tourne : un fork n'hérite pas du thread
+_watcher_pid = None
+
+
+def build_snapshot(path=dataset.DATASET_PATH):
+    """
+    Instantané complet du CSV : ses tables et tout ce que server.warm_up charge,
+    sans toucher à l'instantané servi
+
+    Args
+    ----
+    path : str
+        Chemin du CSV
+
+    Returns
+    -------
+    dataset.Snapshot
+        Nouvel instantané, prêt à être servi
+
+    Raises
+    ------
+    RuntimeError
+        Si le CSV a changé pendant la construction
+    """
+    import server  # pylint: disable=import-outside-toplevel
+
+    snapshot = dataset.load_snapshot(path)
+    token = dataset.pin(snapshot)
+    try:
+        server.warm_up()
+    finally:
+        dataset.unpin(token)
+    if dataset.file_stat(path) != snapshot.stat:
+        raise RuntimeError(f"{path} a changé pendant la construction de l'instantané")
+    return snapshot
+
+
+def reload(path=dataset.DATASET_PATH):
+    """
+    Construit l'instantané du CSV (build_snapshot) puis le sert à la place de l'actuel
+
+    Args
+    ----
+    path : str
+        Chemin du CSV
+
+    Returns
+    -------
+    dict
+        Version servie ("version"), nombre de chansons ("tracks") et durée de la
+        construction en secondes ("seconds")
+    """
+    start = time.perf_counter()
+    # Pas d'ajout de lot (ingest.py) pendant la construction : il serait perdu au remplacement
+    with dataset.update_lock:
+        snapshot = build_snapshot(path)
+        dataset.set_snapshot(snapshot)
+    return {"version": snapshot.version, "tracks": len(snapshot), "seconds": time.perf_counter() - start}
+
+
+def watch(path=dataset.DATASET_PATH, interval=RELOAD_INTERVAL, stop=None):
+    """
+    Recharge le jeu de données (reload) à chaque changement du CSV
+
+    Args
+    ----
+    path : str
+        Chemin du CSV
+    interval : float
+        Secondes entre deux lectures de la taille et de la date du fichier
+    stop : threading.Event, optional
+        Arrête la surveillance une fois levé (sinon elle ne s'arrête pas)
+    """
+    stop = stop or threading.Event()
+    pending = failed = None
+    while not stop.wait(interval):
+        try:
+            stat = dataset.file_stat(path)
+        except OSError:
+            # Fichier en cours de remplacement
+            continue
+        if stat in (dataset.get_served_snapshot().stat, failed):
+            pending = None
+        elif stat != pending:
+            # Attendre que le fichier ne change plus avant de le lire
+            pending = stat
+        else:
+            pending = None
+            try:
+                result = reload(path)
+            except Exception:  # pylint: disable=broad-except
+                failed = stat
+                logger.exception("Rechargement de %s impossible, l'instantané servi est gardé", path)
+                continue
+            failed = None
+            logger.info("Jeu de données rechargé : version %s, %d chansons, %.2f s",
+                        result["version"], result["tracks"], result["seconds"])
+
+
+def start_watcher(path=dataset.DATASET_PATH, interval=RELOAD_INTERVAL):
+    """
+    Démarre le thread de surveillance du CSV (watch), une seule fois par processus
+
+    Returns
+    -------
+    threading.Thread or None
+        Thread démarré, None s'il tourne déjà ou si interval vaut 0
+    """
+    global _watcher_pid
+    if interval <= 0:
+        return None
+    with _lock:
+        if _watcher_pid == os.getpid():
+            return None
+        _watcher_pid = os.getpid()
+    thread = threading.Thread(target=watch, args=(path, interval), name="dataset-reloader", daemon=True)
+    thread.start()
+    return thread
+
+
+def instrument(app):
+    """
+    Épingle l'instantané servi pendant chaque requête du serveur Flask d'une application
+    Dash, et démarre le watcher à la première requête du processus
+    """
+    server = app.server
+    if any(getattr(func, "__name__", "") == "pin_snapshot" for func in server.before_request_funcs.get(None, [])):
+        return app
+
+    @server.before_request
+    def pin_snapshot():
+        start_watcher()
+        flask.g.dataset_token = dataset.pin()
+
+    @server.teardown_request
+    def unpin_snapshot(_exception):
+        token = flask.g.pop("dataset_token", None)
+        if token is not None:
+            dataset.unpin(token)
+
+    return app
+
+
+if __name__ == "__main__":
+    reload_result = reload()
+    print(f"Version {reload_result['version']} : {reload_result['tracks']} chansons, "
+          f"instantané construit en {reload_result['seconds']:.2f} s")
@@ -15,8 +15,52 @@ def create_app():
     """
     # the import is intentionally inside to work with the server failsafe
     from app import app  # pylint: disable=import-outside-toplevel
+    import metrics  # pylint: disable=import-outside-toplevel
+    import artifacts  # pylint: disable=import-outside-toplevel
+    import reloader  # pylint: disable=import-outside-toplevel
+
+    # Figures statiques et tables d'agrégats lues dans le bundle précalculé (python artifacts.py),
+    # sinon calculées au premier usage
+    artifacts.load()
+
+    # Durées des callbacks et lectures des caches, exportées sur /metrics
+    metrics.instrument(app)
+    # Chaque requête lit un seul instantané du jeu de données, rechargé en arrière-plan quand le CSV change
+    reloader.instrument(app)
     return app.server
 
+def warm_up():
+    """
+    Charge ou calcule tout ce que les sections gardent en mémoire : tables du jeu de
+    données, bundle d'artefacts (ou les tables et figures statiques qu'il remplace),
+    index des artistes de chaque genre, sommes et grille de pop_vs_duree, puis
+    construit une fois le layout de chaque section paresseuse
+
+    Appelée par le processus maître de gunicorn avant la création des workers (voir
+    gunicorn.conf.py) : les workers partagent ces données au lieu de les calculer
+    chacun à la première requête. Appelée aussi, avec le nouvel instantané épinglé,
+    pour construire un instantané complet avant de le servir (voir reloader.py).
+    """
+    import artifacts  # pylint: disable=import-outside-toplevel
+    import adaptation  # pylint: disable=import-outside-toplevel
+    import dataset  # pylint: disable=import-outside-toplevel
+    import lazy_sections  # pylint: disable=import-outside-toplevel
+    import pop_vs_duree  # pylint: disable=import-outside-toplevel
+    from figure_cache import figures  # pylint: disable=import-outside-toplevel
+
+    if not artifacts.load():
+        artifacts.compute_tables()
+        for section, params, build_figure in artifacts.static_figures():
+            figures.get(section, params, build_figure)
+    adaptation.get_color_map()
+    for genre in sorted(dataset.get_songs()["playlist_genre"].unique()):
+        adaptation.get_artist_search_index(genre)
+    # Zoom du mode densité et largeurs de classes non précalculées : lus dans ces tables
+    pop_vs_duree.get_duration_sums()
+    pop_vs_duree.get_density_grid()
+    for get_layout in lazy_sections.SECTIONS.values():
+        get_layout()
+
 # Create the WSGI callable that Gunicorn expects.
 server = create_app()
 
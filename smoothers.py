@@ -0,0 +1,131 @@
+"""
+Lisseurs des courbes de tendance des sections (LOWESS en NumPy), enregistrés par nom dans SMOOTHERS.
+"""
+import numpy as np
+
+# Fraction des points utilisée par chaque régression locale
+DEFAULT_SPAN = 0.3
+# Itérations de pondération robuste (comme statsmodels)
+ROBUST_ITERATIONS = 3
+
+
+def _neighbourhoods(x, k):
+    """
+    Indices des k plus proches voisins de chaque point, et rayon de chaque voisinage
+
+    Le voisinage du point i est x[left[i]:left[i] + k] : la fenêtre glisse vers
+    la droite tant que x[i] dépasse le milieu de ses extrémités.
+    """
+    n = len(x)
+    midpoints = (x[:n - k] + x[k:]) / 2.0
+    left = np.searchsorted(midpoints, x, side="left")
+    index = left[:, None] + np.arange(k)
+    radius = np.maximum(x - x[left], x[left + k - 1] - x)
+    return index, radius
+
+
+def _local_fit(x, y, index, radius, weights):
+    """Régressions linéaires locales pondérées (tricube) de tous les points à la fois."""
+    neighbours = x[index]
+    distance = np.abs(neighbours - x[:, None]) / radius[:, None]
+    local_weights = (1.0 - distance ** 3) ** 3 * weights[index]
+
+    # Au moins deux poids non nuls, sinon la valeur observée est gardée
+    reg_ok = (local_weights > 1e-12).sum(axis=1) >= 2
+    total = local_weights.sum(axis=1, keepdims=True)
+    local_weights = local_weights / np.where(reg_ok[:, None], total, 1.0)
+    mean_x = (local_weights * neighbours).sum(axis=1, keepdims=True)
+    variance_x = np.maximum((local_weights * (neighbours - mean_x) ** 2).sum(axis=1, keepdims=True), 1e-12)
+    projection = local_weights * (1.0 + (x[:, None] - mean_x) * (neighbours - mean_x) / variance_x)
+    return np.where(reg_ok, (projection * y[index]).sum(axis=1), y)
+
+
+def _robust_weights(y, fitted):
+    """Poids bicarrés des résidus (nuls au-delà de 6 fois la médiane des résidus absolus)."""
+    residuals = np.abs(y - fitted)
+    median = np.median(residuals)
+    scaled = (residuals > 0).astype(float) if median == 0 else residuals / (6.0 * median)
+    return (1.0 - np.minimum(scaled, 1.0) ** 2) ** 2
+
+
+def local_regression(x, y, weights=None, span=DEFAULT_SPAN, iterations=ROBUST_ITERATIONS):
+    """
+    Régression linéaire locale, pondérée par la distance (tricube) et éventuellement robuste
+
+    Args
+    ----
+    x : array-like
+        Abscisses, strictement croissantes (ex. centres de classes)
+    y : array-like
+        Ordonnées
+    weights : array-like, optional
+        Poids de chaque point (1 par défaut)
+    span : float
+        Fraction des points utilisée par chaque régression locale (`frac` de statsmodels)
+    iterations : int
+        Nombre d'itérations de pondération robuste
+
+    Returns
+    -------
+    np.ndarray
+        Valeurs lissées aux abscisses x
+    """
+    x = np.asarray(x, dtype=float)
+    y = np.asarray(y, dtype=float)
+    prior = np.ones(len(x)) if weights is None else np.asarray(weights, dtype=float)
+    if len(x) < 2:
+        return y.copy()
+    k = min(max(int(span * len(x) + 1e-10), 2), len(x))
+    index, radius = _neighbourhoods(x, k)
+
+    robust = np.ones(len(x))
+    for _ in range(iterations + 1):
+        fitted = _local_fit(x, y, index, radius, prior * robust)
+        robust = _robust_weights(y, fitted)
+    return fitted
+
+
+def lowess(x, y, weights=None, span=DEFAULT_SPAN):
+    """LOWESS robuste de statsmodels : tous les points ont le même poids (`weights` n'est pas utilisé)."""
+    return local_regression(x, y, None, span, ROBUST_ITERATIONS)
+
+
+def weighted_lowess(x, y, weights=None, span=DEFAULT_SPAN):
+    """Régression locale pondérée par `weights`, sans itération robuste."""
+    return local_regression(x, y, weights, span, iterations=0)
+
+
+SMOOTHERS = {
+    "lowess": lowess,
+    "weighted_lowess": weighted_lowess,
+}
+
+
+def smooth(x, y, weights=None, method="lowess", span=DEFAULT_SPAN):
+    """
+    Courbe lissée par le lisseur `method` de SMOOTHERS
+
+    Args
+    ----
+    x, y : array-like
+        Points de la courbe (x strictement croissant)
+    weights : array-like, optional
+        Poids de chaque point, pour les lisseurs qui en tiennent compte
+    method : str
+        Nom du lisseur
+    span : float
+        Fraction des points utilisée par chaque régression locale
+
+    Returns
+    -------
+    np.ndarray
+        Valeurs lissées aux abscisses x
+
+    Raises
+    ------
+    ValueError
+        Si le lisseur n'existe pas
+    """
+    if method not in SMOOTHERS:
+        raise ValueError(f"Lisseur inconnu : {method!r} (disponibles : {', '.join(SMOOTHERS)})")
+    return SMOOTHERS[method](x, y, weights, span)
@@ -0,0 +1,5 @@
+import os
+import sys
+
+# Les modules de l'application sont à la racine du dépôt
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
@@ -0,0 +1,46 @@
+import numpy as np
+import pandas as pd
+
+import dataset
+
+
+def convert_date(date):
+    """Ancienne conversion ligne par ligne d'adaptation.py et de discographie.py."""
+    try:
+        return pd.to_datetime(date, format="%Y-%m-%d")
+    except ValueError:
+        try:
+            return pd.to_datetime(date, format="%Y") + pd.offsets.DateOffset(months=0, days=0)
+        except ValueError:
+            return pd.NaT
+
+
+def synthetic_dates(rows, seed=0):
+    """Dates complètes, années seules, années et mois, et valeurs invalides ou absentes."""
+    rng = np.random.default_rng(seed)
+    years = rng.integers(1950, 2021, rows).astype(str)
+    months = np.char.zfill(rng.integers(1, 13, rows).astype(str), 2)
+    days = np.char.zfill(rng.integers(1, 29, rows).astype(str), 2)
+    kind = rng.random(rows)
+    values = np.where(kind < 0.80, np.char.add(np.char.add(np.char.add(years, "-"), np.char.add(months, "-")), days),
+             np.where(kind < 0.95, years,
+             np.where(kind < 0.99, np.char.add(np.char.add(years, "-"), months), "unknown")))
+    dates = pd.Series(values, dtype=object)
+    dates[rng.random(rows) < 0.01] = np.nan
+    return dates
+
+
+def test_parse_release_dates_formats():
+    dates = pd.Series(["2001-05-17", "1999", "2003-07", "unknown", np.nan, "2020-02-30"], index=list("abcdef"))
+    parsed, precision = dataset.parse_release_dates(dates)
+    expected = pd.Series(pd.to_datetime(["2001-05-17", "1999-01-01", "2003-07-01", None, None, None]), index=dates.index)
+    pd.testing.assert_series_equal(parsed, expected)
+    assert precision.tolist()[:3] == ["day", "year", "month"]
+    assert precision.iloc[3:].isna().all()
+    assert dataset.count_release_date_precisions(precision) == {"day": 1, "month": 1, "year": 1, "invalid": 3}
+
+
+def test_parse_release_dates_matches_row_wise_conversion():
+    dates = synthetic_dates(2000)
+    parsed, _ = dataset.parse_release_dates(dates)
+    pd.testing.assert_series_equal(parsed, pd.to_datetime(dates.apply(convert_date)), check_names=False)
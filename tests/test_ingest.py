@@ -0,0 +1,156 @@
+import numpy as np
+import pandas as pd
+import pytest
+
+import aggregates
+import caracteristiques
+import dataset
+import evolutions
+import ingest
+import pop_vs_duree
+
+GENRES = {
+    "pop": ["dance pop", "electropop"],
+    "rap": ["trap", "hip hop"],
+    "rock": ["hard rock", "classic rock"],
+    "latin": ["reggaeton", "tropical"],
+    "r&b": ["neo soul", "new jack swing"],
+    "edm": ["electro house", "big room"],
+}
+
+
+def synthetic_rows(rows, seed=0, start=0):
+    """Chansons synthétiques avec les colonnes du CSV."""
+    rng = np.random.default_rng(seed)
+    genres = rng.choice(list(GENRES), rows)
+    ids = np.arange(start, start + rows).astype(str)
+    data = pd.DataFrame({
+        "track_id": np.char.add("t", ids),
+        "track_name": np.char.add("Song ", ids),
+        "track_artist": np.char.add("Artist ", rng.integers(0, 40, rows).astype(str)),
+        "track_popularity": rng.integers(0, 101, rows),
+        "track_album_id": np.char.add("a", ids),
+        "track_album_name": np.char.add("Album ", ids),
+        "track_album_release_date": [f"{year}-{month:02d}-15" for year, month in zip(rng.integers(1990, 2021, rows), rng.integers(1, 13, rows))],
+        "playlist_name": np.char.add("PL ", rng.integers(0, 10, rows).astype(str)),
+        "playlist_id": np.char.add("p", rng.integers(0, 10, rows).astype(str)),
+        "playlist_genre": genres,
+        "playlist_subgenre": [GENRES[genre][i] for genre, i in zip(genres, rng.integers(0, 2, rows))],
+    })
+    for feature in dataset.AUDIO_FEATURES:
+        data[feature] = rng.random(rows)
+    data["key"] = rng.integers(0, 12, rows).astype(float)
+    data["mode"] = rng.integers(0, 2, rows).astype(float)
+    data["duration_ms"] = rng.integers(60_000, 400_000, rows).astype(float)
+    return data
+
+
+@pytest.fixture
+def songs_csv(tmp_path, monkeypatch):
+    """CSV synthétique dans un répertoire temporaire, servi par un instantané neuf."""
+    monkeypatch.chdir(tmp_path)
+    (tmp_path / "dataset").mkdir()
+    base = synthetic_rows(400)
+    # Artiste présent sur 2 décennies, qu'un lot fera passer à 3
+    base.loc[:1, "track_artist"] = "Artist Promoted"
+    base.loc[:1, "track_album_release_date"] = ["1995-03-01", "2005-03-01"]
+    base.to_csv(dataset.DATASET_PATH, index=False)
+    dataset.set_snapshot(None)
+    yield base
+    dataset.set_snapshot(None)
+
+
+def state():
+    """Tables et agrégats de l'instantané servi."""
+    df_popular, index_by_base_year = evolutions.get_popular_songs()
+    return {
+        "version": dataset.get_version(),
+        "tables": {name: dataset._get_table(name) for name in dataset.TABLES},  # pylint: disable=protected-access
+        "cube": aggregates.get_cube(),
+        "artist_decades": aggregates.get_artist_decades().sort_values(),
+        "caracteristiques": caracteristiques.get_grouped_data(),
+        "evolutions": df_popular,
+        "evolutions_index": index_by_base_year,
+        "duration_sums": pop_vs_duree.get_duration_sums(),
+        "density_grid": pop_vs_duree.get_density_grid(),
+    }
+
+
+def assert_same_state(incremental, rebuilt):
+    assert incremental["version"] == rebuilt["version"]
+    for name in dataset.TABLES:
+        pd.testing.assert_frame_equal(incremental["tables"][name], rebuilt["tables"][name])
+    pd.testing.assert_frame_equal(incremental["cube"], rebuilt["cube"], check_exact=False, rtol=1e-9)
+    pd.testing.assert_frame_equal(incremental["evolutions"], rebuilt["evolutions"], check_exact=False, rtol=1e-9)
+    assert incremental["evolutions_index"].keys() == rebuilt["evolutions_index"].keys()
+    for base_year, df_index in rebuilt["evolutions_index"].items():
+        pd.testing.assert_frame_equal(incremental["evolutions_index"][base_year], df_index, check_exact=False, rtol=1e-9)
+    for left, right in zip(incremental["caracteristiques"], rebuilt["caracteristiques"]):
+        pd.testing.assert_frame_equal(left, right, check_exact=False, rtol=1e-9)
+    assert incremental["artist_decades"].equals(rebuilt["artist_decades"])
+    for left, right in zip(incremental["duration_sums"], rebuilt["duration_sums"]):
+        np.testing.assert_array_equal(left, right)
+    np.testing.assert_array_equal(incremental["density_grid"], rebuilt["density_grid"])
+
+
+def rebuilt_state():
+    dataset.set_snapshot(None)
+    return state()
+
+
+def test_append_tracks_matches_rebuild(songs_csv):
+    state()
+    ingest.append_tracks(synthetic_rows(30, seed=1, start=1000))
+    assert_same_state(state(), rebuilt_state())
+
+
+def test_append_tracks_in_existing_evolutions_buckets_matches_rebuild(songs_csv):
+    state()
+    # Chansons populaires d'après 2000 dans des groupes d'années et des genres déjà présents
+    popular = songs_csv[(songs_csv["track_popularity"] > 50) & (songs_csv["track_album_release_date"] > "2001")]
+    batch = popular.head(2).assign(track_id=["t1000", "t1001"])
+    ingest.append_tracks(batch)
+    assert_same_state(state(), rebuilt_state())
+
+
+def test_append_tracks_with_unparseable_date_matches_rebuild(songs_csv):
+    state()
+    batch = synthetic_rows(5, seed=2, start=1000)
+    batch.loc[2, "track_album_release_date"] = "unknown"
+    ingest.append_tracks(batch)
+    incremental = state()
+    assert incremental["tables"]["all"]["year"].dtype == "Int16"
+    # Lot suivant sans date invalide : la colonne reste « nullable »
+    ingest.append_tracks(synthetic_rows(5, seed=3, start=2000))
+    assert_same_state(state(), rebuilt_state())
+
+
+def test_append_tracks_with_new_genre_and_promoted_artist_matches_rebuild(songs_csv):
+    state()
+    batch = synthetic_rows(4, seed=4, start=1000)
+    batch["playlist_genre"] = "jazz"
+    batch["playlist_subgenre"] = "bebop"
+    batch.loc[0, "track_artist"] = "Artist Promoted"
+    batch.loc[0, "track_album_release_date"] = "1985-06-01"
+    ingest.append_tracks(batch)
+    incremental = state()
+    assert "Artist Promoted" in aggregates._long_career(incremental["artist_decades"])  # pylint: disable=protected-access
+    assert_same_state(incremental, rebuilt_state())
+
+
+def test_extend_snapshot_joins_tables_on_first_use(songs_csv):
+    songs = dataset.get_songs()
+    batch = dataset.clean_songs(synthetic_rows(3, seed=5, start=1000))
+    batch["track_artist"] = songs["track_artist"].iloc[:3].to_numpy()
+    snapshot = dataset.extend_snapshot(batch)
+    assert len(snapshot) == len(songs) + 3
+    assert "dataset.tables" not in snapshot.memos
+    # Pas de nouvel artiste : mêmes catégories, codes mis bout à bout
+    assert snapshot.batches[0]["track_artist"].cat.categories is songs["track_artist"].cat.categories
+    extended = snapshot.table("all")
+    assert "dataset.tables" in snapshot.memos
+    assert extended["track_artist"].dtype == songs["track_artist"].dtype
+    assert extended.index.tolist() == list(range(len(songs) + 3))
+    # Nouvel album : catégories réunies et triées
+    assert extended["track_album_id"].cat.categories.is_monotonic_increasing
+    assert set(extended["track_album_id"].cat.categories) == set(songs["track_album_id"].cat.categories) | set(batch["track_album_id"])
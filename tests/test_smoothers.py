@@ -0,0 +1,44 @@
+import numpy as np
+import pytest
+
+import smoothers
+
+# Courbe de référence et sa LOWESS par statsmodels 0.15 (lowess(y, x, frac=span)[:, 1])
+X = np.array([0.5, 1.0, 1.5, 2.0, 2.5, 3.0, 3.5, 4.0, 4.5, 5.0, 5.5, 6.0, 7.0, 8.0])
+Y = np.array([12.0, 25.5, 38.25, 47.0, 52.75, 55.5, 54.0, 50.25, 47.5, 41.0, 44.0, 36.5, 30.0, 61.0])
+STATSMODELS_LOWESS = {
+    0.3: [12.086230904643605, 25.29024227249287, 37.06542256807609, 46.15119074095645, 51.90423002374275,
+          54.240686138548845, 53.365880507936836, 50.53119392472214, 46.570337154908216, 43.01184826965591,
+          39.568267336144174, 36.49999999999998, 48.75, 60.999999999999986],
+    2 / 3: [17.518444795450687, 25.952376498421195, 33.968320168339986, 41.673761310615276, 48.89144046234524,
+            51.57633676637467, 51.60465466713724, 49.73575670913415, 46.91680172747272, 43.91540412150733,
+            40.66627061885883, 41.83515190720021, 46.24111764666709, 49.981112614638164],
+}
+
+
+@pytest.mark.parametrize("span", sorted(STATSMODELS_LOWESS))
+def test_lowess_matches_statsmodels_reference(span):
+    np.testing.assert_allclose(smoothers.lowess(X, Y, span=span), STATSMODELS_LOWESS[span], rtol=0, atol=1e-9)
+
+
+@pytest.mark.parametrize("span", [0.2, 0.3, 0.5, 2 / 3])
+def test_lowess_matches_statsmodels(span):
+    statsmodels_lowess = pytest.importorskip("statsmodels.nonparametric.smoothers_lowess").lowess
+    rng = np.random.default_rng(0)
+    x = np.sort(rng.choice(np.arange(0.0, 60.0, 0.25), 80, replace=False))
+    y = np.round(40 + 10 * np.sin(x / 8) + rng.normal(0, 5, len(x)), 2)
+    np.testing.assert_allclose(smoothers.lowess(x, y, span=span), statsmodels_lowess(y, x, frac=span)[:, 1],
+                               rtol=0, atol=1e-9)
+
+
+def test_weighted_lowess_keeps_lines_and_equal_weights():
+    x = np.arange(20.0)
+    line = 3 * x - 7
+    np.testing.assert_allclose(smoothers.weighted_lowess(x, line, np.arange(1.0, 21.0)), line, atol=1e-9)
+    np.testing.assert_allclose(smoothers.weighted_lowess(X, Y, np.full(len(X), 5.0)),
+                               smoothers.local_regression(X, Y, iterations=0), atol=1e-12)
+
+
+def test_smooth_unknown_method():
+    with pytest.raises(ValueError):
+        smoothers.smooth(X, Y, method="spline")
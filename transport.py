@@ -0,0 +1,47 @@
+"""
+Encodage des réponses : tableaux typés de plotly.js et compression (voir README.md).
+"""
+import base64
+import os
+
+import numpy as np
+
+COMPRESS = os.environ.get("DASH_COMPRESS", "1") != "0"
+COMPRESS_MIN_SIZE = int(os.environ.get("DASH_COMPRESS_MIN_SIZE", "1024"))
+# Algorithmes proposés, par ordre de préférence
+COMPRESS_ALGORITHM = ["br", "gzip"]
+
+# Types numériques lus par plotly.js, et leur code
+TYPED_ARRAY_DTYPES = {
+    "int8": "i1", "uint8": "u1", "int16": "i2", "uint16": "u2",
+    "int32": "i4", "uint32": "u4", "float32": "f4", "float64": "f8",
+}
+
+
+def typed_array(values):
+    """
+    Tableau numérique sous forme de tableau typé base64 de plotly.js
+
+    Args
+    ----
+    values : array-like
+        Valeurs numériques (ex. colonne d'un DataFrame)
+
+    Returns
+    -------
+    dict
+        {"dtype": ..., "bdata": ...} (même encodage que les figures sérialisées par plotly)
+    """
+    values = np.ascontiguousarray(values)
+    if values.dtype.name not in TYPED_ARRAY_DTYPES:
+        # Entiers de 64 bits (que plotly.js ne lit pas) et autres types numériques
+        values = values.astype(np.float64)
+    return {"dtype": TYPED_ARRAY_DTYPES[values.dtype.name], "bdata": base64.b64encode(values.tobytes()).decode("ascii")}
+
+
+def compress_config(min_size=COMPRESS_MIN_SIZE):
+    """
+    Configuration Flask-Compress du serveur (brotli ou gzip selon Accept-Encoding),
+    à installer avant la création de l'application Dash avec compress=COMPRESS
+    """
+    return {"COMPRESS_ALGORITHM": COMPRESS_ALGORITHM, "COMPRESS_MIN_SIZE": min_size}